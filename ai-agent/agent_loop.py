@@ -1,66 +1,345 @@
 # agent_loop.py
+import argparse
+import os
+import socket
+import threading
 import time
-from typing import Dict, Any
+from collections import defaultdict
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Any, List, Optional, Tuple
 
 from bson import ObjectId
+from pymongo.errors import PyMongoError
 
-from db import get_pending_applications, get_resume_bytes, update_application_evaluation
-from evaluators import evaluate_candidate
+from config import (
+    AGENT_BATCH_SIZE,
+    AGENT_CONCURRENCY,
+    AGENT_LEASE_SECONDS,
+    AGENT_POLL_MIN_SECONDS,
+    EVALUATION_BATCH_SIZE,
+)
+from ai_client import paused_until, usage_stats
+import job_descriptions
+import prescreen
+import result_cache
+from db import (
+    applications,
+    claim_pending_applications,
+    defer_application,
+    ensure_indexes,
+    extend_leases,
+    rebuild_job_stats,
+    get_resume_bytes,
+    reclaim_expired_leases,
+    release_application,
+)
+from errors import RetryLater
+from evaluation_writer import EvaluationWriter
+from evaluators import (
+    PROMPT_VERSION,
+    PreparedCandidate,
+    evaluate_candidate,
+    evaluate_prepared_batch,
+    prepare_candidate,
+)
+from ingestion.resume_cache import cache_stats
 from tiering import compute_tier
+from wakeup import AdaptivePoller, open_waiter
 
+# Identifies this process in application leases so several workers can share the queue
+WORKER_ID = f"{socket.gethostname()}-{os.getpid()}"
 
-def run_once(max_batch: int = 5):
-    """Process a batch of pending applications."""
-    pending_apps = get_pending_applications(limit=max_batch)
+# Results from every evaluator thread, written to Mongo in bulk
+results_writer = EvaluationWriter()
 
-    if not pending_apps:
-        print("No pending applications found.")
-        return
 
-    for app in pending_apps:
-        app_id = app["_id"]
-        job_id = app.get("jobId", "UNKNOWN")
+class LeaseHeartbeat:
+    """
+    Renews the leases on a claimed batch every third of AGENT_LEASE_SECONDS
+    until closed, so an evaluation that outlasts one lease (a slow model
+    call plus its repair, or an application waiting for a free thread)
+    isn't reclaimed and paid for again by another worker. Applications
+    already written or handed back are no longer processing and are skipped.
+    """
 
-        links: Dict[str, Any] = app.get("links", {})
-        resume_info = app.get("resume", {})
-        file_id = resume_info.get("fileId")
+    def __init__(self, app_ids: List[Any], lease_seconds: int = AGENT_LEASE_SECONDS):
+        self.app_ids = app_ids
+        self.lease_seconds = lease_seconds
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="lease-heartbeat", daemon=True)
 
-        resume_bytes = None
-        if file_id:
+    def _run(self):
+        while not self._stopped.wait(self.lease_seconds / 3):
             try:
-                resume_bytes = get_resume_bytes(file_id)
-            except Exception as e:
-                print(f"Error reading resume for {app_id}: {e}")
+                extend_leases(self.app_ids, WORKER_ID, self.lease_seconds)
+            except PyMongoError as e:
+                print(f"[ERROR] Could not renew leases: {e}")
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stopped.set()
+        self._thread.join()
+
+
+def load_inputs(app: Dict[str, Any]) -> Dict[str, Any]:
+    """Collect the evaluate_candidate arguments for an application."""
+    app_id = app["_id"]
+    job_id = app.get("jobId", "UNKNOWN")
+
+    links: Dict[str, Any] = app.get("links", {})
+    resume_info = app.get("resume", {})
+    file_id = resume_info.get("fileId")
+
+    resume_bytes = None
+    if file_id:
+        try:
+            resume_bytes = get_resume_bytes(file_id)
+        except Exception as e:
+            print(f"Error reading resume for {app_id}: {e}")
+
+    print(f"Evaluating application {app_id} (job {job_id})...")
 
-        print(f"Evaluating application {app_id} (job {job_id})...")
+    # Usually already cached by the batch's prefetch
+    job_description = job_descriptions.for_application(app)
 
-        # TODO: fetch real job description from a jobs collection, for now None
-        job_description = None
+    return {
+        "resume_bytes": resume_bytes,
+        "links": links,
+        "job_id": job_id,
+        "job_description": job_description,
+        # Each application is pushed back by the pre-screen at most once
+        "allow_deprioritize": app.get("priority", 0) >= 0,
+        # A recruiter asked for a re-evaluation: don't answer it from the cache
+        "use_cache": not app.get("forceFresh", False),
+    }
 
-        scores, tier = evaluate_candidate(
-            resume_bytes=resume_bytes,
-            links=links,
-            job_id=job_id,
-            job_description=job_description,
+
+def process_application(app: Dict[str, Any]):
+    """Evaluate a single application and queue its result for writing."""
+    details: Dict[str, Any] = {}
+    scores, tier = evaluate_candidate(**load_inputs(app), details=details)
+
+    print(f"Scores: {scores} | Tier: {tier} | Sources: {details.get('sourceTimings')}")
+
+    results_writer.add(app, scores, tier, details=details)
+
+
+def handle_failure(app: Dict[str, Any], error: Exception):
+    """Hand a claimed application back to the queue: deferred, retried later or dead-lettered."""
+    if isinstance(error, RetryLater):
+        retry_at = error.retry_at or datetime.utcnow() + timedelta(minutes=1)
+        status = defer_application(
+            app["_id"], WORKER_ID, retry_at, str(error),
+            priority=getattr(error, "priority", None), counted=error.counted,
         )
+        if status == "dead_letter":
+            print(f"[ERROR] Gave up on {app['_id']} after repeated model failures: {error}")
+        else:
+            print(f"Deferred {app['_id']} until {retry_at:%H:%M:%S}: {error}")
+    else:
+        status = release_application(app["_id"], WORKER_ID, str(error))
+        print(f"[ERROR] Evaluation failed for {app['_id']} (now {status}): {error}")
+
 
-        print(f"Scores: {scores} | Tier: {tier}")
+def process_claimed_application(app: Dict[str, Any]) -> bool:
+    """Evaluate a claimed application, handing it back to the queue if evaluation fails."""
+    try:
+        process_application(app)
+        return True
+    except Exception as e:
+        handle_failure(app, e)
+        return False
 
-        update_application_evaluation(app_id, scores, tier)
 
+def _process_batched(pending_apps: List[Dict[str, Any]], concurrency: int, batch_size: int) -> int:
+    """
+    Gather every application's inputs concurrently, then score applicants of
+    the same job and job description `batch_size` at a time with one model
+    call per group.
+    """
+    apps_by_key = {str(app["_id"]): app for app in pending_apps}
+    prepared: Dict[str, PreparedCandidate] = {}
 
-def run_forever(poll_interval_seconds: int = 30):
-    """Typical background agent loop."""
+    def prepare(app):
+        return prepare_candidate(**load_inputs(app))
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="evaluator") as pool:
+        futures = {pool.submit(prepare, app): key for key, app in apps_by_key.items()}
+        for future in as_completed(futures):
+            key = futures[future]
+            try:
+                prepared[key] = future.result()
+            except Exception as e:
+                handle_failure(apps_by_key[key], e)
+
+        # One prompt carries one job description, so applicants only share it when theirs match
+        by_job: Dict[Tuple[str, Optional[str]], List[str]] = defaultdict(list)
+        for key, candidate in prepared.items():
+            by_job[(str(candidate.job_id), candidate.job_description)].append(key)
+        groups = [
+            {key: prepared[key] for key in keys[i:i + batch_size]}
+            for keys in by_job.values()
+            for i in range(0, len(keys), batch_size)
+        ]
+
+        done = 0
+        batch_futures = {pool.submit(evaluate_prepared_batch, group): group for group in groups}
+        for future in as_completed(batch_futures):
+            group = batch_futures[future]
+            try:
+                results = future.result()
+            except Exception as e:
+                for key in group:
+                    handle_failure(apps_by_key[key], e)
+                continue
+            for key, result in results.items():
+                if isinstance(result, Exception):
+                    handle_failure(apps_by_key[key], result)
+                    continue
+                scores, tier = result
+                print(f"Scores for {key}: {scores} | Tier: {tier}")
+                results_writer.add(apps_by_key[key], scores, tier, details=group[key].details)
+                done += 1
+    return done
+
+
+def _process_concurrently(pending_apps: List[Dict[str, Any]], concurrency: int) -> int:
+    """Evaluate applications on a bounded thread pool; returns how many succeeded."""
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="evaluator") as pool:
+        futures = [pool.submit(process_claimed_application, app) for app in pending_apps]
+        return sum(1 for future in as_completed(futures) if future.result())
+
+
+def run_once(
+    max_batch: int = AGENT_BATCH_SIZE,
+    concurrency: int = 1,
+    llm_batch_size: int = EVALUATION_BATCH_SIZE,
+) -> int:
+    """
+    Process a batch of pending applications.
+
+    With concurrency > 1 up to that many applications are evaluated at once,
+    since each evaluation mostly waits on Gemini and the ingestion HTTP calls.
+    With llm_batch_size > 1 applicants to the same job share model calls.
+    Applications are claimed under a lease first, so any number of workers
+    can run this side by side without evaluating the same application twice.
+    Without model batching no more are claimed than can be evaluated at once,
+    and the leases are renewed until the batch is written.
+    Returns the number of applications evaluated.
+    """
+    reclaimed = reclaim_expired_leases()
+    if reclaimed["requeued"] or reclaimed["dead_lettered"]:
+        print(f"Reclaimed expired leases: {reclaimed}")
+
+    paused = paused_until()
+    if paused:
+        print(f"Model provider unavailable; not claiming work until {paused:%H:%M:%S}")
+        return 0
+
+    if llm_batch_size <= 1:
+        # A claimed application shouldn't sit waiting for a thread
+        max_batch = min(max_batch, max(1, concurrency))
+    pending_apps = claim_pending_applications(WORKER_ID, limit=max_batch)
+
+    if not pending_apps:
+        print("No pending applications found.")
+        return 0
+
+    # One query for every job in the batch instead of one per application
+    job_descriptions.prefetch(pending_apps)
+
+    started = time.monotonic()
+
+    with LeaseHeartbeat([app["_id"] for app in pending_apps]):
+        if llm_batch_size > 1:
+            done = _process_batched(pending_apps, concurrency, llm_batch_size)
+        elif concurrency > 1:
+            done = _process_concurrently(pending_apps, concurrency)
+        else:
+            done = sum(1 for app in pending_apps if process_claimed_application(app))
+        # Whatever the size/time thresholds haven't written yet; a failed write is
+        # retried on the next flush, or the leases expire and the work is redone
+        results_writer.flush()
+
+    elapsed = time.monotonic() - started
+    per_minute = done / elapsed * 60 if elapsed > 0 else 0.0
+    print(
+        f"Batch complete: {done}/{len(pending_apps)} applications in {elapsed:.1f}s "
+        f"({per_minute:.1f} applications/minute, concurrency {concurrency})"
+    )
+    print(f"Resume parse cache: {cache_stats()}")
+    print(f"Model token usage: {usage_stats()}")
+    print(f"Evaluation cache: {result_cache.stats()}")
+    print(f"Pre-screen: {prescreen.stats()}")
+    print(f"Job descriptions: {job_descriptions.stats()}")
+    return done
+
+
+def run_forever(
+    poll_interval_seconds: int = 30,
+    max_batch: int = AGENT_BATCH_SIZE,
+    concurrency: int = AGENT_CONCURRENCY,
+):
+    """
+    Typical background agent loop.
+
+    Drains the queue back-to-back while there is work. When idle it blocks on
+    a change stream for new pending applications, or, where change streams are
+    unavailable, polls with exponential backoff up to `poll_interval_seconds`.
+    While the Gemini circuit breaker is open it sleeps until the breaker's
+    cooldown ends rather than claiming applications it can't evaluate.
+    """
+    ensure_indexes()
+    job_descriptions.watch_job_changes()
+
+    waiter = open_waiter(applications, AGENT_POLL_MIN_SECONDS, poll_interval_seconds)
     while True:
+        done = 0
         try:
-            run_once()
+            done = run_once(max_batch=max_batch, concurrency=concurrency)
         except Exception as e:
             print(f"[ERROR] Agent loop iteration failed: {e}")
-        time.sleep(poll_interval_seconds)
+
+        if done:
+            waiter.reset()
+            continue
+
+        paused = paused_until()
+        if paused:
+            time.sleep(max(0.0, (paused - datetime.utcnow()).total_seconds()))
+            continue
+
+        try:
+            waiter.wait()
+        except PyMongoError as e:
+            print(f"[ERROR] Change stream failed, switching to polling: {e}")
+            waiter = AdaptivePoller(AGENT_POLL_MIN_SECONDS, poll_interval_seconds)
 
 
 if __name__ == "__main__":
-    # For dev you can just run once:
-    # run_once()
-    # For a real worker process:
-    run_forever()
+    parser = argparse.ArgumentParser(description="Evaluate pending applications.")
+    parser.add_argument(
+        "--rebuild-stats",
+        action="store_true",
+        help="recount the materialized dashboard stats and exit; run with the API and workers stopped",
+    )
+    parser.add_argument(
+        "--clear-stale-cache",
+        action="store_true",
+        help="drop cached evaluations from other prompt versions or models and exit; run once every worker is on the new version",
+    )
+    args = parser.parse_args()
+    if args.rebuild_stats:
+        print(f"Rebuilt dashboard stats for {rebuild_job_stats()} jobs")
+    elif args.clear_stale_cache:
+        stale = result_cache.clear_stale(PROMPT_VERSION)
+        print(f"Dropped {stale} cached evaluations from an older prompt or model")
+    else:
+        # For dev you can just run once:
+        # run_once()
+        # For a real worker process:
+        run_forever()
@@ -1,14 +1,463 @@
 # ai_client.py
+"""
+Gemini access for the evaluators.
+
+Model calls go through ModelClient, an async wrapper that runs on a shared
+background event loop (like ingestion.http_client) and adds what the bare SDK
+call lacks: RPM/TPM token buckets, a cap on in-flight calls, per-attempt
+timeouts inside an overall deadline, jittered exponential backoff on 429/5xx,
+and a circuit breaker. While the breaker is open calls fail fast with
+ModelUnavailable and the agent loop pauses (see paused_until).
+"""
+import asyncio
+import hashlib
+import logging
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+import httpx
 from google import genai
-from config import GEMINI_API_KEY, GEMINI_MODEL
+from google.genai import errors, types
+
+from cache import LRUCache
+from config import (
+    GEMINI_API_KEY,
+    GEMINI_BACKOFF_BASE_SECONDS,
+    GEMINI_BACKOFF_MAX_SECONDS,
+    GEMINI_BREAKER_COOLDOWN_SECONDS,
+    GEMINI_BREAKER_THRESHOLD,
+    GEMINI_CONTEXT_CACHE_TTL_SECONDS,
+    GEMINI_DEADLINE_SECONDS,
+    GEMINI_LOCAL_TOKENIZER,
+    GEMINI_MAX_CONCURRENCY,
+    GEMINI_MAX_RETRIES,
+    GEMINI_MODEL,
+    GEMINI_RPM,
+    GEMINI_TIMEOUT_SECONDS,
+    GEMINI_TPM,
+)
+from errors import RetryLater
+
+logger = logging.getLogger(__name__)
 
 client = genai.Client(api_key=GEMINI_API_KEY)
 
-def generate_text(prompt: str) -> str:
-    """Simple wrapper around Gemini API for text responses."""
-    response = client.models.generate_content(
-        model=GEMINI_MODEL,
-        contents=prompt,
-    )
+# Provider responses worth retrying: quota exhausted or the service struggling
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+
+# context hash -> cached content name, or "" if the provider refused to cache it
+_context_caches = LRUCache(max_items=256)
+_context_lock = threading.Lock()
+
+# LocalTokenizer, or False once it turned out to be unavailable
+_tokenizer: Any = None
+_tokenizer_lock = threading.Lock()
+
+_usage = {"calls": 0, "prompt_tokens": 0, "cached_tokens": 0, "output_tokens": 0, "retries": 0}
+_usage_lock = threading.Lock()
+
+
+class ModelUnavailable(RetryLater):
+    """Gemini is rate limiting or failing; the evaluation should be retried after `retry_at`."""
+
+
+class ModelRetriesExhausted(ModelUnavailable):
+    """Every attempt at this call failed; an input that always fails is eventually dead-lettered."""
+
+    counted = True
+
+
+class TokenBucket:
+    """
+    Async token bucket refilled continuously at `per_minute`, holding at most a
+    minute's worth. Waiters are served in arrival order. A rate of 0 disables it.
+    """
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount: float = 1):
+        if self.rate <= 0:
+            return
+        # A request bigger than the bucket would otherwise wait forever
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            self._refill()
+            while self.tokens < amount:
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= amount
+
+    def debit(self, amount: float):
+        """Charge usage discovered after the fact (may leave the bucket in debt)."""
+        if self.rate <= 0:
+            return
+        self._refill()
+        self.tokens -= amount
+
+
+class CircuitBreaker:
+    """
+    Opens after `threshold` consecutive failures and rejects calls for
+    `cooldown_seconds`. Then one trial call is let through: success closes
+    the breaker, failure re-opens it for another cooldown.
+    """
+
+    def __init__(self, threshold: int, cooldown_seconds: float):
+        self.threshold = threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_running = False
+
+    def open_until(self) -> Optional[float]:
+        """Monotonic time the breaker stays open until, or None if calls are allowed."""
+        if self.opened_at is None:
+            return None
+        until = self.opened_at + self.cooldown_seconds
+        return until if until > time.monotonic() else None
+
+    def allow(self) -> bool:
+        if self.opened_at is None:
+            return True
+        if self.open_until() is not None or self._trial_running:
+            return False
+        self._trial_running = True
+        return True
+
+    def end_trial(self):
+        """Free the trial slot after the trial call, whether or not it recorded a verdict."""
+        self._trial_running = False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self._trial_running or (self.threshold > 0 and self.failures >= self.threshold):
+            if self.opened_at is None or self._trial_running:
+                logger.warning(f"Gemini circuit breaker open for {self.cooldown_seconds:.0f}s after {self.failures} failures")
+            self.opened_at = time.monotonic()
+            self._trial_running = False
+
+
+def _retryable(error: BaseException) -> bool:
+    if isinstance(error, errors.APIError):
+        return error.code in RETRYABLE_STATUS
+    return isinstance(error, (asyncio.TimeoutError, httpx.TransportError))
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    """Rough token count (~4 characters per token) used to reserve TPM before a call."""
+    return len(text or "") // 4 + 1
+
+
+def _local_tokenizer():
+    global _tokenizer
+    with _tokenizer_lock:
+        if _tokenizer is None:
+            try:
+                from google.genai.local_tokenizer import LocalTokenizer
+                _tokenizer = LocalTokenizer(model_name=GEMINI_MODEL)
+            except Exception as e:  # sentencepiece not installed, or an unknown model
+                logger.info(f"Local tokenizer unavailable, estimating token counts: {e}")
+                _tokenizer = False
+        return _tokenizer or None
+
+
+def count_tokens(text: str) -> int:
+    """
+    Tokens `text` costs with GEMINI_MODEL, counted offline by the SDK's local
+    tokenizer when it's installed, else estimated.
+    """
+    tokenizer = _local_tokenizer() if GEMINI_LOCAL_TOKENIZER else None
+    if tokenizer is not None:
+        try:
+            return tokenizer.count_tokens(text).total_tokens
+        except Exception as e:
+            logger.debug(f"Local token count failed, estimating: {e}")
+    return estimate_tokens(text)
+
+
+def _retry_at(seconds: float) -> datetime:
+    return datetime.utcnow() + timedelta(seconds=max(seconds, 1))
+
+
+class ModelClient:
+    """
+    Async, rate-limited, retrying wrapper around a genai.Client.
+
+    Use one instance per event loop; its limiters and breaker are not thread-safe.
+    """
+
+    def __init__(
+        self,
+        genai_client: Any,
+        model: Optional[str] = GEMINI_MODEL,
+        rpm: int = GEMINI_RPM,
+        tpm: int = GEMINI_TPM,
+        max_concurrency: int = GEMINI_MAX_CONCURRENCY,
+        timeout: float = GEMINI_TIMEOUT_SECONDS,
+        deadline: float = GEMINI_DEADLINE_SECONDS,
+        max_retries: int = GEMINI_MAX_RETRIES,
+        backoff_base: float = GEMINI_BACKOFF_BASE_SECONDS,
+        backoff_max: float = GEMINI_BACKOFF_MAX_SECONDS,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        self.client = genai_client
+        self.model = model
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.in_flight = asyncio.Semaphore(max(1, max_concurrency))
+        self.timeout = timeout
+        self.deadline = deadline
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker or CircuitBreaker(GEMINI_BREAKER_THRESHOLD, GEMINI_BREAKER_COOLDOWN_SECONDS)
+
+    def _backoff(self, attempt: int) -> float:
+        # "Full jitter": spreads retries from many workers instead of synchronising them
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def _unavailable(self, message: str, seconds: float) -> ModelUnavailable:
+        return ModelUnavailable(message, retry_at=_retry_at(seconds))
+
+    async def generate(
+        self,
+        contents: str,
+        config: Optional[types.GenerateContentConfig] = None,
+        estimated_tokens: Optional[int] = None,
+        deadline: Optional[float] = None,
+    ):
+        """
+        Call generate_content, retrying retryable failures until `deadline`
+        seconds have passed. Raises ModelUnavailable if the breaker is open or
+        retries run out; other provider errors are raised as-is.
+        """
+        started = time.monotonic()
+        budget = self.deadline if deadline is None else deadline
+        estimated = estimated_tokens or estimate_tokens(contents)
+        attempt = 0
+
+        while True:
+            if not self.breaker.allow():
+                until = self.breaker.open_until() or time.monotonic() + 1
+                raise self._unavailable("Gemini circuit breaker is open", until - time.monotonic())
+            # Let through while the breaker is still open: this call is the trial
+            trial = self.breaker.opened_at is not None
+
+            try:
+                remaining = budget - (time.monotonic() - started)
+                try:
+                    await asyncio.wait_for(self._acquire(estimated), max(remaining, 0))
+                except asyncio.TimeoutError:
+                    # Our own quota, not the provider, ran out of time: no breaker failure
+                    raise self._unavailable("Gemini rate limit left no time before the deadline", self.backoff_max)
+
+                try:
+                    async with self.in_flight:
+                        remaining = budget - (time.monotonic() - started)
+                        response = await asyncio.wait_for(
+                            self.client.aio.models.generate_content(model=self.model, contents=contents, config=config),
+                            max(min(self.timeout, remaining), 0),
+                        )
+                except Exception as e:
+                    if not _retryable(e):
+                        # The provider answered (e.g. a 400), so it is healthy
+                        self.breaker.record_success()
+                        raise
+                    self.breaker.record_failure()
+                    delay = self._backoff(attempt)
+                    remaining = budget - (time.monotonic() - started)
+                    if attempt >= self.max_retries or delay >= remaining:
+                        raise ModelRetriesExhausted(
+                        f"Gemini call failed after {attempt + 1} attempts: {e!r}", retry_at=_retry_at(self.backoff_max)
+                    ) from e
+                    logger.info(f"Gemini call failed ({e!r}); retry {attempt + 1} in {delay:.1f}s")
+                    _count_retry()
+                    attempt += 1
+                    await asyncio.sleep(delay)
+                    continue
+
+                self.breaker.record_success()
+                metadata = getattr(response, "usage_metadata", None)
+                if metadata is not None:
+                    actual = (metadata.prompt_token_count or 0) + (metadata.candidates_token_count or 0)
+                    self.tokens.debit(actual - estimated)
+                return response
+            finally:
+                if trial:
+                    # Also when the attempt ended without a verdict (our own quota ran
+                    # out of time, or cancellation): the next call may be the trial
+                    self.breaker.end_trial()
+
+    async def _acquire(self, estimated_tokens: int):
+        await self.requests.acquire(1)
+        await self.tokens.acquire(estimated_tokens)
+
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_model: Optional[ModelClient] = None
+_loop_lock = threading.Lock()
+
+
+def _get_model() -> ModelClient:
+    """Start the background event loop and the shared ModelClient on first use."""
+    global _loop, _model
+    with _loop_lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="gemini-client", daemon=True).start()
+            _loop = loop
+        if _model is None:
+            _model = ModelClient(client)
+        return _model
+
+
+def paused_until() -> Optional[datetime]:
+    """While the circuit breaker is open, when it will let calls through again."""
+    until = _model.breaker.open_until() if _model is not None else None
+    if until is None:
+        return None
+    return datetime.utcnow() + timedelta(seconds=until - time.monotonic())
+
+
+def get_context_cache(context: str) -> Optional[str]:
+    """
+    Store a static prompt prefix (rubric + job description) as a Gemini cached
+    context and return its name, reusing it for every call with the same prefix.
+    Returns None when caching isn't possible (e.g. the prefix is below the
+    model's minimum cacheable size); callers then send it as a system instruction.
+    """
+    key = hashlib.sha256(f"{GEMINI_MODEL}\n{context}".encode("utf-8")).hexdigest()
+    name = _context_caches.get(key)
+    if name is not None:
+        return name or None
+
+    with _context_lock:
+        name = _context_caches.get(key)
+        if name is None:
+            try:
+                cached = client.caches.create(
+                    model=GEMINI_MODEL,
+                    config=types.CreateCachedContentConfig(
+                        system_instruction=context,
+                        ttl=f"{GEMINI_CONTEXT_CACHE_TTL_SECONDS}s",
+                        display_name=f"evaluation-{key[:16]}",
+                    ),
+                )
+                name = cached.name
+            except Exception as e:
+                logger.info(f"Context caching unavailable, using system instruction: {e}")
+                name = ""
+            # Forget the name a little before the provider expires it
+            _context_caches.set(key, name, ttl_seconds=GEMINI_CONTEXT_CACHE_TTL_SECONDS * 0.9)
+    return name or None
+
+
+def _count_retry():
+    with _usage_lock:
+        _usage["retries"] += 1
+
+
+def _record_usage(response, usage: Optional[Dict[str, int]]):
+    metadata = getattr(response, "usage_metadata", None)
+    if metadata is None:
+        return
+    counts = {
+        "prompt_tokens": metadata.prompt_token_count or 0,
+        "cached_tokens": metadata.cached_content_token_count or 0,
+        "output_tokens": metadata.candidates_token_count or 0,
+    }
+    with _usage_lock:
+        _usage["calls"] += 1
+        for name, value in counts.items():
+            _usage[name] += value
+    if usage is not None:
+        for name, value in counts.items():
+            usage[name] = usage.get(name, 0) + value
+
+
+def usage_stats() -> Dict[str, int]:
+    """Token counters since process start; cached_tokens were served from a context cache."""
+    with _usage_lock:
+        return dict(_usage)
+
+
+async def _generate(
+    prompt: str,
+    system_instruction: Optional[str],
+    cached_content: Optional[str],
+    usage: Optional[Dict[str, int]],
+    deadline: Optional[float],
+    response_schema: Optional[Dict[str, Any]],
+) -> str:
+    options: Dict[str, Any] = {}
+    if cached_content:
+        options["cached_content"] = cached_content
+    elif system_instruction:
+        options["system_instruction"] = system_instruction
+    if response_schema is not None:
+        options["response_mime_type"] = "application/json"
+        options["response_schema"] = response_schema
+    config = types.GenerateContentConfig(**options) if options else None
+    estimated = estimate_tokens(prompt) + estimate_tokens(system_instruction)
+    response = await _get_model().generate(prompt, config, estimated_tokens=estimated, deadline=deadline)
+    _record_usage(response, usage)
     # In simple cases, response.text will hold the main reply
-    return response.text
\ No newline at end of file
+    return response.text
+
+
+async def generate_text_async(
+    prompt: str,
+    system_instruction: Optional[str] = None,
+    cached_content: Optional[str] = None,
+    usage: Optional[Dict[str, int]] = None,
+    deadline: Optional[float] = None,
+    response_schema: Optional[Dict[str, Any]] = None,
+) -> str:
+    """generate_text for async callers; the call itself runs on the shared client's loop."""
+    _get_model()
+    future = asyncio.run_coroutine_threadsafe(
+        _generate(prompt, system_instruction, cached_content, usage, deadline, response_schema), _loop
+    )
+    return await asyncio.wrap_future(future)
+
+
+def generate_text(
+    prompt: str,
+    system_instruction: Optional[str] = None,
+    cached_content: Optional[str] = None,
+    usage: Optional[Dict[str, int]] = None,
+    deadline: Optional[float] = None,
+    response_schema: Optional[Dict[str, Any]] = None,
+) -> str:
+    """
+    Simple wrapper around Gemini API for text responses.
+
+    The static part of a prompt can go in `cached_content` (see get_context_cache)
+    or `system_instruction`. With a `response_schema` the model answers in
+    JSON mode, constrained to that schema. Token counts are added to `usage` if given.
+    Blocks the calling thread only; rate limiting and retries happen on the
+    shared loop. Raises ModelUnavailable if Gemini can't answer in time.
+    """
+    _get_model()
+    future = asyncio.run_coroutine_threadsafe(
+        _generate(prompt, system_instruction, cached_content, usage, deadline, response_schema), _loop
+    )
+    return future.result()
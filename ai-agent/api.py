@@ -3,29 +3,72 @@ FastAPI application for AI-powered talent evaluation platform.
 
 Endpoints:
 - POST /candidates - Submit a new candidate with resume and optional links
+- GET /candidates_list - Page through candidates, newest first
+- GET /candidates_export - Stream candidates and evaluations as CSV or NDJSON
 - GET /candidates/{id} - Retrieve evaluation results for a candidate
 - GET /candidates/{id}/report - Generate HTML report for a candidate
+- POST /candidates/{id}/reevaluate - Queue a candidate for re-evaluation
+- GET /queue - Evaluation queue depth per job
+
+Handlers that touch MongoDB are plain `def`: pymongo blocks, so FastAPI runs
+them on its threadpool instead of the event loop, and one slow query no
+longer stalls every other request.
 """
+import base64
+import csv
+import io
+import json
 import logging
-from typing import Optional
-from datetime import datetime
+import re
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional
+from datetime import datetime, timezone
 
-from fastapi import FastAPI, File, UploadFile, Form, HTTPException
+from anyio import to_thread
+from fastapi import FastAPI, File, UploadFile, Form, HTTPException, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import HTMLResponse, StreamingResponse
 from bson import ObjectId
+from bson.errors import InvalidId
 from pydantic import BaseModel
 
-from db import applications, candidates, fs, evaluations
+from cache import LRUCache
+from config import API_JOB_CACHE_TTL_SECONDS, API_THREADPOOL_SIZE, JOB_CACHE_MAX_ITEMS, STATS_MATERIALIZED
+from db import (
+    PRIORITY_NORMAL,
+    REJECTED_EXPR,
+    REJECTED_QUERY,
+    SELECTED_EXPR,
+    SELECTED_QUERY,
+    applications,
+    candidates,
+    evaluations,
+    fs,
+    job_stats,
+    jobs,
+    queue_stats,
+    record_stats_moves,
+    requeue_application,
+    set_application_status,
+)
 from evaluators import evaluate_candidate
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Sync handlers run on this pool, each holding at most one Mongo connection
+    to_thread.current_default_thread_limiter().total_tokens = API_THREADPOOL_SIZE
+    yield
+
+
 app = FastAPI(
     title="AI Talent Evaluation Platform",
     description="AI-first talent evaluation replacing keyword-based ATS systems",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -35,6 +78,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 
@@ -60,159 +104,222 @@ async def root():
     return {"status": "healthy", "message": "AI Talent Evaluation Platform API"}
 
 
+# A dashboard list row
+STATS_LIST_ROW = {
+    "_id": 0,
+    "id": {"$toString": "$_id"},
+    "job_id": {"$toString": {"$ifNull": ["$jobId", "N/A"]}},
+    "tier": {"$ifNull": ["$tier.code", "N/A"]},
+    "score": {"$ifNull": ["$scores.overallScore", 0]},
+    "date": {"$ifNull": ["$lastEvaluatedAt", None]},
+    "status": {"$ifNull": ["$status", "pending"]}
+}
+
+
+def _latest(match: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{"$match": match}, {"$sort": {"lastEvaluatedAt": -1}}, {"$limit": 10}, {"$project": STATS_LIST_ROW}]
+
+
+def _stats_from_counters() -> Dict[str, Any]:
+    """Dashboard stats from the materialized per-job counters: O(jobs), no scan of applications."""
+    job_rows = [
+        {"job_id": str(row["_id"]), "total": row.get("total", 0),
+         "selected": row.get("selected", 0), "rejected": row.get("rejected", 0)}
+        for row in job_stats.find({"total": {"$gt": 0}})
+    ]
+    return {
+        "jobs_posted": len(job_rows),
+        "applications_received": sum(row["total"] for row in job_rows),
+        "applications_selected": sum(row["selected"] for row in job_rows),
+        "applications_rejected": sum(row["rejected"] for row in job_rows),
+        # Served by the (statsBucket, lastEvaluatedAt) index
+        "selected_list": list(applications.aggregate(_latest({"statsBucket": "selected"}))),
+        "rejected_list": list(applications.aggregate(_latest({"statsBucket": "rejected"}))),
+        "job_stats": job_rows
+    }
+
+
+def _stats_from_applications() -> Dict[str, Any]:
+    """Dashboard stats in one pass over applications with a $facet pipeline."""
+    facets = {
+        "per_job": [
+            {"$group": {
+                "_id": "$jobId",
+                "total": {"$sum": 1},
+                "selected": {"$sum": {"$cond": [SELECTED_EXPR, 1, 0]}},
+                "rejected": {"$sum": {"$cond": [REJECTED_EXPR, 1, 0]}}
+            }},
+            {"$project": {"_id": 0, "job_id": {"$toString": "$_id"}, "total": 1, "selected": 1, "rejected": 1}}
+        ],
+        "selected_list": _latest(SELECTED_QUERY),
+        "rejected_list": _latest(REJECTED_QUERY)
+    }
+    result = next(applications.aggregate([{"$facet": facets}]), None) or {}
+    job_rows = result.get("per_job", [])
+    return {
+        "jobs_posted": len(job_rows),
+        "applications_received": sum(row["total"] for row in job_rows),
+        "applications_selected": sum(row["selected"] for row in job_rows),
+        "applications_rejected": sum(row["rejected"] for row in job_rows),
+        "selected_list": result.get("selected_list", []),
+        "rejected_list": result.get("rejected_list", []),
+        "job_stats": job_rows
+    }
+
+
 @app.get("/stats")
-async def get_stats():
+def get_stats():
     """Get dashboard statistics with detailed lists"""
     try:
-        total = applications.count_documents({})
-        
-        # Selected = Manually Accepted OR (Not Manually Rejected AND Tier A/B)
-        selected_query = {
-            "$or": [
-                {"status": "accepted"},
-                {
-                    "$and": [
-                        {"status": {"$ne": "rejected"}},
-                        {"status": {"$ne": "accepted"}}, # Avoid double counting if mixed
-                        {"tier.letter": {"$in": ["A", "B"]}}
-                    ]
-                }
-            ]
-        }
-        selected = applications.count_documents(selected_query)
-        
-        # Rejected = Manually Rejected OR (Not Manually Accepted AND Tier F)
-        rejected_query = {
-            "$or": [
-                {"status": "rejected"},
-                {
-                    "$and": [
-                        {"status": {"$ne": "accepted"}},
-                        {"status": {"$ne": "rejected"}},
-                        {"tier.letter": "F"}
-                    ]
-                }
-            ]
-        }
-        rejected = applications.count_documents(rejected_query)
-        
-        # Count unique job IDs
-        jobs_cursor = applications.distinct("jobId")
-        unique_jobs = len(jobs_cursor)
-        
-        # Get lists for display - using same hybrid logic for filtering
-        selected_list = []
-        for app in applications.find(selected_query).limit(10).sort("lastEvaluatedAt", -1):
-            selected_list.append({
-                "id": str(app["_id"]),
-                "job_id": app.get("jobId", "N/A"),
-                "tier": app.get("tier", {}).get("code", "N/A"),
-                "score": app.get("scores", {}).get("overallScore", 0),
-                "date": app.get("lastEvaluatedAt").isoformat() if app.get("lastEvaluatedAt") else None,
-                "status": app.get("status", "pending")
-            })
-        
-        rejected_list = []
-        for app in applications.find(rejected_query).limit(10).sort("lastEvaluatedAt", -1):
-            rejected_list.append({
-                "id": str(app["_id"]),
-                "job_id": app.get("jobId", "N/A"),
-                "tier": app.get("tier", {}).get("code", "F"),
-                "score": app.get("scores", {}).get("overallScore", 0),
-                "date": app.get("lastEvaluatedAt").isoformat() if app.get("lastEvaluatedAt") else None,
-                "status": app.get("status", "pending")
-            })
-        
-        # Get per-job stats - Aggregation needs to mimic this hybrid logic
-        pipeline = [
-            {
-                "$group": {
-                    "_id": "$jobId",
-                    "total": {"$sum": 1},
-                    "selected": {
-                        "$sum": {
-                            "$cond": [
-                                {"$or": [
-                                    {"$eq": ["$status", "accepted"]},
-                                    {"$and": [
-                                        {"$ne": ["$status", "rejected"]},
-                                        {"$ne": ["$status", "accepted"]},
-                                        {"$in": ["$tier.letter", ["A", "B"]]}
-                                    ]}
-                                ]},
-                                1,
-                                0
-                            ]
-                        }
-                    },
-                    "rejected": {
-                        "$sum": {
-                            "$cond": [
-                                {"$or": [
-                                    {"$eq": ["$status", "rejected"]},
-                                    {"$and": [
-                                        {"$ne": ["$status", "accepted"]},
-                                        {"$ne": ["$status", "rejected"]},
-                                        {"$eq": ["$tier.letter", "F"]}
-                                    ]}
-                                ]},
-                                1,
-                                0
-                            ]
-                        }
-                    }
-                }
-            },
-            {
-                "$project": {
-                    "job_id": {"$toString": "$_id"},
-                    "total": 1,
-                    "selected": 1,
-                    "rejected": 1
-                }
-            }
-        ]
-        job_stats_cursor = applications.aggregate(pipeline)
-        job_stats_list = list(job_stats_cursor)
-        
-        return {
-            "jobs_posted": unique_jobs,
-            "applications_received": total,
-            "applications_selected": selected,
-            "applications_rejected": rejected,
-            "selected_list": selected_list,
-            "rejected_list": rejected_list,
-            "job_stats": job_stats_list
-        }
+        return _stats_from_counters() if STATS_MATERIALIZED else _stats_from_applications()
     except Exception as e:
         logger.error(f"Error getting stats: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+CANDIDATES_PAGE_MAX = 200
+
+# Only what a list row shows
+CANDIDATE_LIST_FIELDS = {
+    "personalInfo": 1, "firstName": 1, "lastName": 1, "name": 1, "jobId": 1, "status": 1,
+    "scores": 1, "tier": 1, "links": 1, "resume.filename": 1, "createdAt": 1,
+}
+
+
+# Job title and publicFormId by job ObjectId, for candidate list rows
+_job_cache = LRUCache(max_items=JOB_CACHE_MAX_ITEMS, ttl_seconds=API_JOB_CACHE_TTL_SECONDS)
+
+
+def _job_ref(job_id: Any) -> Optional[ObjectId]:
+    if isinstance(job_id, ObjectId):
+        return job_id
+    if isinstance(job_id, str) and ObjectId.is_valid(job_id):
+        return ObjectId(job_id)
+    return None
+
+
+def _jobs_by_id(job_ids) -> Dict[ObjectId, Dict[str, Any]]:
+    """Title and publicFormId of each job, reading the uncached ones with a single `$in` query."""
+    wanted = {job_id for job_id in job_ids if job_id is not None}
+    missing = [job_id for job_id in wanted if job_id not in _job_cache]
+    if missing:
+        found = {job["_id"]: job for job in jobs.find({"_id": {"$in": missing}}, {"jobTitle": 1, "publicFormId": 1})}
+        for job_id in missing:
+            _job_cache.set(job_id, found.get(job_id, {}))
+    return {job_id: _job_cache.get(job_id, {}) for job_id in wanted}
+
+
+def _encode_cursor(app: Dict[str, Any]) -> str:
+    """Opaque position after `app` in (createdAt, _id) descending order."""
+    created_at = app.get("createdAt")
+    position: Dict[str, Any] = {"t": created_at.isoformat() if created_at else None}
+    if isinstance(app["_id"], ObjectId):
+        position["oid"] = str(app["_id"])
+    else:
+        position["id"] = app["_id"]
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode().rstrip("=")
+
+
+def _cursor_query(cursor: str) -> Dict[str, Any]:
+    """Filter for the applications after `cursor`; raises ValueError if it is malformed."""
+    position = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    app_id = ObjectId(position["oid"]) if "oid" in position else position["id"]
+    if position["t"] is None:
+        # Applications without createdAt sort last
+        return {"createdAt": None, "_id": {"$lt": app_id}}
+    created_at = datetime.fromisoformat(position["t"])
+    return {
+        "$or": [
+            {"createdAt": {"$lt": created_at}},
+            {"createdAt": created_at, "_id": {"$lt": app_id}},
+            {"createdAt": None},
+        ]
+    }
+
+
+def _candidate_query(
+    job_id: Optional[str] = None,
+    status: Optional[str] = None,
+    tier: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None
+) -> Dict[str, Any]:
+    query: Dict[str, Any] = {}
+    if job_id:
+        # Backend applications store an ObjectId, API submissions the string
+        query["jobId"] = {"$in": [ObjectId(job_id), job_id]} if ObjectId.is_valid(job_id) else job_id
+    if status:
+        query["status"] = status
+    if tier:
+        query["tier.letter"] = tier.upper()
+    bounds = {op: _naive_utc(value) for op, value in (("$gte", created_from), ("$lt", created_to)) if value}
+    if bounds:
+        query["createdAt"] = bounds
+    return query
+
+
+def _naive_utc(value: datetime) -> datetime:
+    # createdAt is stored as naive UTC
+    return value.astimezone(timezone.utc).replace(tzinfo=None) if value.tzinfo else value
+
+
+def _full_name(app: Dict[str, Any]) -> str:
+    # Backward compatibility for personal info
+    p_info = app.get("personalInfo", {})
+    first_name = p_info.get('firstName') or app.get('firstName') or ''
+    last_name = p_info.get('lastName') or app.get('lastName') or ''
+    return f"{first_name} {last_name}".strip() or app.get('name') or "Unknown Candidate"
+
+
 @app.get("/candidates_list")
-async def get_candidates_list():
-    """Get list of all candidates with summary info"""
+def get_candidates_list(
+    response: Response,
+    limit: int = Query(50, ge=1, le=CANDIDATES_PAGE_MAX),
+    cursor: Optional[str] = None,
+    job_id: Optional[str] = None,
+    status: Optional[str] = None,
+    tier: Optional[str] = None
+):
+    """
+    One page of candidates, newest first, with summary info.
+
+    Pass the `X-Next-Cursor` response header back as `cursor` for the next
+    page; it is absent on the last page. Filter by `job_id`, `status` and
+    tier letter (`tier=A`).
+    """
     try:
-        cursor = applications.find({}).sort("createdAt", -1)
+        query = _candidate_query(job_id, status, tier)
+        if cursor:
+            try:
+                query = {"$and": [query, _cursor_query(cursor)]} if query else _cursor_query(cursor)
+            except (ValueError, KeyError, TypeError, InvalidId) as e:
+                raise HTTPException(status_code=400, detail=f"Invalid cursor: {e}")
+
+        # One extra row tells whether there is a next page
+        page = list(
+            applications.find(query, CANDIDATE_LIST_FIELDS)
+            .sort([("createdAt", -1), ("_id", -1)])
+            .limit(limit + 1)
+        )
+        if len(page) > limit:
+            page = page[:limit]
+            response.headers["X-Next-Cursor"] = _encode_cursor(page[-1])
+
+        job_docs = _jobs_by_id(_job_ref(app.get("jobId")) for app in page)
+
         candidates_list = []
-        for app in cursor:
-            # Backward compatibility for personal info
-            p_info = app.get("personalInfo", {})
-            first_name = p_info.get('firstName') or app.get('firstName') or ''
-            last_name = p_info.get('lastName') or app.get('lastName') or ''
-            full_name = f"{first_name} {last_name}".strip() or app.get('name') or "Unknown Candidate"
-            
+        for app in page:
+            full_name = _full_name(app)
+
             # Use publicFormId if available for display, otherwise hex jobId
             job_id_raw = app.get("jobId", "N/A")
             display_job_id = str(job_id_raw)
             job_title = "N/A"
             
-            # Try to fetch job title and publicFormId
-            if isinstance(job_id_raw, ObjectId):
-                job_doc = jobs.find_one({"_id": job_id_raw})
-                if job_doc:
-                    job_title = job_doc.get("jobTitle", "N/A")
-                    display_job_id = job_doc.get("publicFormId", str(job_id_raw))
+            job_doc = job_docs.get(_job_ref(job_id_raw))
+            if job_doc:
+                job_title = job_doc.get("jobTitle", "N/A")
+                display_job_id = job_doc.get("publicFormId", str(job_id_raw))
 
             candidates_list.append({
                 "candidate_id": str(app["_id"]),
@@ -227,13 +334,138 @@ async def get_candidates_list():
                 "created_at": app.get("createdAt").isoformat() if app.get("createdAt") else None
             })
         return candidates_list
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting candidate list: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+EXPORT_BATCH = 500
+
+# Column order of the CSV export; NDJSON rows carry the same keys
+EXPORT_COLUMNS = [
+    "candidate_id", "name", "email", "phone", "job_id", "job_title", "status", "tier", "tier_letter",
+    "overall_score", "content_score", "design_score", "projects_score", "reasoning",
+    "linkedin", "github", "portfolio", "created_at", "evaluated_at",
+]
+EXPORT_FIELDS = {
+    "personalInfo": 1, "firstName": 1, "lastName": 1, "name": 1, "email": 1, "jobId": 1, "status": 1,
+    "scores": 1, "tier": 1, "links": 1, "createdAt": 1, "lastEvaluatedAt": 1,
+}
+
+
+def _export_row(app: Dict[str, Any], job_doc: Dict[str, Any]) -> Dict[str, Any]:
+    p_info = app.get("personalInfo") or {}
+    scores = app.get("scores") or {}
+    tier = app.get("tier") or {}
+    links = app.get("links") or {}
+    created_at = app.get("createdAt")
+    evaluated_at = app.get("lastEvaluatedAt")
+    return {
+        "candidate_id": str(app["_id"]),
+        "name": _full_name(app),
+        "email": p_info.get("email") or app.get("email"),
+        "phone": p_info.get("phone"),
+        "job_id": job_doc.get("publicFormId", str(app.get("jobId", ""))),
+        "job_title": job_doc.get("jobTitle"),
+        "status": app.get("status", "pending"),
+        "tier": tier.get("code"),
+        "tier_letter": tier.get("letter"),
+        "overall_score": scores.get("overallScore"),
+        "content_score": scores.get("contentScore"),
+        "design_score": scores.get("designScore"),
+        "projects_score": scores.get("projectsScore"),
+        "reasoning": scores.get("reasoningSummary"),
+        "linkedin": links.get("linkedin"),
+        "github": links.get("github"),
+        "portfolio": links.get("portfolio"),
+        "created_at": created_at.isoformat() if created_at else None,
+        "evaluated_at": evaluated_at.isoformat() if evaluated_at else None,
+    }
+
+
+def _export_rows(query: Dict[str, Any]):
+    """Export rows straight off a cursor, EXPORT_BATCH at a time (one job lookup per batch)."""
+    cursor = applications.find(query, EXPORT_FIELDS).sort([("createdAt", -1), ("_id", -1)]).batch_size(EXPORT_BATCH)
+    try:
+        batch = []
+        for app in cursor:
+            batch.append(app)
+            if len(batch) == EXPORT_BATCH:
+                yield from _export_batch(batch)
+                batch = []
+        yield from _export_batch(batch)
+    finally:
+        cursor.close()
+
+
+def _export_batch(batch: List[Dict[str, Any]]):
+    job_docs = _jobs_by_id(_job_ref(app.get("jobId")) for app in batch)
+    for app in batch:
+        yield _export_row(app, job_docs.get(_job_ref(app.get("jobId"))) or {})
+
+
+def _ndjson(rows):
+    for row in rows:
+        yield json.dumps(row) + "\n"
+
+
+# A cell starting with one of these is run as a formula by spreadsheet apps
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _csv_cell(value: Any) -> Any:
+    """Quote candidate-supplied text so a spreadsheet shows it instead of evaluating it."""
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def _csv(rows, chunk_bytes: int = 64 * 1024):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+    writer.writeheader()
+    for row in rows:
+        writer.writerow({column: _csv_cell(value) for column, value in row.items()})
+        if buffer.tell() >= chunk_bytes:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+@app.get("/candidates_export")
+def export_candidates(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    job_id: Optional[str] = None,
+    status: Optional[str] = None,
+    tier: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None
+):
+    """
+    Every matching candidate with their latest evaluation, newest first, as
+    CSV or NDJSON. Rows are streamed from the database cursor, so memory use
+    doesn't grow with the number of candidates. `created_from` is inclusive,
+    `created_to` exclusive.
+    """
+    query = _candidate_query(job_id, status, tier, created_from, created_to)
+    # job_id is caller input: keep the header well-formed whatever it contains
+    name = "candidates-" + re.sub(r"[^A-Za-z0-9._-]", "_", job_id) if job_id else "candidates"
+    if format == "ndjson":
+        body, media_type = _ndjson(_export_rows(query)), "application/x-ndjson"
+    else:
+        body, media_type = _csv(_export_rows(query)), "text/csv"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{name}.{format}"'}
+    )
+
+
 @app.post("/candidates", response_model=CandidateResponse)
-async def submit_candidate(
+def submit_candidate(
     resume: UploadFile = File(...),
     job_id: str = Form(...),
     first_name: str = Form(...),
@@ -250,7 +482,7 @@ async def submit_candidate(
     """
     try:
         # Read resume bytes
-        resume_bytes = await resume.read()
+        resume_bytes = resume.file.read()
         
         # Store resume in GridFS
         file_id = fs.put(
@@ -280,12 +512,17 @@ async def submit_candidate(
             },
             "jobDescription": job_description,
             "status": "pending",
+            "priority": PRIORITY_NORMAL,
             "createdAt": datetime.utcnow(),
             "updatedAt": datetime.utcnow()
         }
         
+        if STATS_MATERIALIZED:
+            application_doc["statsBucket"] = "open"
         result = applications.insert_one(application_doc)
         app_id = result.inserted_id
+        if STATS_MATERIALIZED:
+            record_stats_moves([(job_id, None, "open")])
         
         logger.info(f"Created new application {app_id} for job {job_id}")
         
@@ -307,17 +544,12 @@ class CandidateStatusUpdate(BaseModel):
 
 
 @app.put("/candidates/{candidate_id}/status", response_model=CandidateResponse)
-async def update_candidate_status(candidate_id: str, status_update: CandidateStatusUpdate):
+def update_candidate_status(candidate_id: str, status_update: CandidateStatusUpdate):
     """
     Update the status of a candidate (e.g., 'accepted', 'rejected').
     """
     try:
-        result = applications.update_one(
-            {"_id": ObjectId(candidate_id)},
-            {"$set": {"status": status_update.status, "updatedAt": datetime.utcnow()}}
-        )
-        
-        if result.matched_count == 0:
+        if not set_application_status(ObjectId(candidate_id), status_update.status):
             raise HTTPException(status_code=404, detail="Candidate not found")
             
         return CandidateResponse(
@@ -325,11 +557,44 @@ async def update_candidate_status(candidate_id: str, status_update: CandidateSta
             status=status_update.status,
             message=f"Candidate status updated to {status_update.status}"
         )
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error updating candidate status: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/candidates/{candidate_id}/reevaluate", response_model=CandidateResponse)
+def reevaluate_candidate(candidate_id: str):
+    """
+    Queue a candidate for a fresh evaluation, ahead of normal and bulk traffic.
+    """
+    try:
+        if not requeue_application(ObjectId(candidate_id)):
+            raise HTTPException(status_code=404, detail="Candidate not found or being evaluated")
+
+        return CandidateResponse(
+            candidate_id=candidate_id,
+            status="pending",
+            message="Candidate queued for re-evaluation"
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error queueing re-evaluation: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/queue")
+def get_queue():
+    """Evaluation queue depth and oldest wait per job, longest wait first"""
+    try:
+        return {"jobs": queue_stats()}
+    except Exception as e:
+        logger.error(f"Error getting queue stats: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 class EvaluationResponse(BaseModel):
     """Response model for evaluation results"""
     candidate_id: str
@@ -341,7 +606,7 @@ class EvaluationResponse(BaseModel):
 
 
 @app.get("/candidates/{candidate_id}", response_model=EvaluationResponse)
-async def get_candidate_evaluation(candidate_id: str):
+def get_candidate_evaluation(candidate_id: str):
     """
     Retrieve evaluation results for a candidate.
     
@@ -381,7 +646,7 @@ async def get_candidate_evaluation(candidate_id: str):
 
 
 @app.get("/candidates/{candidate_id}/report", response_class=HTMLResponse)
-async def get_candidate_report(candidate_id: str):
+def get_candidate_report(candidate_id: str):
     """
     Generate an HTML report for a candidate.
     
@@ -476,7 +741,7 @@ async def get_candidate_report(candidate_id: str):
 
 
 @app.get("/analytics/{job_id}")
-async def get_job_analytics(job_id: str):
+def get_job_analytics(job_id: str):
     """Get candidates for a specific job grouped by tier"""
     try:
         # Convert to ObjectId if possible
@@ -540,7 +805,7 @@ async def get_job_analytics(job_id: str):
 
 
 @app.get("/candidates/{candidate_id}/resume")
-async def get_candidate_resume(candidate_id: str):
+def get_candidate_resume(candidate_id: str):
     """Stream the candidate's resume PDF"""
     try:
         app = applications.find_one({"_id": ObjectId(candidate_id)})
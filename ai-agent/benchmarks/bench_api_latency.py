@@ -0,0 +1,182 @@
+"""
+API latency under concurrent load: handlers running their pymongo calls on
+the event loop (how api.py used to declare them, `async def`) against the
+same handlers as plain `def`, which FastAPI runs on its threadpool.
+
+    python -m benchmarks.bench_api_latency
+    python -m benchmarks.bench_api_latency --clients 50 --db-latency-ms 5
+
+The database is in-memory (mongomock) behind a proxy that sleeps like a
+network round trip: --db-latency-ms per query, --list-latency-ms for the
+collection scan behind /candidates_list. Every client mostly fetches single
+candidates and sometimes the full list, as the dashboard does. The API is
+served by uvicorn in a forked process, so a blocked event loop shows up in
+the clients' latencies and the clients don't compete with it for the GIL.
+"""
+import argparse
+import asyncio
+import functools
+import inspect
+import multiprocessing
+import socket
+import statistics
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List
+
+import httpx
+import mongomock
+import uvicorn
+from fastapi import FastAPI
+from fastapi.routing import APIRoute
+
+import api
+
+
+class SlowCollection:
+    """Delegates to a collection, sleeping first as if the query crossed the network."""
+
+    def __init__(self, collection, latency_seconds: float, overrides: Dict[str, float]):
+        self._collection = collection
+        self._latency = latency_seconds
+        self._overrides = overrides
+
+    def __getattr__(self, name):
+        attr = getattr(self._collection, name)
+        if not callable(attr):
+            return attr
+        delay = self._overrides.get(name, self._latency)
+
+        def call(*args, **kwargs):
+            time.sleep(delay)
+            return attr(*args, **kwargs)
+        return call
+
+
+def _on_event_loop(handler):
+    @functools.wraps(handler)
+    async def run(*args, **kwargs):
+        return handler(*args, **kwargs)
+    return run
+
+
+def event_loop_app() -> FastAPI:
+    """The API as it was: the same handlers, declared `async def`, blocking the event loop."""
+    before = FastAPI()
+    for route in api.app.routes:
+        if not isinstance(route, APIRoute):
+            continue
+        endpoint = route.endpoint
+        if not inspect.iscoroutinefunction(endpoint):
+            endpoint = _on_event_loop(endpoint)
+        before.add_api_route(
+            route.path,
+            endpoint,
+            methods=list(route.methods),
+            response_model=route.response_model,
+            response_class=route.response_class,
+        )
+    return before
+
+
+def seed(size: int):
+    collection = mongomock.MongoClient().db.applications
+    ids = collection.insert_many([
+        {
+            "jobId": f"JOB{i % 5}",
+            "personalInfo": {"firstName": "Candidate", "lastName": str(i)},
+            "status": "evaluated",
+            "scores": {"overallScore": i % 100},
+            "tier": {"code": "B5", "letter": "B"},
+            "createdAt": datetime(2024, 1, 1),
+            "lastEvaluatedAt": datetime(2024, 1, 2),
+        }
+        for i in range(size)
+    ]).inserted_ids
+    return collection, [str(i) for i in ids]
+
+
+class ServerProcess:
+    """Serves `app` with uvicorn from a forked process for the duration of a `with` block."""
+
+    def __init__(self, app: FastAPI):
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            self.port = probe.getsockname()[1]
+        # Forked, so the child inherits the seeded in-memory database
+        self.process = multiprocessing.get_context("fork").Process(
+            target=uvicorn.run, args=(app,), kwargs={"port": self.port, "log_level": "warning"}, daemon=True
+        )
+
+    def __enter__(self) -> str:
+        self.process.start()
+        base_url = f"http://127.0.0.1:{self.port}"
+        deadline = time.monotonic() + 10
+        while True:
+            try:
+                httpx.get(base_url + "/")
+                return base_url
+            except httpx.TransportError:
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.05)
+
+    def __exit__(self, *exc):
+        self.process.terminate()
+        self.process.join()
+
+
+async def measure(base_url: str, ids: List[str], args) -> Dict[str, List[float]]:
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    limits = httpx.Limits(max_connections=args.clients)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=None) as client:
+        async def user(n: int):
+            for i in range(args.requests):
+                if (n + i) % args.list_every == 0:
+                    label, path = "/candidates_list", "/candidates_list"
+                else:
+                    label, path = "/candidates/{id}", f"/candidates/{ids[(n * 31 + i) % len(ids)]}"
+                started = time.perf_counter()
+                response = await client.get(path)
+                response.raise_for_status()
+                latencies[label].append((time.perf_counter() - started) * 1000)
+
+        await asyncio.gather(*(user(n) for n in range(args.clients)))
+    return latencies
+
+
+def percentile(values: List[float], pct: int) -> float:
+    return statistics.quantiles(values, n=100, method="inclusive")[pct - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=20, help="concurrent clients")
+    parser.add_argument("--requests", type=int, default=20, help="requests per client")
+    parser.add_argument("--list-every", type=int, default=10, help="one /candidates_list per this many requests")
+    parser.add_argument("--db-latency-ms", type=float, default=20)
+    parser.add_argument("--list-latency-ms", type=float, default=500)
+    parser.add_argument("--size", type=int, default=200, help="applications in the collection")
+    args = parser.parse_args()
+
+    collection, ids = seed(args.size)
+    api.applications = SlowCollection(
+        collection, args.db_latency_ms / 1000, {"find": args.list_latency_ms / 1000}
+    )
+
+    print(f"{args.clients} clients x {args.requests} requests, "
+          f"{args.db_latency_ms:g} ms per query, {args.list_latency_ms:g} ms per list scan")
+    print(f"{'':24}{'endpoint':20}{'p50 ms':>10}{'p99 ms':>10}{'req/s':>10}")
+    for name, app in (("async def (event loop)", event_loop_app()), ("def (threadpool)", api.app)):
+        with ServerProcess(app) as base_url:
+            started = time.perf_counter()
+            latencies = asyncio.run(measure(base_url, ids, args))
+            throughput = sum(len(v) for v in latencies.values()) / (time.perf_counter() - started)
+        for label, values in sorted(latencies.items()):
+            print(f"{name:24}{label:20}{percentile(values, 50):10.1f}{percentile(values, 99):10.1f}{throughput:10.1f}")
+            name = ""
+
+
+if __name__ == "__main__":
+    main()
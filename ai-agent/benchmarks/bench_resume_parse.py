@@ -0,0 +1,100 @@
+"""
+CPU time per resume: the old two-pass parsing (extract_text + a separate
+extract_pages walk for design metrics) against the single parse_resume pass.
+
+    python -m benchmarks.bench_resume_parse                 # synthetic corpus
+    python -m benchmarks.bench_resume_parse --corpus ./pdfs # your own PDFs
+
+--pool additionally measures wall-clock throughput of the parsing process
+pool (RESUME_PARSE_WORKERS workers) against parsing on threads in-process.
+"""
+import argparse
+import io
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, List
+
+from pdfminer.high_level import extract_pages, extract_text
+
+from benchmarks.sample_pdfs import sample_corpus
+from config import RESUME_PARSE_WORKERS
+from ingestion.parse_pool import get_pool, parse_resume_in_pool, reset_pool
+from ingestion.resume import design_metrics, parse_resume
+
+
+def two_pass(pdf_bytes: bytes):
+    """What evaluate_candidate used to do: one pdfminer pass for text, another for fonts."""
+    text = extract_text(io.BytesIO(pdf_bytes))
+    sizes = [
+        character.size
+        for page in extract_pages(io.BytesIO(pdf_bytes))
+        for element in page
+        if hasattr(element, "get_text")
+        for line in element
+        if hasattr(line, "__iter__")
+        for character in line
+        if hasattr(character, "fontname")
+    ]
+    return text, sizes
+
+
+def single_pass(pdf_bytes: bytes):
+    parsed = parse_resume(pdf_bytes)
+    return parsed.text, design_metrics(parsed)
+
+
+def cpu_seconds(fn: Callable[[bytes], object], corpus: List[bytes], rounds: int) -> float:
+    started = time.process_time()
+    for _ in range(rounds):
+        for pdf_bytes in corpus:
+            fn(pdf_bytes)
+    return time.process_time() - started
+
+
+def resumes_per_second(fn: Callable[[bytes], object], corpus: List[bytes], threads: int) -> float:
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(fn, corpus))
+    return len(corpus) / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", type=Path, help="directory of PDF resumes (default: synthetic)")
+    parser.add_argument("--size", type=int, default=20, help="synthetic corpus size")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--pool", action="store_true", help="also measure process-pool throughput")
+    args = parser.parse_args()
+
+    if args.corpus:
+        corpus = [p.read_bytes() for p in sorted(args.corpus.glob("*.pdf"))]
+    else:
+        corpus = sample_corpus(args.size)
+    if not corpus:
+        raise SystemExit("No PDFs found")
+
+    runs = len(corpus) * args.rounds
+    before = cpu_seconds(two_pass, corpus, args.rounds) / runs * 1000
+    after = cpu_seconds(single_pass, corpus, args.rounds) / runs * 1000
+
+    print(f"{len(corpus)} resumes x {args.rounds} rounds")
+    print(f"two-pass:    {before:8.1f} ms CPU / resume")
+    print(f"single-pass: {after:8.1f} ms CPU / resume")
+    print(f"saved:       {before - after:8.1f} ms CPU / resume ({(1 - after / before) * 100:.0f}%)")
+
+    if args.pool:
+        threads = max(1, RESUME_PARSE_WORKERS)
+        # Start the workers before timing so spawn cost isn't counted
+        list(get_pool().map(abs, range(threads)))
+        try:
+            in_process = resumes_per_second(parse_resume, corpus, threads)
+            pooled = resumes_per_second(parse_resume_in_pool, corpus, threads)
+        finally:
+            reset_pool()
+        print(f"in-process threads ({threads}): {in_process:6.1f} resumes/s")
+        print(f"process pool ({threads} workers): {pooled:6.1f} resumes/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Synthetic text resumes for benchmarks and tests.
+
+Writes small but realistic PDFs (several fonts and sizes, multiple pages)
+without needing a PDF library, so the parsing benchmark runs anywhere.
+"""
+import random
+from typing import List
+
+FONTS = ["Helvetica", "Helvetica-Bold", "Times-Roman", "Courier"]
+
+WORDS = (
+    "python fastapi mongodb kubernetes docker react typescript led team shipped "
+    "platform scale latency reduced cost revenue designed built migrated pipeline "
+    "customers product analytics machine learning api service reliability"
+).split()
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_text_pdf(pages: List[List[str]]) -> bytes:
+    """Build a PDF whose pages contain the given lines of text."""
+    objects = []  # object bodies, numbered from 1
+
+    font_ids = []
+    for name in FONTS:
+        objects.append(f"<< /Type /Font /Subtype /Type1 /BaseFont /{name} >>")
+        font_ids.append(len(objects))
+    font_dict = " ".join(f"/F{i} {obj} 0 R" for i, obj in enumerate(font_ids))
+
+    pages_id = len(objects) + 1
+    objects.append(None)  # /Pages placeholder, filled in below
+
+    page_ids = []
+    for lines in pages:
+        stream = ["BT"]
+        y = 760
+        for i, line in enumerate(lines):
+            font = 1 if i % 6 == 0 else (i % len(FONTS))
+            size = 14 if font == 1 else 10
+            stream.append(f"/F{font} {size} Tf 1 0 0 1 50 {y} Tm ({_escape(line)}) Tj")
+            y -= 16
+        stream.append("ET")
+        content = "\n".join(stream)
+        objects.append(f"<< /Length {len(content)} >>\nstream\n{content}\nendstream")
+        content_id = len(objects)
+        objects.append(
+            f"<< /Type /Page /Parent {pages_id} 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << {font_dict} >> >> /Contents {content_id} 0 R >>"
+        )
+        page_ids.append(len(objects))
+
+    kids = " ".join(f"{pid} 0 R" for pid in page_ids)
+    objects[pages_id - 1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>"
+    objects.append(f"<< /Type /Catalog /Pages {pages_id} 0 R >>")
+    catalog_id = len(objects)
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref_at = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode("latin-1")
+    out += (
+        f"trailer\n<< /Size {len(objects) + 1} /Root {catalog_id} 0 R >>\n"
+        f"startxref\n{xref_at}\n%%EOF\n"
+    ).encode("latin-1")
+    return bytes(out)
+
+
+def sample_resume(page_count: int = 2, lines_per_page: int = 40, seed: int = 0) -> bytes:
+    """A resume-like PDF with section headings and bullet lines."""
+    rng = random.Random(seed)
+    headings = ["EXPERIENCE", "PROJECTS", "SKILLS", "EDUCATION", "SUMMARY"]
+    pages = []
+    for p in range(page_count):
+        lines = []
+        for i in range(lines_per_page):
+            if i % 6 == 0:
+                lines.append(headings[(p + i // 6) % len(headings)])
+            else:
+                lines.append("- " + " ".join(rng.choice(WORDS) for _ in range(12)))
+        pages.append(lines)
+    return make_text_pdf(pages)
+
+
+def sample_corpus(size: int = 20) -> List[bytes]:
+    """Resumes of 1-4 pages, deterministic for repeatable benchmark runs."""
+    return [sample_resume(page_count=1 + i % 4, seed=i) for i in range(size)]
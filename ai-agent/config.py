@@ -4,9 +4,101 @@ from dotenv import load_dotenv
 load_dotenv()
 
 MONGODB_URI = os.getenv("MONGODB_URI")
+# Connections per process; the API's threadpool should not outgrow the pool
+MONGODB_MAX_POOL_SIZE = int(os.getenv("MONGODB_MAX_POOL_SIZE", "100"))
+MONGODB_MIN_POOL_SIZE = int(os.getenv("MONGODB_MIN_POOL_SIZE", "5"))
+# Threads serving the API's (synchronous) handlers
+API_THREADPOOL_SIZE = int(os.getenv("API_THREADPOOL_SIZE", "40"))
+# Keep per-job dashboard counters in `job_stats` so /stats doesn't scan every application
+STATS_MATERIALIZED = os.getenv("STATS_MATERIALIZED", "0") == "1"
+# How long the API reuses a job's title/publicFormId for candidate lists
+API_JOB_CACHE_TTL_SECONDS = int(os.getenv("API_JOB_CACHE_TTL_SECONDS", "60"))
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 GEMINI_MODEL = os.getenv("GEMINI_MODEL")
+GEMINI_CONTEXT_CACHE_TTL_SECONDS = int(os.getenv("GEMINI_CONTEXT_CACHE_TTL_SECONDS", "3600"))
+# Count prompt tokens with the SDK's offline tokenizer (needs google-genai[local-tokenizer])
+GEMINI_LOCAL_TOKENIZER = os.getenv("GEMINI_LOCAL_TOKENIZER", "1") == "1"
 GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
 
+# Gemini client limits: provider quota (0 = unlimited), in-flight calls, deadlines, retries
+GEMINI_RPM = int(os.getenv("GEMINI_RPM", "60"))
+GEMINI_TPM = int(os.getenv("GEMINI_TPM", "1000000"))
+GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", "8"))
+GEMINI_TIMEOUT_SECONDS = float(os.getenv("GEMINI_TIMEOUT_SECONDS", "60"))
+GEMINI_DEADLINE_SECONDS = float(os.getenv("GEMINI_DEADLINE_SECONDS", "180"))
+GEMINI_MAX_RETRIES = int(os.getenv("GEMINI_MAX_RETRIES", "4"))
+GEMINI_BACKOFF_BASE_SECONDS = float(os.getenv("GEMINI_BACKOFF_BASE_SECONDS", "1"))
+GEMINI_BACKOFF_MAX_SECONDS = float(os.getenv("GEMINI_BACKOFF_MAX_SECONDS", "30"))
+# Consecutive failed calls that open the circuit breaker, and how long it stays open
+GEMINI_BREAKER_THRESHOLD = int(os.getenv("GEMINI_BREAKER_THRESHOLD", "5"))
+GEMINI_BREAKER_COOLDOWN_SECONDS = float(os.getenv("GEMINI_BREAKER_COOLDOWN_SECONDS", "60"))
+
+# Agent worker tuning
+AGENT_BATCH_SIZE = int(os.getenv("AGENT_BATCH_SIZE", "5"))
+AGENT_CONCURRENCY = int(os.getenv("AGENT_CONCURRENCY", "4"))
+AGENT_LEASE_SECONDS = int(os.getenv("AGENT_LEASE_SECONDS", "300"))
+AGENT_MAX_ATTEMPTS = int(os.getenv("AGENT_MAX_ATTEMPTS", "3"))
+# Deferrals after the model kept failing on an application before it is dead-lettered
+AGENT_MAX_DEFERRALS = int(os.getenv("AGENT_MAX_DEFERRALS", "5"))
+AGENT_POLL_MIN_SECONDS = float(os.getenv("AGENT_POLL_MIN_SECONDS", "1"))
+# Below-normal applications (bulk, deprioritized) move up one priority class per
+# this many minutes waited, up to normal (0 = no aging)
+AGENT_PRIORITY_AGING_MINUTES = float(os.getenv("AGENT_PRIORITY_AGING_MINUTES", "30"))
+# Applicants of the same job scored per model call (1 = one call per applicant)
+EVALUATION_BATCH_SIZE = int(os.getenv("EVALUATION_BATCH_SIZE", "1"))
+# Finished evaluations are written to Mongo in bulk once this many are buffered
+# or the oldest has waited this long
+EVALUATION_WRITE_BATCH_SIZE = int(os.getenv("EVALUATION_WRITE_BATCH_SIZE", "20"))
+EVALUATION_WRITE_MAX_WAIT_SECONDS = float(os.getenv("EVALUATION_WRITE_MAX_WAIT_SECONDS", "2"))
+
+# Resume parsing runs in a process pool; 0 workers parses inline
+RESUME_PARSE_WORKERS = int(os.getenv("RESUME_PARSE_WORKERS", str(os.cpu_count() or 1)))
+RESUME_PARSE_TIMEOUT_SECONDS = float(os.getenv("RESUME_PARSE_TIMEOUT_SECONDS", "30"))
+RESUME_PARSE_MEMORY_MB = int(os.getenv("RESUME_PARSE_MEMORY_MB", "1024"))
+RESUME_MAX_PAGES = int(os.getenv("RESUME_MAX_PAGES", "20"))
+# Resume text sent to the model is compacted to this many tokens
+RESUME_TOKEN_BUDGET = int(os.getenv("RESUME_TOKEN_BUDGET", "3000"))
+
+# Parsed-resume cache: in-memory LRU in front of an on-disk store ("" disables the disk tier)
+RESUME_CACHE_MEMORY_ITEMS = int(os.getenv("RESUME_CACHE_MEMORY_ITEMS", "512"))
+RESUME_CACHE_DIR = os.getenv(
+    "RESUME_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "resumes")
+)
+RESUME_CACHE_MAX_MB = int(os.getenv("RESUME_CACHE_MAX_MB", "256"))
+
+# GitHub profile analysis: shared client, per-username cache, rate-limit headroom
+GITHUB_POOL_SIZE = int(os.getenv("GITHUB_POOL_SIZE", "10"))
+GITHUB_CACHE_ITEMS = int(os.getenv("GITHUB_CACHE_ITEMS", "5000"))
+GITHUB_CACHE_TTL_SECONDS = int(os.getenv("GITHUB_CACHE_TTL_SECONDS", "3600"))
+GITHUB_RATE_LIMIT_RESERVE = int(os.getenv("GITHUB_RATE_LIMIT_RESERVE", "100"))
+GITHUB_USE_GRAPHQL = os.getenv("GITHUB_USE_GRAPHQL", "1") == "1"
+
+# Shared HTTP client for LinkedIn/portfolio scraping
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_PER_HOST_LIMIT = int(os.getenv("HTTP_PER_HOST_LIMIT", "4"))
+HTTP_MAX_BYTES = int(os.getenv("HTTP_MAX_BYTES", str(2 * 1024 * 1024)))
+
+# Per-candidate budget for the GitHub/LinkedIn/portfolio analyses, which run concurrently
+EVALUATION_SOURCE_DEADLINE_SECONDS = float(os.getenv("EVALUATION_SOURCE_DEADLINE_SECONDS", "12"))
+EVALUATION_SOURCE_WORKERS = int(os.getenv("EVALUATION_SOURCE_WORKERS", "16"))
+
+# Reuse a finished evaluation for an identical resume, links, job description, prompt and model
+EVALUATION_CACHE_ENABLED = os.getenv("EVALUATION_CACHE_ENABLED", "1") == "1"
+EVALUATION_CACHE_TTL_DAYS = int(os.getenv("EVALUATION_CACHE_TTL_DAYS", "30"))
+
+# Keyword pre-screen before the model: "off", "shadow" (record decisions only) or "enforce".
+# Thresholds are the share of job-description terms found in the resume.
+PRESCREEN_MODE = os.getenv("PRESCREEN_MODE", "shadow")
+PRESCREEN_REJECT_BELOW = float(os.getenv("PRESCREEN_REJECT_BELOW", "0.05"))
+PRESCREEN_LOW_PRIORITY_BELOW = float(os.getenv("PRESCREEN_LOW_PRIORITY_BELOW", "0.15"))
+PRESCREEN_FAST_TRACK_ABOVE = float(os.getenv("PRESCREEN_FAST_TRACK_ABOVE", "0.5"))
+PRESCREEN_MIN_JOB_TERMS = int(os.getenv("PRESCREEN_MIN_JOB_TERMS", "8"))
+PRESCREEN_LOW_PRIORITY_DELAY_SECONDS = int(os.getenv("PRESCREEN_LOW_PRIORITY_DELAY_SECONDS", "900"))
+
+# Job descriptions cached per jobId. Edits reach the cache through a change stream on `jobs`;
+# where change streams are unavailable the TTL bounds how stale a description can get.
+JOB_CACHE_MAX_ITEMS = int(os.getenv("JOB_CACHE_MAX_ITEMS", "1000"))
+JOB_CACHE_TTL_SECONDS = int(os.getenv("JOB_CACHE_TTL_SECONDS", "300"))
+
 if GEMINI_API_KEY is None:
-    raise RuntimeError("GEMINI API Key Not Set In Environemt")
\ No newline at end of file
+    raise RuntimeError("GEMINI API Key Not Set In Environemt")
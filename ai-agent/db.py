@@ -1,21 +1,112 @@
 # MongoDB + GridFS Helper
 
-from datetime import datetime
-from typing import List, Dict, Any, Optional
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional, Tuple
 
-from pymongo import MongoClient
+from pymongo import MongoClient, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
 import gridfs
 from bson import ObjectId
 
-from config import MONGODB_URI
+from config import (
+    MONGODB_URI,
+    MONGODB_MAX_POOL_SIZE,
+    MONGODB_MIN_POOL_SIZE,
+    AGENT_LEASE_SECONDS,
+    AGENT_MAX_ATTEMPTS,
+    AGENT_MAX_DEFERRALS,
+    AGENT_PRIORITY_AGING_MINUTES,
+    EVALUATION_CACHE_TTL_DAYS,
+    STATS_MATERIALIZED,
+)
 
-client = MongoClient(MONGODB_URI)
+client = MongoClient(MONGODB_URI, maxPoolSize=MONGODB_MAX_POOL_SIZE, minPoolSize=MONGODB_MIN_POOL_SIZE)
 db = client.get_default_database()
 applications = db["applications"]
 fs = gridfs.GridFS(db)
 candidates = db["candidates"]
 evaluations = db["evaluations"]
 jobs = db["jobs"]
+evaluation_cache = db["evaluation_cache"]
+job_stats = db["job_stats"]
+
+logger = logging.getLogger(__name__)
+
+# Queue priority classes; higher is claimed first
+PRIORITY_MANUAL = 20   # a recruiter asked for a re-evaluation
+PRIORITY_NORMAL = 0
+PRIORITY_LOW = -1      # pushed back by the pre-screen
+PRIORITY_BULK = -10    # bulk imports
+
+# Below-normal applications waiting this long move up one priority class (aging)
+_AGING_SECONDS = AGENT_PRIORITY_AGING_MINUTES * 60
+
+_ANY_JOB = object()
+
+DUPLICATE_KEY = 11000
+
+# Dashboard classification: a recruiter's decision wins, otherwise the tier decides
+SELECTED_QUERY = {
+    "$or": [
+        {"status": "accepted"},
+        {"status": {"$nin": ["accepted", "rejected"]}, "tier.letter": {"$in": ["A", "B"]}}
+    ]
+}
+REJECTED_QUERY = {
+    "$or": [
+        {"status": "rejected"},
+        {"status": {"$nin": ["accepted", "rejected"]}, "tier.letter": "F"}
+    ]
+}
+# The same predicates as aggregation expressions
+SELECTED_EXPR = {
+    "$or": [
+        {"$eq": ["$status", "accepted"]},
+        {"$and": [
+            {"$ne": ["$status", "rejected"]},
+            {"$ne": ["$status", "accepted"]},
+            {"$in": ["$tier.letter", ["A", "B"]]}
+        ]}
+    ]
+}
+REJECTED_EXPR = {
+    "$or": [
+        {"$eq": ["$status", "rejected"]},
+        {"$and": [
+            {"$ne": ["$status", "accepted"]},
+            {"$ne": ["$status", "rejected"]},
+            {"$eq": ["$tier.letter", "F"]}
+        ]}
+    ]
+}
+
+
+def ensure_indexes():
+    """Create the indexes the agent and API rely on (idempotent)."""
+    # Claim order: priority class, then age; globally and within a job
+    applications.create_index([("status", 1), ("priority", -1), ("createdAt", 1)])
+    applications.create_index([("status", 1), ("jobId", 1), ("priority", -1), ("createdAt", 1)])
+    # Candidate list pages: newest first, keyset on (createdAt, _id), optionally per job/status/tier
+    applications.create_index([("createdAt", -1), ("_id", -1)])
+    for field in ("jobId", "status", "tier.letter"):
+        applications.create_index([(field, 1), ("createdAt", -1), ("_id", -1)])
+    # Applications from before priorities existed would otherwise sort below every class
+    applications.update_many(
+        {"status": "pending", "priority": {"$exists": False}},
+        {"$set": {"priority": PRIORITY_NORMAL}}
+    )
+    # One history row per evaluation attempt, so writing a batch twice (a retry after a crash) is harmless
+    evaluations.create_index(
+        [("application_id", 1), ("attempt", 1)],
+        unique=True,
+        partialFilterExpression={"attempt": {"$exists": True}}
+    )
+    # Dashboard lists of the latest selected/rejected applications (STATS_MATERIALIZED)
+    applications.create_index([("statsBucket", 1), ("lastEvaluatedAt", -1)])
+    # Cached evaluations expire so re-scraped GitHub/portfolio data is eventually picked up
+    evaluation_cache.create_index("createdAt", expireAfterSeconds=EVALUATION_CACHE_TTL_DAYS * 86400)
 
 def get_pending_applications(limit: int = 10) -> List[Dict[str,Any]]:
     """Fetch Applications that still need AI Evaluation."""
@@ -27,6 +118,261 @@ def get_pending_applications(limit: int = 10) -> List[Dict[str,Any]]:
 
     return list(cursor)
 
+def _ready_query(now: datetime) -> Dict[str, Any]:
+    return {
+        "status": "pending",
+        # Deferred applications wait until their retry time
+        "$or": [{"retryAt": {"$exists": False}}, {"retryAt": {"$lte": now}}]
+    }
+
+def claim_pending_application(
+        worker_id: str,
+        lease_seconds: int = AGENT_LEASE_SECONDS,
+        job_id: Any = _ANY_JOB
+    ) -> Optional[Dict[str, Any]]:
+    """
+    Atomically move the next pending application (highest priority, then oldest)
+    to 'processing' under a lease, optionally only from one job.
+    """
+    now = datetime.utcnow()
+    query = _ready_query(now)
+    if job_id is not _ANY_JOB:
+        query["jobId"] = job_id
+    return applications.find_one_and_update(
+        query,
+        {
+            "$set": {
+                "status": "processing",
+                "lease": {
+                    "workerId": worker_id,
+                    "expiresAt": now + timedelta(seconds=lease_seconds)
+                },
+                "updatedAt": now
+            },
+            # `attempts` is reset and refunded for retries; `claims` only grows and numbers evaluation attempts
+            "$inc": {"attempts": 1, "claims": 1}
+        },
+        sort=[("priority", -1), ("createdAt", 1)],
+        return_document=ReturnDocument.AFTER
+    )
+
+def extend_leases(app_ids: List[Any], worker_id: str, lease_seconds: int = AGENT_LEASE_SECONDS) -> int:
+    """Push back the lease expiry of applications `worker_id` is still processing; returns how many."""
+    if not app_ids:
+        return 0
+    now = datetime.utcnow()
+    result = applications.update_many(
+        {"_id": {"$in": list(app_ids)}, "status": "processing", "lease.workerId": worker_id},
+        {"$set": {"lease.expiresAt": now + timedelta(seconds=lease_seconds), "updatedAt": now}}
+    )
+    return result.modified_count
+
+def _job_head(job_id: Any, now: datetime) -> Optional[Dict[str, Any]]:
+    """The next application `job_id` would hand out ({priority, createdAt}), or None."""
+    return applications.find_one(
+        {**_ready_query(now), "jobId": job_id},
+        {"priority": 1, "createdAt": 1},
+        sort=[("priority", -1), ("createdAt", 1)]
+    )
+
+def _job_heads(now: datetime) -> Dict[Any, Dict[str, Any]]:
+    """
+    The next application each job would hand out: jobId -> {priority, createdAt}.
+    One distinct over the (status, jobId, ...) index, then one indexed read per
+    job, so the cost follows the number of jobs rather than the queue depth.
+    """
+    heads = {}
+    job_ids = applications.distinct("jobId", {"status": "pending"})
+    # distinct leaves out applications without a jobId; they queue as job None
+    if None not in job_ids:
+        job_ids.append(None)
+    for job_id in job_ids:
+        head = _job_head(job_id, now)
+        if head is not None:
+            heads[job_id] = head
+    return heads
+
+def _effective_class(head: Dict[str, Any], now: datetime) -> int:
+    """
+    Below-normal classes rise one level per aging period waited, up to normal,
+    where per-job fairness takes over. Aging never lifts anything above normal,
+    so an old bulk import can't overtake fresh applicants.
+    """
+    priority = head.get("priority") or PRIORITY_NORMAL
+    if priority >= PRIORITY_NORMAL or _AGING_SECONDS <= 0:
+        return priority
+    waited = (now - (head.get("createdAt") or now)).total_seconds()
+    return min(PRIORITY_NORMAL, priority + int(waited // _AGING_SECONDS))
+
+def claim_pending_applications(
+        worker_id: str,
+        limit: int = 10,
+        lease_seconds: int = AGENT_LEASE_SECONDS
+    ) -> List[Dict[str, Any]]:
+    """
+    Claim up to `limit` pending applications for this worker, fairly across jobs.
+
+    Each slot goes to the job whose next application has the highest aged
+    priority class; within a class, to the job served least in this batch,
+    then the one waiting longest. So one job's bulk import can't starve
+    fresh applicants to other jobs.
+    """
+    now = datetime.utcnow()
+    heads = _job_heads(now)
+    served: Dict[Any, int] = {}
+    claimed = []
+    while len(claimed) < limit and heads:
+        job_id = max(
+            heads,
+            key=lambda j: (
+                _effective_class(heads[j], now),
+                -served.get(j, 0),
+                now - (heads[j].get("createdAt") or now)
+            )
+        )
+        app = claim_pending_application(worker_id, lease_seconds, job_id=job_id)
+        if app is None:
+            # Another worker emptied this job's queue
+            del heads[job_id]
+            continue
+        claimed.append(app)
+        served[job_id] = served.get(job_id, 0) + 1
+
+        next_app = _job_head(job_id, now)
+        if next_app is None:
+            del heads[job_id]
+        else:
+            heads[job_id] = next_app
+    return claimed
+
+def queue_stats() -> List[Dict[str, Any]]:
+    """Per-job queue depth and how long the oldest pending application has waited."""
+    now = datetime.utcnow()
+    rows = applications.aggregate([
+        {"$match": {"status": {"$in": ["pending", "processing"]}}},
+        {"$group": {
+            "_id": "$jobId",
+            "pending": {"$sum": {"$cond": [{"$eq": ["$status", "pending"]}, 1, 0]}},
+            "processing": {"$sum": {"$cond": [{"$eq": ["$status", "processing"]}, 1, 0]}},
+            "oldestCreatedAt": {"$min": {"$cond": [{"$eq": ["$status", "pending"]}, "$createdAt", None]}},
+            "topPriority": {"$max": "$priority"}
+        }}
+    ])
+    stats = []
+    for row in rows:
+        oldest = row.get("oldestCreatedAt")
+        stats.append({
+            "jobId": str(row["_id"]) if row["_id"] is not None else None,
+            "pending": row["pending"],
+            "processing": row["processing"],
+            "topPriority": row.get("topPriority"),
+            "oldestWaitSeconds": round((now - oldest).total_seconds()) if oldest else 0
+        })
+    return sorted(stats, key=lambda row: row["oldestWaitSeconds"], reverse=True)
+
+def requeue_application(app_id, priority: int = PRIORITY_MANUAL) -> bool:
+    """
+    Queue an application for a fresh evaluation ahead of normal traffic.
+    `forceFresh` makes the agent skip the evaluation cache for it once.
+    """
+    result = applications.update_one(
+        {"_id": app_id, "status": {"$ne": "processing"}},
+        {
+            "$set": {
+                "status": "pending",
+                "priority": priority,
+                "attempts": 0,
+                "deferrals": 0,
+                "forceFresh": True,
+                "updatedAt": datetime.utcnow()
+            },
+            "$unset": {"retryAt": "", "lastError": ""}
+        }
+    )
+    return result.matched_count > 0
+
+def reclaim_expired_leases(max_attempts: int = AGENT_MAX_ATTEMPTS) -> Dict[str, int]:
+    """Return applications whose worker lease expired to the queue, or dead-letter them."""
+    now = datetime.utcnow()
+    expired = {
+        "status": "processing",
+        "lease.expiresAt": {"$lt": now}
+    }
+    dead = applications.update_many(
+        {**expired, "attempts": {"$gte": max_attempts}},
+        {
+            "$set": {"status": "dead_letter", "lastError": "Lease expired", "updatedAt": now},
+            "$unset": {"lease": ""}
+        }
+    )
+    requeued = applications.update_many(
+        expired,
+        {
+            "$set": {"status": "pending", "updatedAt": now},
+            "$unset": {"lease": ""}
+        }
+    )
+    return {"requeued": requeued.modified_count, "dead_lettered": dead.modified_count}
+
+def release_application(
+        app_id,
+        worker_id: str,
+        error: str,
+        max_attempts: int = AGENT_MAX_ATTEMPTS
+    ) -> Optional[str]:
+    """Give up a claimed application after a failure; returns the new status."""
+    app = applications.find_one(
+        {"_id": app_id, "status": "processing", "lease.workerId": worker_id},
+        {"attempts": 1}
+    )
+    if not app:
+        # Lease already reclaimed by someone else
+        return None
+    status = "dead_letter" if app.get("attempts", 0) >= max_attempts else "pending"
+    applications.update_one(
+        {"_id": app_id, "status": "processing", "lease.workerId": worker_id},
+        {
+            "$set": {"status": status, "lastError": error, "updatedAt": datetime.utcnow()},
+            "$unset": {"lease": ""}
+        }
+    )
+    return status
+
+def defer_application(
+        app_id,
+        worker_id: str,
+        retry_at: datetime,
+        reason: str,
+        priority: Optional[int] = None,
+        counted: bool = False,
+        max_deferrals: int = AGENT_MAX_DEFERRALS
+    ) -> Optional[str]:
+    """
+    Put a claimed application back in the queue until `retry_at`, without counting the attempt.
+    `priority`, if given, replaces the application's queue priority. A `counted`
+    deferral adds to `deferrals`, and the one reaching `max_deferrals`
+    dead-letters the application instead. Returns the new status.
+    """
+    now = datetime.utcnow()
+    owned = {"_id": app_id, "status": "processing", "lease.workerId": worker_id}
+    if counted:
+        dead = applications.update_one(
+            {**owned, "deferrals": {"$gte": max_deferrals - 1}},
+            {
+                "$set": {"status": "dead_letter", "lastError": reason, "updatedAt": now},
+                "$unset": {"lease": "", "retryAt": ""},
+                "$inc": {"deferrals": 1}
+            }
+        )
+        if dead.matched_count:
+            return "dead_letter"
+    fields: Dict[str, Any] = {"status": "pending", "retryAt": retry_at, "lastError": reason, "updatedAt": now}
+    if priority is not None:
+        fields["priority"] = priority
+    inc = {"attempts": -1, "deferrals": 1} if counted else {"attempts": -1}
+    deferred = applications.update_one(owned, {"$set": fields, "$unset": {"lease": ""}, "$inc": inc})
+    return "pending" if deferred.matched_count else None
+
 def get_resume_bytes(file_id) -> Optional[bytes]:
     """Read Resume From GridFS; Return raw Bytes."""
     if not file_id:
@@ -35,33 +381,248 @@ def get_resume_bytes(file_id) -> Optional[bytes]:
 
     return grid_out.read()
 
+def _owner_filter(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Matches the application only while the claim that produced `result` still holds it."""
+    query: Dict[str, Any] = {"_id": result["app_id"], "status": "processing"}
+    if result.get("attempt") is not None:
+        query["claims"] = result["attempt"]
+    return query
+
+def write_evaluations(results: List[Dict[str, Any]]) -> int:
+    """
+    Write a batch of finished evaluations with one unordered insert_many into
+    the evaluations history and one unordered bulk_write on applications
+    (with STATS_MATERIALIZED, one find_one_and_update per application).
+    Each result has app_id, scores, tier and optionally details and attempt
+    (the application's `claims` count). Only results whose claim still holds
+    the application are written: one whose lease was reclaimed, or that a
+    recruiter decided on meanwhile, is dropped. Rows already stored for the
+    same (application_id, attempt) are skipped, so a batch can safely be
+    written again. History goes first: an application is never marked
+    evaluated without its row. Returns the number of history rows inserted.
+    """
+    if not results:
+        return 0
+    now = datetime.utcnow()
+    held = {
+        app["_id"]: app
+        for app in applications.find(
+            {"_id": {"$in": [result["app_id"] for result in results]}, "status": "processing"},
+            {"claims": 1}
+        )
+    }
+    owned = [
+        result for result in results
+        if result["app_id"] in held
+        and (result.get("attempt") is None or held[result["app_id"]].get("claims") == result["attempt"])
+    ]
+    if len(owned) < len(results):
+        logger.warning(f"Dropping {len(results) - len(owned)} evaluations whose claim no longer holds the application")
+    if not owned:
+        return 0
+
+    docs = []
+    for result in owned:
+        doc = {
+            "application_id": result["app_id"],
+            "scores": result["scores"],
+            "tier": result["tier"],
+            "evaluatedAt": now,
+            **(result.get("details") or {})
+        }
+        if result.get("attempt") is not None:
+            doc["attempt"] = result["attempt"]
+        docs.append(doc)
+
+    buckets = {result["app_id"]: stats_bucket("evaluated", result["tier"]) for result in owned}
+
+    inserted = len(docs)
+    try:
+        evaluations.insert_many(docs, ordered=False)
+    except BulkWriteError as e:
+        if e.details.get("writeConcernErrors"):
+            raise
+        write_errors = e.details.get("writeErrors", [])
+        inserted -= len(write_errors)
+        # A row that can't be stored (e.g. too large) only holds back its own application
+        rejected = set()
+        for err in write_errors:
+            if err.get("code") != DUPLICATE_KEY:
+                rejected.add(err["index"])
+                logger.error(f"Could not store the evaluation of {docs[err['index']]['application_id']}: {err.get('errmsg')}")
+        owned = [result for i, result in enumerate(owned) if i not in rejected]
+        if not owned:
+            return inserted
+
+    updates = [
+        (
+            _owner_filter(result),
+            {
+                "$set": {
+                    "scores": result["scores"],
+                    "tier": result["tier"],
+                    "status": "evaluated",
+                    "statsBucket": buckets[result["app_id"]],
+                    "lastEvaluatedAt": now,
+                    "updatedAt": now
+                },
+                "$unset": {"lease": "", "lastError": "", "retryAt": "", "forceFresh": ""}
+            }
+        )
+        for result in owned
+    ]
+    if STATS_MATERIALIZED:
+        # One swap per application, so each counter move starts from the bucket the
+        # application actually left; moves made before a failure are still recorded
+        moves = []
+        try:
+            for query, update in updates:
+                app = applications.find_one_and_update(
+                    query, update, projection={"jobId": 1, "statsBucket": 1}, return_document=ReturnDocument.BEFORE
+                )
+                if app:
+                    moves.append((app.get("jobId"), app.get("statsBucket"), buckets[app["_id"]]))
+        finally:
+            record_stats_moves(moves)
+        matched = len(moves)
+    else:
+        matched = applications.bulk_write([UpdateOne(query, update) for query, update in updates], ordered=False).matched_count
+    if matched < len(owned):
+        logger.warning(f"Dropped {len(owned) - matched} evaluations that lost their claim while writing")
+    return inserted
+
+def stats_bucket(status: Optional[str], tier: Optional[Dict[str, Any]]) -> str:
+    """Where an application counts on the dashboard: "selected", "rejected" or "open"."""
+    if status == "accepted":
+        return "selected"
+    if status == "rejected":
+        return "rejected"
+    letter = (tier or {}).get("letter")
+    if letter in ("A", "B"):
+        return "selected"
+    if letter == "F":
+        return "rejected"
+    return "open"
+
+def record_stats_moves(moves: List[Tuple[Any, Optional[str], str]]):
+    """
+    Apply (jobId, old bucket, new bucket) changes to the materialized job
+    stats. An old bucket of None means the application wasn't counted yet.
+    """
+    increments: Dict[Any, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+    for job_id, old, new in moves:
+        if old == new:
+            continue
+        inc = increments[job_id]
+        if old is None:
+            inc["total"] += 1
+        elif old != "open":
+            inc[old] -= 1
+        if new != "open":
+            inc[new] += 1
+    now = datetime.utcnow()
+    for job_id, inc in increments.items():
+        changed = {field: n for field, n in inc.items() if n}
+        if changed:
+            job_stats.update_one({"_id": job_id}, {"$inc": changed, "$set": {"updatedAt": now}}, upsert=True)
+
+def set_application_status(app_id, status: str) -> bool:
+    """Record a recruiter's decision on an application; False if it doesn't exist."""
+    fields: Dict[str, Any] = {"status": status, "updatedAt": datetime.utcnow()}
+    if not STATS_MATERIALIZED:
+        return applications.update_one({"_id": app_id}, {"$set": fields}).matched_count > 0
+    while True:
+        app = applications.find_one({"_id": app_id}, {"jobId": 1, "tier": 1, "statsBucket": 1})
+        if not app:
+            return False
+        fields["statsBucket"] = stats_bucket(status, app.get("tier"))
+        # Swap only from the bucket just read; a concurrent move makes us read again
+        swapped = applications.update_one(
+            {"_id": app_id, "statsBucket": app.get("statsBucket"), "tier.letter": (app.get("tier") or {}).get("letter")},
+            {"$set": fields}
+        )
+        if swapped.matched_count:
+            record_stats_moves([(app.get("jobId"), app.get("statsBucket"), fields["statsBucket"])])
+            return True
+
+def rebuild_job_stats() -> int:
+    """
+    Recount the materialized job stats from scratch: stamp every application
+    with its bucket, then replace `job_stats` with per-job counts. Returns the
+    number of jobs. Counter updates made while it runs are lost, so it is a
+    one-off (`agent_loop.py --rebuild-stats`) with nothing else writing.
+    """
+    applications.update_many(SELECTED_QUERY, {"$set": {"statsBucket": "selected"}})
+    applications.update_many(REJECTED_QUERY, {"$set": {"statsBucket": "rejected"}})
+    applications.update_many({"$nor": [SELECTED_QUERY, REJECTED_QUERY]}, {"$set": {"statsBucket": "open"}})
+    applications.aggregate([
+        {"$group": {
+            "_id": "$jobId",
+            "total": {"$sum": 1},
+            "selected": {"$sum": {"$cond": [{"$eq": ["$statsBucket", "selected"]}, 1, 0]}},
+            "rejected": {"$sum": {"$cond": [{"$eq": ["$statsBucket", "rejected"]}, 1, 0]}}
+        }},
+        {"$out": job_stats.name}
+    ])
+    return job_stats.count_documents({})
+
 def update_application_evaluation(
         app_id,
         scores: Dict[str, float],
-        tier: Dict[str,Any]
+        tier: Dict[str,Any],
+        details: Optional[Dict[str, Any]] = None,
+        attempt: Optional[int] = None
     ):
-    """Write AI Evaluations Results back to Mongo and store detailed evaluation."""
-    now = datetime.utcnow()
-    # Update the application status
-    applications.update_one(
+    """
+    Write one AI Evaluation back to Mongo and store the detailed evaluation.
+    `details` (e.g. per-source timings) only goes into the evaluations history.
+    """
+    write_evaluations([{"app_id": app_id, "scores": scores, "tier": tier, "details": details, "attempt": attempt}])
+
+def get_cached_evaluation(key: str) -> Optional[Dict[str, Any]]:
+    """A previous evaluation with the same cache key, if any."""
+    return evaluation_cache.find_one({"_id": key})
+
+def save_cached_evaluation(
+        key: str,
+        scores: Dict[str, Any],
+        tier: Dict[str, Any],
+        prompt_version: str,
+        model: Optional[str]
+    ):
+    evaluation_cache.replace_one(
+        {"_id": key},
         {
-            "_id": app_id
+            "scores": scores,
+            "tier": tier,
+            "promptVersion": prompt_version,
+            "model": model,
+            "createdAt": datetime.utcnow()
         },
-        {
-            "$set": {
-                "scores": scores,
-                "tier": tier,
-                "status": "evaluated",
-                "lastEvaluatedAt": now,
-                "updatedAt": now
-            }
-        }
+        upsert=True
     )
-    # Also insert a record into the evaluations collection for historical tracking
-    evaluation_doc = {
-        "application_id": app_id,
-        "scores": scores,
-        "tier": tier,
-        "evaluatedAt": now
-    }
-    evaluations.insert_one(evaluation_doc)
\ No newline at end of file
+
+def clear_evaluation_cache(keep: Optional[Dict[str, Any]] = None) -> int:
+    """
+    Drop cached evaluations. With `keep` (e.g. {"promptVersion": ..., "model": ...})
+    only entries that differ from it in any field are removed.
+    Returns the number of entries deleted.
+    """
+    query: Dict[str, Any] = {}
+    if keep:
+        query["$or"] = [{field: {"$ne": value}} for field, value in keep.items()]
+    return evaluation_cache.delete_many(query).deleted_count
+
+def evaluation_cache_hit_rate(since: Optional[datetime] = None) -> Dict[str, Any]:
+    """Share of recorded evaluations that were answered from the evaluation cache."""
+    match: Dict[str, Any] = {"cacheHit": {"$exists": True}}
+    if since is not None:
+        match["evaluatedAt"] = {"$gte": since}
+    counts = {True: 0, False: 0}
+    for row in evaluations.aggregate([
+        {"$match": match},
+        {"$group": {"_id": "$cacheHit", "count": {"$sum": 1}}}
+    ]):
+        counts[bool(row["_id"])] = row["count"]
+    total = counts[True] + counts[False]
+    return {"evaluations": total, "hits": counts[True], "hitRate": counts[True] / total if total else 0.0}
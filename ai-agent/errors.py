@@ -0,0 +1,30 @@
+# errors.py
+from datetime import datetime
+from typing import Optional
+
+
+class RetryLater(Exception):
+    """
+    Raised when an evaluation can't run right now for reasons outside the
+    candidate's control (e.g. an exhausted API quota). The agent puts the
+    application back in the queue until `retry_at` without counting a failed attempt.
+    """
+
+    # Whether the deferral counts towards AGENT_MAX_DEFERRALS: set where the
+    # application itself may be the cause, so it can't be deferred forever
+    counted = False
+
+    def __init__(self, message: str, retry_at: Optional[datetime] = None):
+        super().__init__(message)
+        self.retry_at = retry_at
+
+
+class Deprioritized(RetryLater):
+    """
+    The pre-screen put the application behind better matches. It goes back
+    in the queue with a lower `priority` and is evaluated after `retry_at`.
+    """
+
+    def __init__(self, message: str, retry_at: Optional[datetime] = None, priority: int = -1):  # db.PRIORITY_LOW
+        super().__init__(message, retry_at)
+        self.priority = priority
@@ -0,0 +1,102 @@
+# evaluation_writer.py
+"""
+Buffers finished evaluations so a batch is written with two bulk round trips
+instead of two writes per application.
+"""
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from bson.errors import InvalidDocument
+from pymongo.errors import ConnectionFailure, ExecutionTimeout, PyMongoError, WTimeoutError
+
+from config import EVALUATION_WRITE_BATCH_SIZE, EVALUATION_WRITE_MAX_WAIT_SECONDS
+from db import write_evaluations
+
+logger = logging.getLogger(__name__)
+
+# Errors a later flush can get past; anything else would fail the same way every time
+TRANSIENT_ERRORS = (ConnectionFailure, ExecutionTimeout, WTimeoutError)
+
+
+class EvaluationWriter:
+    """
+    Collects results from the evaluator threads and hands them to
+    db.write_evaluations once `max_items` are buffered or the oldest has
+    waited `max_wait_seconds`. A write that fails transiently keeps its
+    results for the next flush, up to `max_retries` times; rewriting them
+    is harmless because history rows are keyed by (application_id, attempt).
+    Any other failure drops the batch: its leases expire and the
+    applications are evaluated again or dead-lettered.
+    """
+
+    def __init__(
+        self,
+        max_items: int = EVALUATION_WRITE_BATCH_SIZE,
+        max_wait_seconds: float = EVALUATION_WRITE_MAX_WAIT_SECONDS,
+        write: Optional[Callable[[List[Dict[str, Any]]], int]] = None,
+        max_retries: int = 5,
+    ):
+        self.max_items = max(1, max_items)
+        self.max_retries = max_retries
+        self.max_wait_seconds = max_wait_seconds
+        self._write = write or write_evaluations
+        self._pending: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        # One write at a time, so a retried batch never races its own first attempt
+        self._flush_lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+
+    def add(
+        self,
+        app: Dict[str, Any],
+        scores: Dict[str, Any],
+        tier: Dict[str, Any],
+        details: Optional[Dict[str, Any]] = None,
+    ):
+        result = {
+            "app_id": app["_id"],
+            "attempt": app.get("claims"),
+            "scores": scores,
+            "tier": tier,
+            "details": details,
+        }
+        with self._lock:
+            self._pending.append(result)
+            full = len(self._pending) >= self.max_items
+            if not full and self._timer is None:
+                self._timer = threading.Timer(self.max_wait_seconds, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if full:
+            self.flush()
+
+    def flush(self) -> int:
+        """Write everything buffered; returns how many results were written."""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+            if not batch:
+                return 0
+            try:
+                self._write(batch)
+            except TRANSIENT_ERRORS as e:
+                for result in batch:
+                    result["writeRetries"] = result.get("writeRetries", 0) + 1
+                kept = [result for result in batch if result["writeRetries"] <= self.max_retries]
+                logger.warning(
+                    f"Could not write {len(batch)} evaluations, keeping {len(kept)} for the next flush: {e}"
+                )
+                with self._lock:
+                    self._pending[:0] = kept
+                return 0
+            except (PyMongoError, InvalidDocument) as e:
+                logger.error(f"Dropping {len(batch)} evaluations that could not be written: {e}")
+                return 0
+            return len(batch)
+
+    def __len__(self) -> int:
+        return len(self._pending)
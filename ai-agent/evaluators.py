@@ -1,63 +1,107 @@
 # evaluators.py
-import io
+import hashlib
+import json
 import logging
-from typing import Dict, Any, Optional, Tuple
+import re
+import time
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Any, Iterable, Optional, Tuple
 
-from pypdf import PdfReader
-
-from ai_client import generate_text
-from ingestion.resume import analyze_resume_design, extract_resume_text
+from ai_client import count_tokens, generate_text, get_context_cache
+from config import (
+    EVALUATION_SOURCE_DEADLINE_SECONDS,
+    EVALUATION_SOURCE_WORKERS,
+    PRESCREEN_LOW_PRIORITY_DELAY_SECONDS,
+    PRESCREEN_MODE,
+    RESUME_TOKEN_BUDGET,
+)
+import result_cache
+from errors import Deprioritized, RetryLater
+from ingestion.resume_cache import analyze_resume, resume_hash
+from ingestion.resume_compaction import compact_resume
 from ingestion.github import analyze_github_profile
 from ingestion.linkedin import analyze_linkedin_profile
 from ingestion.portfolio import analyze_portfolio
+from prescreen import LOW_PRIORITY, REJECT, heuristic_result, prescreen, record_agreement
 from tiering import compute_tier
 
 logger = logging.getLogger(__name__)
 
+# Shared by all evaluations; ingestion calls mostly wait on the network
+_sources_pool = ThreadPoolExecutor(max_workers=EVALUATION_SOURCE_WORKERS, thread_name_prefix="ingestion")
 
-def pdf_bytes_to_text(pdf_bytes: bytes) -> str:
-    """Very basic PDF → text; good enough to start."""
-    reader = PdfReader(io.BytesIO(pdf_bytes))
-    texts = []
-    for page in reader.pages:
-        try:
-            texts.append(page.extract_text() or "")
-        except Exception:
-            continue
-    return "\n\n".join(texts)
 
+def _github_username(url: str) -> Optional[str]:
+    if "github.com/" in url:
+        return url.rstrip('/').split('/')[-1]
+    return None
 
-def build_evaluation_prompt(
-    resume_text: str,
+
+def _timed(fn: Callable, *args) -> Tuple[Any, float]:
+    started = time.monotonic()
+    return fn(*args), time.monotonic() - started
+
+
+def gather_sources(
+    resume_bytes: Optional[bytes],
     links: Dict[str, Optional[str]],
-    job_id: str,
-    job_description: Optional[str] = None,
-    github_data: Optional[Dict] = None,
-    linkedin_data: Optional[Dict] = None,
-    portfolio_data: Optional[Dict] = None,
-    design_data: Optional[Dict] = None,
-) -> str:
-    """Create a structured instruction for the model."""
-    linkedin = links.get("linkedin")
-    github = links.get("github")
-    portfolio = links.get("portfolio")
+    deadline: Optional[float] = None,
+) -> Tuple[Any, Dict[str, Any], Dict[str, Dict[str, Any]]]:
+    """
+    Run resume parsing and the GitHub / LinkedIn / portfolio analyses concurrently.
 
-    # Build additional context from ingestion
-    additional_context = ""
-    
-    if design_data:
-        additional_context += f"\n\nRESUME DESIGN ANALYSIS:\n{design_data}"
-    
-    if github_data:
-        additional_context += f"\n\nGITHUB PROFILE DATA:\n{github_data}"
-    
-    if linkedin_data:
-        additional_context += f"\n\nLINKEDIN PROFILE DATA:\n{linkedin_data}"
-    
-    if portfolio_data:
-        additional_context += f"\n\nPORTFOLIO WEBSITE DATA:\n{portfolio_data}"
+    The external sources share one `deadline` (default
+    EVALUATION_SOURCE_DEADLINE_SECONDS); any that miss it (or fail) come
+    back as {"status": "unavailable"} instead of holding up the evaluation.
+    The resume is parsed in the calling thread while they run, so it never
+    queues behind fetches abandoned by earlier evaluations; it has its own
+    parse timeout.
+    Returns (resume analysis or None, {source: data}, {source: timing}).
+    """
+    if deadline is None:
+        deadline = EVALUATION_SOURCE_DEADLINE_SECONDS
+    started = time.monotonic()
 
-    return f"""
+    futures = {}
+    username = _github_username(links.get("github") or "")
+    if username:
+        futures["github"] = _sources_pool.submit(_timed, analyze_github_profile, username)
+    if links.get("linkedin"):
+        futures["linkedin"] = _sources_pool.submit(_timed, analyze_linkedin_profile, links["linkedin"])
+    if links.get("portfolio"):
+        futures["portfolio"] = _sources_pool.submit(_timed, analyze_portfolio, links["portfolio"])
+
+    data: Dict[str, Any] = {}
+    timings: Dict[str, Dict[str, Any]] = {}
+    resume = None
+    if resume_bytes:
+        resume, elapsed = _timed(analyze_resume, resume_bytes)
+        timings["resume"] = {"seconds": round(elapsed, 3), "status": "ok"}
+
+    wait(futures.values(), timeout=max(0.0, deadline - (time.monotonic() - started)))
+    for source, future in futures.items():
+        if not future.done():
+            # Left running in the background; its result still warms the caches
+            data[source] = {"status": "unavailable", "reason": f"no response within {deadline:.0f}s"}
+            timings[source] = {"seconds": round(time.monotonic() - started, 3), "status": "timeout"}
+            continue
+        try:
+            data[source], elapsed = future.result()
+            timings[source] = {"seconds": round(elapsed, 3), "status": "ok"}
+            logger.info(f"{source} analysis: {data[source]}")
+        except RetryLater:
+            raise
+        except Exception as e:
+            logger.warning(f"{source} analysis failed: {e}")
+            data[source] = {"status": "unavailable", "reason": str(e)}
+            timings[source] = {"seconds": round(time.monotonic() - started, 3), "status": "error"}
+
+    return resume, data, timings
+
+
+EVALUATION_RUBRIC = """
 You are an AI talent evaluator for a hiring platform.
 
 You will receive:
@@ -92,21 +136,125 @@ Your job is to:
 5. Compute an OVERALL SCORE (0–100):
    - A "Professional" with strong experience but no external links should still get a HIGH score (80+).
    - Only penalize for lack of links if the resume content itself is weak or vague.
+"""
 
-Return ONLY valid JSON with this shape (no extra text):
-
-{{
+SCORES_SHAPE = """{
   "contentScore": <0-100 integer>,
   "designScore": <0-100 integer>,
   "projectsScore": <0-100 integer>,
   "overallScore": <0-100 integer>,
   "reasoningSummary": "<2-4 sentence explanation>"
-}}
+}"""
+
+SINGLE_OUTPUT_FORMAT = f"""
+Return ONLY valid JSON with this shape (no extra text):
+
+{SCORES_SHAPE}
+"""
+
+BATCH_OUTPUT_FORMAT = f"""
+Several candidates for the same job follow, each introduced by "CANDIDATE ID: <id>".
+Evaluate each one independently, as if it were the only candidate.
+
+Return ONLY a valid JSON object (no extra text) whose keys are the candidate IDs
+and whose values each have this shape:
+
+{SCORES_SHAPE}
+"""
 
+SCORE_KEYS = ["contentScore", "designScore", "projectsScore", "overallScore"]
+
+# JSON-mode response schema matching SCORES_SHAPE
+SCORES_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        **{key: {"type": "INTEGER", "minimum": 0, "maximum": 100} for key in SCORE_KEYS},
+        "reasoningSummary": {"type": "STRING"},
+    },
+    "required": SCORE_KEYS + ["reasoningSummary"],
+    "property_ordering": SCORE_KEYS + ["reasoningSummary"],
+}
+
+# Sent with only the malformed answer, so a repair costs a fraction of the evaluation
+REPAIR_PROMPT = """The text below was meant to be JSON but could not be parsed.
+Rewrite it as valid JSON matching the required schema, keeping every value it
+contains. Do not change or re-evaluate any score.
+
+{raw}
+"""
+
+# Bump when the job/candidate sections change in a way that changes answers;
+# edits to the rubric, output formats or schema change PROMPT_VERSION by themselves
+PROMPT_REVISION = 2
+
+# Part of the evaluation cache key, so changing the prompt invalidates cached results
+PROMPT_VERSION = f"{PROMPT_REVISION}-" + hashlib.sha256(
+    (EVALUATION_RUBRIC + SINGLE_OUTPUT_FORMAT + BATCH_OUTPUT_FORMAT + json.dumps(SCORES_SCHEMA, sort_keys=True)).encode("utf-8")
+).hexdigest()[:12]
+
+UNREADABLE_RESUME_SCORES = {
+    "contentScore": 0,
+    "designScore": 0,
+    "projectsScore": 0,
+    "overallScore": 0,
+    "reasoningSummary": "CRITICAL ERROR: Could not read text from this resume. It might be an image-only PDF. Please try uploading a text-based PDF or Word document."
+}
+UNREADABLE_RESUME_TIER = {"code": "ERR", "letter": "F", "color": "red"}
+
+
+def _job_section(job_id: str, job_description: Optional[str]) -> str:
+    return f"""
 ---------------------
 JOB ID: {job_id}
 JOB DESCRIPTION (may be empty):
 {job_description or "N/A"}
+"""
+
+
+def _compact_json(data: Dict[str, Any]) -> str:
+    """Ingestion data as minified JSON, leaving out empty fields."""
+    data = {key: value for key, value in data.items() if value not in (None, "", [], {})}
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def _compact_resume_text(resume_text: str, details: Optional[Dict[str, Any]] = None) -> str:
+    """Fit the resume into RESUME_TOKEN_BUDGET, noting what was left out in `details`."""
+    compact = compact_resume(resume_text, RESUME_TOKEN_BUDGET, count_tokens)
+    if details is not None:
+        details["resumeTokens"] = compact.tokens
+        if compact.omitted or compact.truncated:
+            details["resumeCompaction"] = {"omitted": compact.omitted, "truncated": compact.truncated}
+    return compact.text
+
+
+def _candidate_section(
+    resume_text: str,
+    links: Dict[str, Optional[str]],
+    github_data: Optional[Dict] = None,
+    linkedin_data: Optional[Dict] = None,
+    portfolio_data: Optional[Dict] = None,
+    design_data: Optional[Dict] = None,
+) -> str:
+    linkedin = links.get("linkedin")
+    github = links.get("github")
+    portfolio = links.get("portfolio")
+
+    # Build additional context from ingestion
+    additional_context = ""
+    
+    if design_data:
+        additional_context += f"\n\nRESUME DESIGN ANALYSIS:\n{_compact_json(design_data)}"
+    
+    if github_data:
+        additional_context += f"\n\nGITHUB PROFILE DATA:\n{_compact_json(github_data)}"
+    
+    if linkedin_data:
+        additional_context += f"\n\nLINKEDIN PROFILE DATA:\n{_compact_json(linkedin_data)}"
+    
+    if portfolio_data:
+        additional_context += f"\n\nPORTFOLIO WEBSITE DATA:\n{_compact_json(portfolio_data)}"
+
+    return f"""
 ---------------------
 LINKS:
 LinkedIn: {linkedin or "N/A"}
@@ -116,104 +264,402 @@ Portfolio: {portfolio or "N/A"}
 {additional_context}
 ---------------------
 RESUME TEXT:
-{resume_text[:12000]}  # truncated for context limit
+{resume_text}
 """
-    
 
-def evaluate_candidate(
+
+def build_evaluation_prompt(
+    resume_text: str,
+    links: Dict[str, Optional[str]],
+    job_id: str,
+    job_description: Optional[str] = None,
+    github_data: Optional[Dict] = None,
+    linkedin_data: Optional[Dict] = None,
+    portfolio_data: Optional[Dict] = None,
+    design_data: Optional[Dict] = None,
+) -> str:
+    """Create a structured instruction for the model."""
+    return (
+        EVALUATION_RUBRIC
+        + SINGLE_OUTPUT_FORMAT
+        + _job_section(job_id, job_description)
+        + _candidate_section(
+            _compact_resume_text(resume_text), links, github_data, linkedin_data, portfolio_data, design_data
+        )
+    )
+
+
+@dataclass
+class PreparedCandidate:
+    """Everything gathered for one candidate before the model is called."""
+    job_id: str
+    job_description: Optional[str]
+    links: Dict[str, Optional[str]]
+    resume_text: str
+    design_data: Dict[str, Any]
+    sources: Dict[str, Any] = field(default_factory=dict)
+    details: Dict[str, Any] = field(default_factory=dict)
+    # Set when the outcome is already decided without the model
+    result: Optional[Tuple[Dict[str, Any], Dict[str, Any]]] = None
+    cache_key: Optional[str] = None
+
+    def section(self) -> str:
+        return _candidate_section(
+            self.resume_text,
+            self.links,
+            github_data=self.sources.get("github"),
+            linkedin_data=self.sources.get("linkedin"),
+            portfolio_data=self.sources.get("portfolio"),
+            design_data=self.design_data,
+        )
+
+    def context(self, output_format: str = SINGLE_OUTPUT_FORMAT) -> str:
+        """The part of the prompt shared by every applicant to this job."""
+        return EVALUATION_RUBRIC + output_format + _job_section(self.job_id, self.job_description)
+
+
+def _apply_prescreen(prepared: PreparedCandidate, resume_text: str, allow_deprioritize: bool):
+    """
+    Run the keyword pre-screen. When enforced, clear rejects get heuristic
+    scores instead of a model call and weak matches are sent to the back of the queue.
+    """
+    screen = prescreen(resume_text, prepared.job_description)
+    prepared.details["prescreen"] = {**screen.as_dict(), "mode": PRESCREEN_MODE}
+    if PRESCREEN_MODE != "enforce":
+        return
+    if screen.decision == REJECT:
+        prepared.result = heuristic_result(screen, prepared.design_data, prepared.sources.get("github"))
+    elif screen.decision == LOW_PRIORITY and allow_deprioritize:
+        raise Deprioritized(
+            f"Pre-screen: weak match ({screen.reason})",
+            retry_at=datetime.utcnow() + timedelta(seconds=PRESCREEN_LOW_PRIORITY_DELAY_SECONDS),
+        )
+
+
+def prepare_candidate(
     resume_bytes: Optional[bytes],
     links: Dict[str, Optional[str]],
     job_id: str,
     job_description: Optional[str] = None,
-) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    details: Optional[Dict[str, Any]] = None,
+    allow_deprioritize: bool = False,
+    use_cache: bool = True,
+) -> PreparedCandidate:
     """
-    Main evaluation entry: returns (scores dict, tier dict).
-    
-    This function now:
-    1. Analyzes resume design
-    2. Fetches GitHub profile data
-    3. Scrapes LinkedIn (best effort)
-    4. Checks portfolio website
-    5. Combines all data for AI evaluation
-    6. Computes tier based on scores
+    Parse the resume and run the ingestion sources (concurrently).
+    Skipped when an identical evaluation is in the evaluation cache, unless
+    `use_cache` is False; the new result then replaces the cached one.
+
+    Then the keyword pre-screen runs (see prescreen.py). With
+    `allow_deprioritize` a weak match raises Deprioritized when enforced.
+    Enforced, it runs on the resume before the external sources are fetched,
+    so only applications that go on to the model fetch them.
     """
-    # Extract resume text and design
-    if resume_bytes:
-        resume_text = extract_resume_text(resume_bytes)
-        design_data = analyze_resume_design(resume_bytes)
-        
+    if details is None:
+        details = {}
+
+    key = result_cache.cache_key(
+        resume_hash(resume_bytes) if resume_bytes else None, links, job_description, PROMPT_VERSION
+    )
+    cached = result_cache.lookup(key) if use_cache else None
+    details["cacheKey"] = key
+    details["cacheHit"] = cached is not None
+    if cached is not None:
+        return PreparedCandidate(
+            job_id=job_id,
+            job_description=job_description,
+            links=links,
+            resume_text="",
+            design_data={},
+            details=details,
+            result=cached,
+            cache_key=key,
+        )
+
+    screen_first = PRESCREEN_MODE == "enforce"
+    resume, sources, timings = gather_sources(resume_bytes, {} if screen_first else links)
+    details["sourceTimings"] = timings
+
+    prepared = PreparedCandidate(
+        job_id=job_id,
+        job_description=job_description,
+        links=links,
+        resume_text="No resume file provided.",
+        design_data={"design_score": 0},
+        sources=sources,
+        details=details,
+        cache_key=key,
+    )
+
+    # Resume text and design come from a single parse of the PDF,
+    # done in the parsing process pool and skipped entirely for a resume seen before
+    if resume is not None:
+        prepared.resume_text = resume.text
+        prepared.design_data = resume.design
+
         # Check if text extraction failed (empty or too short)
-        if len(resume_text.strip()) < 50:
+        if len(prepared.resume_text.strip()) < 50:
             logger.warning("Resume text is empty or too short. Likely an image-based PDF.")
-            return {
-                "contentScore": 0,
-                "designScore": 0,
-                "projectsScore": 0,
-                "overallScore": 0,
-                "reasoningSummary": "CRITICAL ERROR: Could not read text from this resume. It might be an image-only PDF. Please try uploading a text-based PDF or Word document."
-            }, {"code": "ERR", "letter": "F", "color": "red"}
-    else:
-        resume_text = "No resume file provided."
-        design_data = {"design_score": 0}
-
-    # Analyze external sources
-    github_data = None
-    linkedin_data = None
-    portfolio_data = None
-    
-    if links.get("github"):
-        # Extract username from GitHub URL
-        github_url = links["github"]
-        if "github.com/" in github_url:
-            username = github_url.rstrip('/').split('/')[-1]
-            github_data = analyze_github_profile(username)
-            logger.info(f"GitHub analysis for {username}: {github_data}")
-    
-    if links.get("linkedin"):
-        linkedin_data = analyze_linkedin_profile(links["linkedin"])
-        logger.info(f"LinkedIn analysis: {linkedin_data}")
-    
-    if links.get("portfolio"):
-        portfolio_data = analyze_portfolio(links["portfolio"])
-        logger.info(f"Portfolio analysis: {portfolio_data}")
-
-    # Build comprehensive evaluation prompt
-    prompt = build_evaluation_prompt(
-        resume_text, 
-        links, 
-        job_id, 
-        job_description,
-        github_data=github_data,
-        linkedin_data=linkedin_data,
-        portfolio_data=portfolio_data,
-        design_data=design_data
-    )
+            prepared.result = dict(UNREADABLE_RESUME_SCORES), dict(UNREADABLE_RESUME_TIER)
+        else:
+            prepared.resume_text = _compact_resume_text(prepared.resume_text, details)
+
+    if prepared.result is None and PRESCREEN_MODE != "off":
+        _apply_prescreen(prepared, resume.text if resume is not None else "", allow_deprioritize)
+
+    if screen_first and prepared.result is None:
+        _, prepared.sources, source_timings = gather_sources(None, links)
+        timings.update(source_timings)
+
+    return prepared
+
 
-    raw = generate_text(prompt)
+class ModelOutputError(Exception):
+    """The model's answer couldn't be turned into scores, even after a repair attempt."""
 
+
+def _batch_schema(keys: Iterable[str]) -> Dict[str, Any]:
+    keys = list(keys)
+    return {"type": "OBJECT", "properties": {key: SCORES_SCHEMA for key in keys}, "required": keys}
+
+
+def _clean_json(raw: str) -> str:
     # Clean up markdown code blocks if present
-    cleaned_raw = raw.replace("```json", "").replace("```", "").strip()
+    return raw.replace("```json", "").replace("```", "").strip()
+
 
-    import json
+def _close_truncated(text: str) -> str:
+    """Close the strings, objects and arrays left open by JSON cut off mid-way."""
+    closers = []
+    in_string = escaped = False
+    for ch in text:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in "{[":
+            closers.append("}" if ch == "{" else "]")
+        elif ch in "}]" and closers:
+            closers.pop()
+    if in_string:
+        text = (text[:-1] if escaped else text) + '"'
+    # A dangling separator or key without a value can't be completed, so drop it
+    text = re.sub(r'(,\s*"[^"]*"\s*:?|[,:])\s*$', "", text.rstrip())
+    return text + "".join(reversed(closers))
+
+
+def _extract_json(raw: Optional[str]) -> Any:
+    """
+    Best-effort parse of a model answer: tolerates code fences, prose around
+    the JSON and JSON truncated by the output limit. Returns None if nothing
+    usable is found.
+    """
+    if not raw:
+        return None
+    text = _clean_json(raw)
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        pass
+
+    starts = [i for i in (text.find("{"), text.find("[")) if i >= 0]
+    if not starts:
+        return None
+    start = min(starts)
+    try:
+        # Ignores anything after the first complete value
+        return json.JSONDecoder().raw_decode(text, start)[0]
+    except json.JSONDecodeError:
+        pass
     try:
-        scores = json.loads(cleaned_raw)
+        return json.loads(_close_truncated(text[start:]))
     except json.JSONDecodeError:
-        # If model spills some text, try to extract JSON, or fallback
-        # For now, do a naive fallback
-        logger.warning("Failed to parse model output, using fallback scores")
-        scores = {
-            "contentScore": 0,
-            "designScore": 0,
-            "projectsScore": 0,
-            "overallScore": 0,
-            "reasoningSummary": "Failed to parse model output."
-        }
+        return None
 
+
+def _parse_answer(
+    raw: Optional[str],
+    schema: Dict[str, Any],
+    details: Dict[str, Any],
+    valid: Callable[[Any], bool],
+) -> Any:
+    """
+    Extract the JSON answer from `raw`. If that fails but the answer looks like
+    broken JSON, ask the model once to repair just that text. Returns None if
+    no valid answer comes out.
+    """
+    value = _extract_json(raw)
+    if valid(value):
+        return value
+    if not raw or "{" not in raw:
+        return None
+
+    logger.info("Model output was not valid JSON; asking for a repair")
+    details["jsonRepair"] = True
+    repaired = generate_text(
+        REPAIR_PROMPT.format(raw=raw),
+        response_schema=schema,
+        usage=details.setdefault("tokenUsage", {}),
+    )
+    value = _extract_json(repaired)
+    return value if valid(value) else None
+
+
+def _finalize(scores: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
     # Ensure keys exist and are numbers
-    for key in ["contentScore", "designScore", "projectsScore", "overallScore"]:
+    for key in SCORE_KEYS:
         scores[key] = int(scores.get(key, 0))
 
     # Compute tier using the 30-layer matrix
-    tier = compute_tier(scores)
+    return scores, compute_tier(scores)
+
+
+def _record_model_result(
+    prepared: PreparedCandidate, result: Tuple[Dict[str, Any], Dict[str, Any]]
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Cache a model-made result and score the pre-screen's decision against it."""
+    if prepared.cache_key:
+        result_cache.store(prepared.cache_key, *result, PROMPT_VERSION)
+    screen = prepared.details.get("prescreen")
+    if screen:
+        record_agreement(screen, result[1])
+    return result
+
+
+def _generate(context: str, content: str, details: Dict[str, Any], schema: Dict[str, Any]) -> str:
+    """
+    Call the model with the static `context` (rubric + job) held in a provider-side
+    context cache, so each call only sends the candidate-specific `content`.
+    The answer is requested in JSON mode, constrained to `schema`.
+    """
+    usage: Dict[str, int] = {}
+    raw = generate_text(
+        content,
+        system_instruction=context,
+        cached_content=get_context_cache(context),
+        usage=usage,
+        response_schema=schema,
+    )
+    details["tokenUsage"] = usage
+    return raw
+
+
+def evaluate_prepared(prepared: PreparedCandidate) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """One model call for one prepared candidate."""
+    if prepared.result is not None:
+        return prepared.result
+
+    raw = _generate(prepared.context(), prepared.section(), prepared.details, SCORES_SCHEMA)
+
+    scores = _parse_answer(raw, SCORES_SCHEMA, prepared.details, _valid_scores)
+    if scores is None:
+        # Fails the attempt; the application's lease retry evaluates it again
+        raise ModelOutputError(f"Could not parse model output: {(raw or '')[:200]!r}")
+
+    return _record_model_result(prepared, _finalize(scores))
+
+
+def _valid_scores(value: Any) -> bool:
+    if not isinstance(value, dict):
+        return False
+    try:
+        return all(0 <= int(value[key]) <= 100 for key in SCORE_KEYS)
+    except (KeyError, TypeError, ValueError):
+        return False
+
+
+def evaluate_prepared_batch(
+    prepared: Dict[str, PreparedCandidate],
+) -> Dict[str, Any]:
+    """
+    Evaluate several candidates for the same job with one model call.
+
+    `prepared` maps application id -> PreparedCandidate. The rubric and job
+    description are sent once; the model answers with scores keyed by
+    application id. Candidates missing from (or malformed in) the answer are
+    retried one at a time. Each value is a (scores, tier) tuple, or the
+    exception that candidate's individual retry raised.
+    """
+    results: Dict[str, Any] = {}
+    pending = {}
+    for key, candidate in prepared.items():
+        if candidate.result is not None:
+            results[key] = candidate.result
+        else:
+            pending[key] = candidate
+
+    if len(pending) == 1:
+        key, candidate = next(iter(pending.items()))
+        results[key] = evaluate_prepared(candidate)
+        return results
+    if not pending:
+        return results
+
+    first = next(iter(pending.values()))
+    content = "".join(
+        f"\n=====================\nCANDIDATE ID: {key}\n" + candidate.section()
+        for key, candidate in pending.items()
+    )
+
+    answers: Dict[str, Any] = {}
+    batch_details: Dict[str, Any] = {}
+    schema = _batch_schema(pending)
+    try:
+        raw = _generate(first.context(BATCH_OUTPUT_FORMAT), content, batch_details, schema)
+        answers = _parse_answer(raw, schema, batch_details, lambda value: isinstance(value, dict)) or {}
+        if not answers:
+            logger.warning(f"Failed to parse batch model output for {len(pending)} candidates")
+    except RetryLater:
+        raise
+    except Exception as e:
+        logger.warning(f"Batch model call failed for {len(pending)} candidates: {e}")
+
+    for key, candidate in pending.items():
+        scores = answers.get(key)
+        if _valid_scores(scores):
+            candidate.details["batchSize"] = len(pending)
+            candidate.details["tokenUsage"] = batch_details.get("tokenUsage", {})
+            if batch_details.get("jsonRepair"):
+                candidate.details["jsonRepair"] = True
+            results[key] = _record_model_result(candidate, _finalize(dict(scores)))
+        else:
+            logger.info(f"Candidate {key} missing from batch answer; evaluating individually")
+            try:
+                results[key] = evaluate_prepared(candidate)
+            except Exception as e:
+                # Reported per candidate so the rest of the batch still gets saved
+                results[key] = e
+    return results
+
+
+def evaluate_candidate(
+    resume_bytes: Optional[bytes],
+    links: Dict[str, Optional[str]],
+    job_id: str,
+    job_description: Optional[str] = None,
+    details: Optional[Dict[str, Any]] = None,
+    allow_deprioritize: bool = False,
+    use_cache: bool = True,
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Main evaluation entry: returns (scores dict, tier dict).
     
-    return scores, tier
+    This function now:
+    1. Analyzes resume design
+    2. Fetches GitHub profile data
+    3. Scrapes LinkedIn (best effort)
+    4. Checks portfolio website
+    5. Combines all data for AI evaluation
+    6. Computes tier based on scores
+
+    Steps 1-4 run concurrently, then a keyword pre-screen may settle clear
+    rejects without step 5. If `details` is given it is filled with
+    bookkeeping for the evaluation record (per-source timings, pre-screen).
+    """
+    prepared = prepare_candidate(resume_bytes, links, job_id, job_description, details, allow_deprioritize, use_cache)
+    return evaluate_prepared(prepared)
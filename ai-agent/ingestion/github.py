@@ -1,59 +1,287 @@
 import os
+import json
 import logging
-from typing import Dict, Any, List
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Tuple
 
-from github import Github, GithubException
+from github import Auth, Github, GithubException
+from urllib3.util.retry import Retry
+
+from cache import LRUCache
+from config import (
+    GITHUB_CACHE_ITEMS,
+    GITHUB_CACHE_TTL_SECONDS,
+    GITHUB_POOL_SIZE,
+    GITHUB_RATE_LIMIT_RESERVE,
+    GITHUB_USE_GRAPHQL,
+)
+from errors import RetryLater
 
 logger = logging.getLogger(__name__)
 
+# Limit to checking last 30 repos to avoid timeouts
+MAX_REPOS = 30
+
+# Fields kept from the API responses for revalidation
+USER_FIELDS = ("bio", "followers")
+REPO_FIELDS = ("stargazers_count", "language", "pushed_at")
+
+# Transient server errors only: PyGithub's default retry sleeps in-thread until the
+# rate limit resets on a 403/429, which must surface instead so the evaluation is deferred
+CLIENT_RETRY = Retry(
+    total=2,
+    backoff_factor=0.5,
+    status_forcelist=(500, 502, 503, 504),
+    respect_retry_after_header=False,
+)
+
+# A push within this window counts as recent activity
+RECENT_ACTIVITY_DAYS = 180
+
+# Everything the analysis needs in a single request (REST needs 2+ round trips)
+PROFILE_QUERY = """
+query($login: String!, $repos: Int!) {
+  rateLimit { remaining resetAt }
+  user(login: $login) {
+    bio
+    followers { totalCount }
+    repositories(first: $repos, ownerAffiliations: OWNER, orderBy: {field: PUSHED_AT, direction: DESC}) {
+      nodes { stargazerCount primaryLanguage { name } pushedAt }
+    }
+  }
+}
+"""
+
+
+class GitHubRateLimited(RetryLater):
+    """GitHub quota is (nearly) spent; try again after `retry_at`."""
+
+
+_client: Optional[Github] = None
+_client_lock = threading.Lock()
+
+# username -> {"analysis", "user", "repos", "user_etag", "repos_etag", "fetched_at"}
+_profiles = LRUCache(max_items=GITHUB_CACHE_ITEMS)
+
+# Last rate-limit state seen per API ("core" = REST, "graphql")
+_rate_limit = {
+    "core": {"remaining": None, "reset": None},
+    "graphql": {"remaining": None, "reset": None},
+}
+_rate_limit_lock = threading.Lock()
+
+
+def get_client(token: str) -> Github:
+    """One shared client so every evaluation reuses the same connection pool."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = Github(
+                auth=Auth.Token(token),
+                pool_size=GITHUB_POOL_SIZE,
+                per_page=MAX_REPOS,
+                retry=CLIENT_RETRY,
+                # The default spacing would serialize every evaluator thread on
+                # the shared client; the quota is tracked in _check_rate_limit
+                seconds_between_requests=None,
+                seconds_between_writes=None,
+            )
+        return _client
+
+
+def _note_rate_limit(headers: Dict[str, Any], resource: str = "core"):
+    remaining = headers.get("x-ratelimit-remaining")
+    reset = headers.get("x-ratelimit-reset")
+    if remaining is None or reset is None:
+        return
+    with _rate_limit_lock:
+        _rate_limit[resource]["remaining"] = int(remaining)
+        _rate_limit[resource]["reset"] = int(reset)
+
+
+def _check_rate_limit(resource: str = "core"):
+    """Defer before the quota runs out rather than fail evaluations halfway."""
+    with _rate_limit_lock:
+        remaining, reset = _rate_limit[resource]["remaining"], _rate_limit[resource]["reset"]
+    if remaining is None or reset is None or reset <= time.time():
+        return
+    if remaining <= GITHUB_RATE_LIMIT_RESERVE:
+        raise GitHubRateLimited(
+            f"GitHub rate limit nearly exhausted ({remaining} left)",
+            retry_at=datetime.utcfromtimestamp(reset),
+        )
+
+
+def _conditional_get(
+    client: Github,
+    url: str,
+    etag: Optional[str],
+    parameters: Optional[Dict[str, Any]] = None,
+) -> Tuple[bool, Optional[str], Any]:
+    """
+    GET with If-None-Match. Returns (modified, etag, data);
+    a 304 doesn't count against the rate limit.
+    """
+    headers = {"If-None-Match": etag} if etag else {}
+    status, response_headers, output = client.requester.requestJson(
+        "GET", url, parameters=parameters, headers=headers
+    )
+    _note_rate_limit(response_headers)
+    if status == 304:
+        return False, etag, None
+    data = json.loads(output) if output else None
+    if status >= 400:
+        if status in (403, 429) and response_headers.get("x-ratelimit-remaining") == "0":
+            reset = int(response_headers.get("x-ratelimit-reset", time.time() + 60))
+            raise GitHubRateLimited("GitHub rate limit exceeded", retry_at=datetime.utcfromtimestamp(reset))
+        raise client.requester.createException(status, response_headers, data)
+    return True, response_headers.get("etag"), data
+
+
+def _fetch_rest(client: Github, username: str, cached: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """User + repos over REST, revalidating any cached copy with ETags."""
+    _check_rate_limit("core")
+    user_changed, user_etag, user = _conditional_get(
+        client, f"/users/{username}", cached and cached.get("user_etag")
+    )
+    repos_changed, repos_etag, repos = _conditional_get(
+        client,
+        f"/users/{username}/repos",
+        cached and cached.get("repos_etag"),
+        parameters={"per_page": MAX_REPOS, "sort": "pushed"},
+    )
+
+    # On 304 the cached copy is still current
+    if not user_changed:
+        user = cached["user"]
+    if not repos_changed:
+        repos = cached["repos"]
+    return {
+        "user": {k: user.get(k) for k in USER_FIELDS},
+        "repos": [{k: repo.get(k) for k in REPO_FIELDS} for repo in repos[:MAX_REPOS]],
+        "user_etag": user_etag,
+        "repos_etag": repos_etag,
+    }
+
+
+def _fetch_graphql(client: Github, username: str) -> Dict[str, Any]:
+    """User + top repos in one GraphQL request, mapped onto the REST field names."""
+    _check_rate_limit("graphql")
+    try:
+        headers, data = client.requester.graphql_query(
+            PROFILE_QUERY, {"login": username, "repos": MAX_REPOS}
+        )
+    except GithubException as e:
+        # Without the client retrying rate limits, an exhausted quota surfaces here;
+        # remember it so later profiles skip straight to REST until the reset
+        response_headers = e.headers or {}
+        if e.status in (403, 429) and response_headers.get("x-ratelimit-remaining") == "0":
+            _note_rate_limit(response_headers, "graphql")
+            reset = int(response_headers.get("x-ratelimit-reset", time.time() + 60))
+            raise GitHubRateLimited("GitHub GraphQL rate limit exceeded", retry_at=datetime.utcfromtimestamp(reset))
+        raise
+    _note_rate_limit(headers, "graphql")
+
+    user = data["data"]["user"]
+    if user is None:
+        raise GithubException(404, data, headers, f"Could not resolve to a User with the login of '{username}'.")
+    return {
+        "user": {"bio": user.get("bio"), "followers": user["followers"]["totalCount"]},
+        "repos": [
+            {
+                "stargazers_count": repo["stargazerCount"],
+                "language": (repo.get("primaryLanguage") or {}).get("name"),
+                "pushed_at": repo.get("pushedAt"),
+            }
+            for repo in user["repositories"]["nodes"]
+        ],
+    }
+
+
+def _summarize(username: str, user: Dict[str, Any], repos: List[Dict[str, Any]]) -> Dict[str, Any]:
+    total_stars = 0
+    languages = {}
+    total_repos = 0
+    last_pushed_at = None
+
+    for repo in repos[:MAX_REPOS]:
+        total_repos += 1
+        total_stars += repo.get("stargazers_count", 0)
+        if repo.get("language"):
+            languages[repo["language"]] = languages.get(repo["language"], 0) + 1
+        if repo.get("pushed_at"):
+            # ISO-8601 strings compare chronologically
+            last_pushed_at = max(last_pushed_at or "", repo["pushed_at"])
+
+    recent_activity = False
+    if last_pushed_at:
+        pushed = datetime.strptime(last_pushed_at, "%Y-%m-%dT%H:%M:%SZ")
+        recent_activity = datetime.utcnow() - pushed < timedelta(days=RECENT_ACTIVITY_DAYS)
+
+    # Get top languages
+    top_languages = sorted(languages.items(), key=lambda x: x[1], reverse=True)[:5]
+
+    # Calculate a rough "project score"
+    project_score = 50
+    project_score += min(50, total_stars * 2)
+    project_score += min(20, total_repos)
+
+    return {
+        "username": username,
+        "total_stars": total_stars,
+        "total_repos": total_repos,
+        "top_languages": [l[0] for l in top_languages],
+        "project_score": min(100, project_score),
+        "recent_activity": recent_activity,
+        "last_pushed_at": last_pushed_at,
+        "bio": user.get("bio"),
+        "followers": user.get("followers")
+    }
+
+
 def analyze_github_profile(username: str) -> Dict[str, Any]:
     """
     Analyze a GitHub profile for activity, stars, and languages.
+
+    Uses one GraphQL query per profile, falling back to REST if GraphQL fails.
+    Results are cached per username for GITHUB_CACHE_TTL_SECONDS; REST results
+    are then revalidated with ETags, which costs nothing if nothing changed.
+    Raises GitHubRateLimited when the quota is close to exhausted.
     """
     token = os.getenv("GITHUB_TOKEN")
     if not token or not username:
         return {"error": "No GITHUB_TOKEN or username provided"}
 
+    key = username.lower()
+    cached = _profiles.get(key)
+    if cached and time.monotonic() - cached["fetched_at"] < GITHUB_CACHE_TTL_SECONDS:
+        return cached["analysis"]
+
     try:
-        g = Github(token)
-        user = g.get_user(username)
-
-        repos = user.get_repos()
-        
-        total_stars = 0
-        languages = {}
-        total_repos = 0
-        recent_activity = False
-
-        # Limit to checking last 30 repos to avoid timeouts
-        for repo in repos[:30]:
-            total_repos += 1
-            total_stars += repo.stargazers_count
-            if repo.language:
-                languages[repo.language] = languages.get(repo.language, 0) + 1
-            
-            # Simple check for recent activity (updated in last 6 months)
-            # This is a bit expensive if we do it for all, so maybe just check the first few sorted by updated
-            pass
-        
-        # Get top languages
-        top_languages = sorted(languages.items(), key=lambda x: x[1], reverse=True)[:5]
-        
-        # Calculate a rough "project score"
-        project_score = 50
-        project_score += min(50, total_stars * 2)
-        project_score += min(20, total_repos)
-        
-        return {
-            "username": username,
-            "total_stars": total_stars,
-            "total_repos": total_repos,
-            "top_languages": [l[0] for l in top_languages],
-            "project_score": min(100, project_score),
-            "bio": user.bio,
-            "followers": user.followers
-        }
+        client = get_client(token)
+        profile = None
+        if GITHUB_USE_GRAPHQL:
+            try:
+                profile = _fetch_graphql(client, username)
+            except GitHubRateLimited:
+                # GraphQL has its own quota; REST may still have headroom
+                pass
+            except GithubException as e:
+                if e.status == 404:
+                    raise
+                logger.warning(f"GitHub GraphQL query failed, falling back to REST: {e}")
+        if profile is None:
+            profile = _fetch_rest(client, username, cached)
+
+        analysis = _summarize(username, profile["user"], profile["repos"])
+
+        _profiles.set(key, {**profile, "analysis": analysis, "fetched_at": time.monotonic()})
+        return analysis
 
+    except GitHubRateLimited:
+        raise
     except GithubException as e:
         logger.error(f"GitHub API error: {e}")
         return {"error": str(e)}
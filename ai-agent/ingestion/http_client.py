@@ -0,0 +1,146 @@
+"""
+Shared async HTTP layer for scraping candidate links.
+
+A single httpx.AsyncClient (keep-alive connection pool) lives on a
+background event loop, so fetches issued from any evaluator thread overlap
+instead of each opening its own TCP/TLS connection. Every fetch is bounded
+by a per-host concurrency limit, a total deadline (queueing included) and a
+response size cap.
+"""
+import asyncio
+import logging
+import threading
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from config import (
+    HTTP_MAX_BYTES,
+    HTTP_MAX_CONNECTIONS,
+    HTTP_PER_HOST_LIMIT,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+}
+
+
+class FetchError(Exception):
+    """The page could not be fetched within its budget."""
+
+
+@dataclass
+class FetchResult:
+    url: str
+    status_code: int
+    text: str
+    truncated: bool
+    elapsed: float
+
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+_client: Optional[httpx.AsyncClient] = None
+
+
+class _HostLimit:
+    def __init__(self):
+        self.semaphore = asyncio.Semaphore(HTTP_PER_HOST_LIMIT)
+        self.users = 0
+
+
+# Only hosts with a fetch in flight or waiting; only touched from the background loop, so no locking needed
+_host_limits: Dict[str, _HostLimit] = {}
+
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    """Start the background event loop on first use."""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="http-client", daemon=True).start()
+            _loop = loop
+        return _loop
+
+
+def _get_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            headers=DEFAULT_HEADERS,
+            follow_redirects=True,
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_CONNECTIONS,
+                keepalive_expiry=30,
+            ),
+            # Per-phase timeouts; the overall deadline is enforced in _fetch
+            timeout=httpx.Timeout(10.0),
+        )
+    return _client
+
+
+@asynccontextmanager
+async def _host_slot(host: str):
+    """Hold one of `host`'s HTTP_PER_HOST_LIMIT slots, dropping its entry once the host is idle."""
+    limit = _host_limits.get(host)
+    if limit is None:
+        limit = _host_limits[host] = _HostLimit()
+    limit.users += 1
+    try:
+        async with limit.semaphore:
+            yield
+    finally:
+        limit.users -= 1
+        if not limit.users:
+            del _host_limits[host]
+
+
+async def _download(url: str, max_bytes: int) -> FetchResult:
+    started = time.monotonic()
+    async with _host_slot(urlsplit(url).netloc.lower()):
+        async with _get_client().stream("GET", url) as response:
+            body = bytearray()
+            truncated = False
+            async for chunk in response.aiter_bytes():
+                body += chunk
+                if len(body) > max_bytes:
+                    del body[max_bytes:]
+                    truncated = True
+                    break
+            text = body.decode(response.encoding or "utf-8", errors="replace")
+            return FetchResult(
+                url=str(response.url),
+                status_code=response.status_code,
+                text=text,
+                truncated=truncated,
+                elapsed=time.monotonic() - started,
+            )
+
+
+async def _fetch(url: str, deadline: float, max_bytes: int) -> FetchResult:
+    try:
+        return await asyncio.wait_for(_download(url, max_bytes), deadline)
+    except asyncio.TimeoutError:
+        raise FetchError(f"Fetching {url} exceeded its {deadline:.0f}s deadline")
+    except httpx.HTTPError as e:
+        raise FetchError(f"Fetching {url} failed: {e}")
+
+
+async def fetch_async(url: str, deadline: float = 15.0, max_bytes: int = HTTP_MAX_BYTES) -> FetchResult:
+    """Fetch `url` from any event loop; the request itself runs on the shared client's loop."""
+    future = asyncio.run_coroutine_threadsafe(_fetch(url, deadline, max_bytes), _get_loop())
+    return await asyncio.wrap_future(future)
+
+
+def fetch(url: str, deadline: float = 15.0, max_bytes: int = HTTP_MAX_BYTES) -> FetchResult:
+    """Blocking fetch for thread-based callers such as the evaluators."""
+    future = asyncio.run_coroutine_threadsafe(_fetch(url, deadline, max_bytes), _get_loop())
+    return future.result()
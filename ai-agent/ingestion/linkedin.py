@@ -1,8 +1,9 @@
 import logging
-import requests
 from bs4 import BeautifulSoup
 from typing import Dict, Any, Optional
 
+from ingestion.http_client import fetch
+
 logger = logging.getLogger(__name__)
 
 def analyze_linkedin_profile(url: str) -> Dict[str, Any]:
@@ -13,12 +14,8 @@ def analyze_linkedin_profile(url: str) -> Dict[str, Any]:
     if not url:
         return {}
 
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-    }
-
     try:
-        resp = requests.get(url, headers=headers, timeout=10)
+        resp = fetch(url, deadline=10)
         if resp.status_code != 200:
             return {"error": f"Status code {resp.status_code}"}
         
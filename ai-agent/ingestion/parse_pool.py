@@ -0,0 +1,148 @@
+"""
+Process-pool resume parsing.
+
+pdfminer is pure Python and holds the GIL for the whole layout pass, so
+parsing inside the agent's evaluator threads (or the FastAPI event loop)
+serializes everything else. This module runs `parse_resume` in worker
+processes instead, with a per-document timeout and a memory cap so a
+pathological PDF only costs its own parse.
+"""
+import asyncio
+import logging
+import multiprocessing
+import signal
+import threading
+from concurrent.futures import CancelledError, ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from config import (
+    RESUME_MAX_PAGES,
+    RESUME_PARSE_MEMORY_MB,
+    RESUME_PARSE_TIMEOUT_SECONDS,
+    RESUME_PARSE_WORKERS,
+)
+from ingestion.resume import ParsedResume, parse_resume
+
+logger = logging.getLogger(__name__)
+
+# Extra time the caller waits beyond the in-worker timeout before giving up on a worker
+TIMEOUT_GRACE_SECONDS = 5.0
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+# One per worker: callers wait here rather than in the pool's queue
+_slots = threading.BoundedSemaphore(max(1, RESUME_PARSE_WORKERS))
+
+
+class ParseTimeout(BaseException):
+    """Raised inside a worker when a document exceeds its time budget.
+
+    Derives from BaseException so parse_resume's error handling doesn't swallow it.
+    """
+
+
+def _on_alarm(signum, frame):
+    raise ParseTimeout()
+
+
+def _init_worker(memory_limit_mb: int):
+    """Cap the worker's address space; an oversized parse then fails with MemoryError."""
+    if resource is not None and memory_limit_mb > 0:
+        limit = memory_limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def parse_with_limits(pdf_bytes: bytes, timeout: float, max_pages: int) -> ParsedResume:
+    """Worker entry point: parse_resume under a wall-clock alarm."""
+    use_alarm = hasattr(signal, "setitimer")
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _on_alarm)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return parse_resume(pdf_bytes, max_pages=max_pages)
+    except ParseTimeout:
+        return ParsedResume(error=f"Resume parsing timed out after {timeout:.0f}s")
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+def get_pool() -> ProcessPoolExecutor:
+    """Shared pool, created on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: forking a process that already runs Mongo/HTTP threads is unsafe
+            _pool = ProcessPoolExecutor(
+                max_workers=RESUME_PARSE_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(RESUME_PARSE_MEMORY_MB,),
+            )
+        return _pool
+
+
+def reset_pool(pool: Optional[ProcessPoolExecutor] = None):
+    """Throw away the pool (e.g. after a worker crashed or hung); the next call starts a new one.
+
+    Pass the pool that failed so that callers racing on the same failure
+    replace it only once. Its workers are terminated: shutdown alone leaves
+    a worker stuck in native code running, holding its memory.
+    """
+    global _pool
+    with _pool_lock:
+        if pool is not None and pool is not _pool:
+            return
+        pool, _pool = _pool, None
+    if pool is not None:
+        processes = list((getattr(pool, "_processes", None) or {}).values())
+        pool.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+
+def parse_resume_in_pool(
+    pdf_bytes: bytes,
+    timeout: float = RESUME_PARSE_TIMEOUT_SECONDS,
+    max_pages: int = RESUME_MAX_PAGES,
+) -> ParsedResume:
+    """Parse a resume in the process pool and block until it is done."""
+    if RESUME_PARSE_WORKERS <= 0:
+        return parse_resume(pdf_bytes, max_pages=max_pages)
+    # Waiting for a slot first means a submitted parse starts right away, so the
+    # timeout below measures the parse rather than time spent queued behind others
+    with _slots:
+        for retry in (False, True):
+            pool = get_pool()
+            try:
+                future = pool.submit(parse_with_limits, pdf_bytes, timeout, max_pages)
+                return future.result(timeout=timeout + TIMEOUT_GRACE_SECONDS)
+            except FutureTimeout:
+                # The worker ignored its alarm (stuck in native code); don't let it hold a slot
+                logger.error("Resume parse worker unresponsive; restarting pool")
+                reset_pool(pool)
+                return ParsedResume(error=f"Resume parsing timed out after {timeout:.0f}s")
+            except (BrokenProcessPool, CancelledError, RuntimeError) as e:
+                # A worker died (most likely killed for exceeding memory), or another
+                # caller restarted the pool under this parse: try once on a fresh pool
+                reset_pool(pool)
+                if retry:
+                    logger.error(f"Resume parse worker crashed: {e!r}")
+                    return ParsedResume(error="Resume parsing crashed")
+                logger.warning(f"Resume parse interrupted ({e!r}); retrying on a new pool")
+
+
+async def parse_resume_async(
+    pdf_bytes: bytes,
+    timeout: float = RESUME_PARSE_TIMEOUT_SECONDS,
+    max_pages: int = RESUME_MAX_PAGES,
+) -> ParsedResume:
+    """Awaitable variant for async callers such as the FastAPI app."""
+    return await asyncio.to_thread(parse_resume_in_pool, pdf_bytes, timeout, max_pages)
@@ -1,8 +1,9 @@
 import logging
-import requests
 from bs4 import BeautifulSoup
 from typing import Dict, Any
 
+from ingestion.http_client import fetch
+
 logger = logging.getLogger(__name__)
 
 def analyze_portfolio(url: str) -> Dict[str, Any]:
@@ -13,15 +14,13 @@ def analyze_portfolio(url: str) -> Dict[str, Any]:
         return {}
 
     try:
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        }
-        resp = requests.get(url, headers=headers, timeout=15)
+        resp = fetch(url, deadline=15)
         if resp.status_code != 200:
             return {"active": False, "status": resp.status_code}
         
         soup = BeautifulSoup(resp.text, 'html.parser')
         text_content = soup.get_text()
+        meta = soup.find("meta", attrs={"name": "description"})
         
         # Basic heuristic for visual quality (existence of images, css)
         img_count = len(soup.find_all('img'))
@@ -39,8 +38,8 @@ def analyze_portfolio(url: str) -> Dict[str, Any]:
         return {
             "active": True,
             "richness_score": min(100, richness_score),
-            "text_preview": text_content[:500].strip(),
-            "meta_description": soup.find("meta", attrs={"name":"description"})
+            "text_preview": " ".join(text_content.split())[:500],
+            "meta_description": meta.get("content") if meta else None
         }
 
     except Exception as e:
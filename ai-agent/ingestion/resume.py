@@ -1,81 +1,120 @@
 import io
 import logging
-from typing import Dict, Any, Optional
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Tuple
 
-from pdfminer.high_level import extract_text, extract_pages
+from pdfminer.high_level import extract_pages
 from pdfminer.layout import LTTextContainer, LTChar
 
 logger = logging.getLogger(__name__)
 
-def analyze_resume_design(pdf_bytes: bytes) -> Dict[str, Any]:
+
+@dataclass
+class ParsedResume:
     """
-    Analyze the design of the resume (fonts, consistency, layout density).
-    Returns a dictionary with metrics.
+    Everything we need from one pdfminer layout pass over a resume:
+    the prompt text, per-character font data for design metrics and the page count.
     """
-    try:
-        font_sizes = []
-        font_names = set()
-        text_density = 0.0
-        total_chars = 0
-        page_count = 0
+    pages: List[str] = field(default_factory=list)
+    chars: List[Tuple[str, float]] = field(default_factory=list)  # (fontname, size)
+    error: Optional[str] = None
 
+    @property
+    def text(self) -> str:
+        # Same layout as pdfminer's extract_text: a form feed after every page
+        return "".join(page + "\f" for page in self.pages)
+
+    @property
+    def page_count(self) -> int:
+        return len(self.pages)
+
+
+def parse_resume(pdf_bytes: bytes, max_pages: int = 0) -> ParsedResume:
+    """
+    Run a single layout analysis over the PDF and collect text and font data together.
+    Only the first `max_pages` pages are read (0 = all).
+    Never raises; parse failures are reported through `ParsedResume.error`.
+    """
+    parsed = ParsedResume()
+    try:
         # We need a seekable stream for pdfminer
         stream = io.BytesIO(pdf_bytes)
-        
-        for page_layout in extract_pages(stream):
-            page_count += 1
+
+        for page_layout in extract_pages(stream, maxpages=max_pages):
+            page_text = []
             for element in page_layout:
                 if isinstance(element, LTTextContainer):
+                    page_text.append(element.get_text() + "\n")
                     for text_line in element:
                         try:
                             for character in text_line:
                                 if isinstance(character, LTChar):
-                                    font_sizes.append(character.size)
-                                    font_names.add(character.fontname)
-                                    total_chars += 1
+                                    parsed.chars.append((character.fontname, character.size))
                         except TypeError:
                             # Sometimes text_line might not be iterable or structure matches unexpectedly
                             continue
-        
-        if not font_sizes:
-            return {
-                "design_score": 0,
-                "details": "Could not extract text/fonts"
-            }
-
-        avg_font_size = sum(font_sizes) / len(font_sizes)
-        font_variety = len(font_names)
-        
-        # Heuristics
-        design_score = 85 # Base score (higher base)
-        
-        # Penalty for too many fonts (relaxed)
-        if font_variety > 5:
-            design_score -= (font_variety - 5) * 3
-        
-        # Penalty for inconsistent sizing (simple variance check could work, but sticking to basics)
-        
-        # Bonus for good length (1-3 pages for professionals)
-        if 1 <= page_count <= 3:
-            design_score += 10
-        elif page_count > 5:
-            design_score -= 5
+            parsed.pages.append("".join(page_text))
+
+    except Exception as e:
+        logger.error(f"Error parsing resume PDF: {e}")
+        parsed.error = str(e)
+
+    return parsed
+
+
+def design_metrics(parsed: ParsedResume) -> Dict[str, Any]:
+    """
+    Analyze the design of the resume (fonts, consistency, layout density).
+    Returns a dictionary with metrics.
+    """
+    if parsed.error:
+        return {"error": parsed.error, "design_score": 50}
 
+    if not parsed.chars:
         return {
-            "design_score": max(0, min(100, design_score)),
-            "page_count": page_count,
-            "font_count": font_variety,
-            "avg_font_size": round(avg_font_size, 2),
-            "fonts": list(font_names)[:5] # Sample
+            "design_score": 0,
+            "details": "Could not extract text/fonts"
         }
 
-    except Exception as e:
-        logger.error(f"Error analyzing resume design: {e}")
-        return {"error": str(e), "design_score": 50}
+    font_sizes = [size for _, size in parsed.chars]
+    font_names = {name for name, _ in parsed.chars}
+    page_count = parsed.page_count
+
+    avg_font_size = sum(font_sizes) / len(font_sizes)
+    font_variety = len(font_names)
+
+    # Heuristics
+    design_score = 85 # Base score (higher base)
+
+    # Penalty for too many fonts (relaxed)
+    if font_variety > 5:
+        design_score -= (font_variety - 5) * 3
+
+    # Penalty for inconsistent sizing (simple variance check could work, but sticking to basics)
+
+    # Bonus for good length (1-3 pages for professionals)
+    if 1 <= page_count <= 3:
+        design_score += 10
+    elif page_count > 5:
+        design_score -= 5
+
+    return {
+        "design_score": max(0, min(100, design_score)),
+        "page_count": page_count,
+        "font_count": font_variety,
+        "avg_font_size": round(avg_font_size, 2),
+        "fonts": list(font_names)[:5] # Sample
+    }
+
+
+def analyze_resume_design(pdf_bytes: bytes) -> Dict[str, Any]:
+    """
+    Design metrics straight from PDF bytes.
+    Prefer `design_metrics(parse_resume(...))` when the text is needed as well.
+    """
+    return design_metrics(parse_resume(pdf_bytes))
+
 
 def extract_resume_text(pdf_bytes: bytes) -> str:
-    try:
-        return extract_text(io.BytesIO(pdf_bytes))
-    except Exception as e:
-        logger.error(f"Error extracting text: {e}")
-        return ""
+    """Resume text straight from PDF bytes ("" if the PDF cannot be parsed)."""
+    return parse_resume(pdf_bytes).text
@@ -0,0 +1,154 @@
+"""
+Content-addressed cache of resume parse results.
+
+Results are keyed by the SHA-256 of the PDF bytes, so the same file sent to
+several jobs, or re-evaluated, is parsed once. Lookups go through an
+in-memory LRU first, then a local on-disk store that is trimmed back to a
+size budget by evicting the least recently used entries.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from cache import LRUCache
+from config import RESUME_CACHE_DIR, RESUME_CACHE_MAX_MB, RESUME_CACHE_MEMORY_ITEMS
+from ingestion.parse_pool import parse_resume_in_pool
+from ingestion.resume import design_metrics
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ResumeAnalysis:
+    """What evaluation needs from a resume, small enough to cache."""
+    sha256: str
+    pages: List[str] = field(default_factory=list)
+    design: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def text(self) -> str:
+        return "".join(page + "\f" for page in self.pages)
+
+
+class DiskStore:
+    """One JSON file per resume hash, evicted oldest-access-first above `max_bytes`."""
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._approx_bytes: Optional[int] = None
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                value = json.load(f)
+            os.utime(path)  # mark as recently used for eviction
+            return value
+        except (OSError, ValueError):
+            return None
+
+    def set(self, key: str, value: Dict[str, Any]):
+        os.makedirs(self.directory, exist_ok=True)
+        data = json.dumps(value).encode("utf-8")
+        tmp = f"{self._path(key)}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, self._path(key))
+
+        with self._lock:
+            if self._approx_bytes is None:
+                self._approx_bytes = self._scan_size()
+            else:
+                self._approx_bytes += len(data)
+            if self._approx_bytes > self.max_bytes:
+                self._evict()
+
+    def _entries(self):
+        for name in os.listdir(self.directory):
+            if name.endswith(".json"):
+                try:
+                    yield os.stat(os.path.join(self.directory, name)), name
+                except OSError:
+                    continue
+
+    def _scan_size(self) -> int:
+        return sum(st.st_size for st, _ in self._entries())
+
+    def _evict(self):
+        entries = sorted(self._entries(), key=lambda e: e[0].st_mtime)
+        total = sum(st.st_size for st, _ in entries)
+        # Trim to 90% so we don't evict on every write once full
+        target = self.max_bytes * 0.9
+        for st, name in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+                total -= st.st_size
+            except OSError:
+                continue
+        self._approx_bytes = total
+
+
+_memory = LRUCache(max_items=RESUME_CACHE_MEMORY_ITEMS)
+_disk = DiskStore(RESUME_CACHE_DIR, RESUME_CACHE_MAX_MB * 1024 * 1024) if RESUME_CACHE_DIR else None
+_counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+_counters_lock = threading.Lock()
+
+
+def _count(name: str):
+    with _counters_lock:
+        _counters[name] += 1
+
+
+def resume_hash(pdf_bytes: bytes) -> str:
+    return hashlib.sha256(pdf_bytes).hexdigest()
+
+
+def analyze_resume(pdf_bytes: bytes) -> ResumeAnalysis:
+    """Parse a resume (text + design metrics), reusing any earlier result for identical bytes."""
+    key = resume_hash(pdf_bytes)
+
+    analysis = _memory.get(key)
+    if analysis is not None:
+        _count("memory_hits")
+        return analysis
+
+    if _disk is not None:
+        stored = _disk.get(key)
+        if stored is not None:
+            _count("disk_hits")
+            analysis = ResumeAnalysis(sha256=key, pages=stored["pages"], design=stored["design"])
+            _memory.set(key, analysis)
+            return analysis
+
+    _count("misses")
+    parsed = parse_resume_in_pool(pdf_bytes)
+    analysis = ResumeAnalysis(sha256=key, pages=parsed.pages, design=design_metrics(parsed))
+
+    # Timeouts and crashes may not repeat next time, so only successful parses are kept
+    if not parsed.error:
+        _memory.set(key, analysis)
+        if _disk is not None:
+            try:
+                _disk.set(key, {"pages": analysis.pages, "design": analysis.design})
+            except OSError as e:
+                logger.warning(f"Could not write resume cache entry {key}: {e}")
+    return analysis
+
+
+def cache_stats() -> Dict[str, int]:
+    """Hit/miss counters since process start."""
+    with _counters_lock:
+        stats = dict(_counters)
+    stats["memory_entries"] = len(_memory)
+    return stats
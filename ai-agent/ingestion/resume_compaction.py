@@ -0,0 +1,160 @@
+"""
+Fit resume text into a token budget for the evaluation prompt.
+
+Instead of cutting the text at a fixed character count, the resume is
+cleaned (whitespace, page numbers, headers/footers repeated on every page),
+split into sections at its headings, and whole sections are kept in order of
+how much they tell a recruiter until the budget is used. The kept sections
+stay in document order and omitted ones are named, so the model knows what
+it isn't seeing.
+"""
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional
+
+# Lower rank = kept first. Matched against normalized heading text.
+SECTION_RANKS = [
+    (0, ("summary", "profile", "about", "objective")),
+    (1, ("experience", "employment", "work history", "career", "professional background")),
+    (2, ("skills", "technologies", "technical", "tech stack", "competencies", "tools")),
+    (3, ("projects", "portfolio", "open source")),
+    (4, ("education", "academic", "qualifications")),
+    (5, ("certifications", "certificates", "licenses", "awards", "achievements", "honors", "publications")),
+    (7, ("interests", "hobbies", "references", "referees", "personal details")),
+]
+OTHER_RANK = 6
+# The untitled block before the first heading: name and contact details
+PREAMBLE_RANK = 0
+
+SMALL_WORDS = {"and", "of", "the", "in", "for"}
+
+# Lines this close to a page's top or bottom are header/footer candidates
+EDGE_LINES = 3
+
+PAGE_NUMBER = re.compile(r"^(page\s*)?\d+(\s*(/|of)\s*\d+)?$", re.IGNORECASE)
+WHITESPACE = re.compile(r"[ \t ]+")
+
+
+@dataclass
+class Section:
+    title: str
+    lines: List[str]
+    rank: int
+
+
+@dataclass
+class CompactResume:
+    text: str
+    tokens: int
+    omitted: List[str] = field(default_factory=list)
+    truncated: Optional[str] = None
+
+
+def _normalize(line: str) -> str:
+    return WHITESPACE.sub(" ", line).strip()
+
+
+def _edge_key(line: str) -> str:
+    # "Page 2 of 3" and "Page 3 of 3" are the same footer
+    return re.sub(r"\d+", "#", line.lower())
+
+
+def clean_pages(pages: List[str]) -> List[str]:
+    """Normalized non-empty lines with page numbers and repeated headers/footers removed."""
+    page_lines = [[_normalize(line) for line in page.splitlines()] for page in pages]
+    page_lines = [[line for line in lines if line] for lines in page_lines]
+    page_lines = [lines for lines in page_lines if lines]
+
+    repeated = set()
+    if len(page_lines) >= 2:
+        seen = Counter()
+        for lines in page_lines:
+            seen.update({_edge_key(line) for line in lines[:EDGE_LINES] + lines[-EDGE_LINES:]})
+        threshold = max(2, int(len(page_lines) * 0.6 + 0.5))
+        repeated = {key for key, count in seen.items() if count >= threshold}
+
+    cleaned = []
+    for lines in page_lines:
+        for i, line in enumerate(lines):
+            at_edge = i < EDGE_LINES or i >= len(lines) - EDGE_LINES
+            if at_edge and (_edge_key(line) in repeated or PAGE_NUMBER.match(line)):
+                continue
+            cleaned.append(line)
+    return cleaned
+
+
+def _heading_rank(line: str) -> Optional[int]:
+    """Rank of the section this line starts, or None if it isn't a heading."""
+    text = line.strip().rstrip(":").strip()
+    if not text or len(text) > 40 or text.endswith((".", ",")):
+        return None
+    words = re.findall(r"[^\W\d_]+", text)
+    if not words or not all(w[0].isupper() or w.lower() in SMALL_WORDS for w in words):
+        # Headings are title case or capitals; "Built internal tools" isn't one
+        return None
+    lowered = text.lower()
+    for rank, keywords in SECTION_RANKS:
+        if any(lowered == k or lowered.startswith(k + " ") or lowered.endswith(" " + k) for k in keywords):
+            return rank
+    # Other short all-caps lines ("VOLUNTEERING") are headings too
+    letters = [c for c in text if c.isalpha()]
+    if len(letters) >= 4 and all(c.isupper() for c in letters) and len(text.split()) <= 4:
+        return OTHER_RANK
+    return None
+
+
+def split_sections(lines: List[str]) -> List[Section]:
+    sections = [Section(title="", lines=[], rank=PREAMBLE_RANK)]
+    for line in lines:
+        rank = _heading_rank(line)
+        if rank is not None:
+            sections.append(Section(title=line.rstrip(":").strip(), lines=[line], rank=rank))
+        else:
+            sections[-1].lines.append(line)
+    return [section for section in sections if section.lines]
+
+
+def compact_resume(text: str, budget_tokens: int, count_tokens: Callable[[str], int]) -> CompactResume:
+    """
+    Compact `text` (pages separated by form feeds) to at most `budget_tokens`
+    as measured by `count_tokens`. The first section that doesn't fit whole
+    is cut at a line boundary; after that, lower-ranked sections are only
+    kept if they still fit whole.
+    """
+    sections = split_sections(clean_pages(text.split("\f")))
+    costs = [count_tokens("\n".join(section.lines)) for section in sections]
+
+    kept = {}
+    omitted = set()
+    truncated = None
+    remaining = budget_tokens
+    for i in sorted(range(len(sections)), key=lambda i: sections[i].rank):
+        if costs[i] <= remaining:
+            kept[i] = sections[i].lines
+            remaining -= costs[i]
+            continue
+        if truncated is None and remaining > 0:
+            lines = []
+            for line in sections[i].lines:
+                cost = count_tokens(line)
+                if cost > remaining:
+                    break
+                lines.append(line)
+                remaining -= cost
+            if lines:
+                kept[i] = lines + ["[...]"]
+                truncated = sections[i].title or "header"
+                continue
+        omitted.add(i)
+
+    body = "\n".join("\n".join(kept[i]) for i in sorted(kept))
+    names = [sections[i].title for i in sorted(omitted) if sections[i].title]
+    if names:
+        body += "\n[Sections omitted for length: " + ", ".join(names) + "]"
+    return CompactResume(
+        text=body,
+        tokens=budget_tokens - remaining,
+        omitted=names,
+        truncated=truncated,
+    )
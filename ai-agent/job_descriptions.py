@@ -0,0 +1,124 @@
+# job_descriptions.py
+"""
+Job descriptions for the applications being evaluated.
+
+The jobs a batch needs that aren't cached yet are read with a single `$in`
+query on the `jobs` collection and cached per jobId, including jobs that
+don't exist so they aren't looked up again. A change stream on `jobs` drops
+an entry as soon as the job is edited or deleted; where change streams are
+unavailable, JOB_CACHE_TTL_SECONDS bounds how stale a description can get.
+An application's own `jobDescription` is used when its job has none.
+"""
+import logging
+import threading
+from typing import Any, Dict, Iterable, Optional
+
+from bson import ObjectId
+from pymongo.errors import PyMongoError
+
+from cache import LRUCache
+from config import JOB_CACHE_MAX_ITEMS, JOB_CACHE_TTL_SECONDS
+from db import jobs
+
+logger = logging.getLogger(__name__)
+
+_cache = LRUCache(max_items=JOB_CACHE_MAX_ITEMS, ttl_seconds=JOB_CACHE_TTL_SECONDS)
+_queries = 0
+_queries_lock = threading.Lock()
+
+
+def _cache_key(job_id: Any) -> str:
+    # Backend applications hold an ObjectId, API submissions its hex string
+    return str(job_id)
+
+
+def _query_id(job_id: Any) -> Any:
+    if isinstance(job_id, str) and ObjectId.is_valid(job_id):
+        return ObjectId(job_id)
+    return job_id
+
+
+def _describe(job: Dict[str, Any]) -> Optional[str]:
+    description = (job.get("description") or "").strip()
+    if not description:
+        return None
+    title = (job.get("jobTitle") or "").strip()
+    return f"{title}\n\n{description}" if title else description
+
+
+def prefetch(apps: Iterable[Dict[str, Any]]) -> int:
+    """Load the uncached jobs of `apps` with one query; returns how many jobs were looked up."""
+    global _queries
+    wanted: Dict[str, Any] = {}
+    for app in apps:
+        job_id = app.get("jobId")
+        if job_id is None:
+            continue
+        key = _cache_key(job_id)
+        if key not in wanted and key not in _cache:
+            wanted[key] = _query_id(job_id)
+    if not wanted:
+        return 0
+
+    try:
+        found = {
+            _cache_key(job["_id"]): _describe(job)
+            for job in jobs.find({"_id": {"$in": list(wanted.values())}}, {"jobTitle": 1, "description": 1})
+        }
+    except PyMongoError as e:
+        # Evaluate without the job description rather than fail the batch
+        logger.warning(f"Could not load job descriptions: {e}")
+        return 0
+    with _queries_lock:
+        _queries += 1
+    for key in wanted:
+        _cache.set(key, found.get(key))
+    return len(wanted)
+
+
+def for_application(app: Dict[str, Any]) -> Optional[str]:
+    """The job description to evaluate `app` against, or None."""
+    description = None
+    job_id = app.get("jobId")
+    if job_id is not None:
+        key = _cache_key(job_id)
+        if key not in _cache:
+            prefetch([app])
+        description = _cache.get(key)
+    return description or app.get("jobDescription") or None
+
+
+def invalidate(job_id: Any = None):
+    """Forget one job, or every job when `job_id` is None."""
+    if job_id is None:
+        _cache.clear()
+    else:
+        _cache.pop(_cache_key(job_id))
+
+
+def _follow(stream):
+    try:
+        for change in stream:
+            # Drops and invalidations carry no documentKey: forget everything
+            invalidate(change.get("documentKey", {}).get("_id"))
+    except PyMongoError as e:
+        logger.warning(f"Job change stream stopped ({e}); cached jobs now expire after {JOB_CACHE_TTL_SECONDS}s")
+        invalidate()
+
+
+def watch_job_changes() -> bool:
+    """Invalidate cached jobs as they change; False where change streams are unavailable."""
+    try:
+        stream = jobs.watch()
+    except PyMongoError as e:
+        logger.info(f"Job change stream unavailable ({e}); cached jobs expire after {JOB_CACHE_TTL_SECONDS}s")
+        return False
+    threading.Thread(target=_follow, args=(stream,), name="job-changes", daemon=True).start()
+    return True
+
+
+def stats() -> Dict[str, Any]:
+    """Cache counters and `jobs` queries since process start."""
+    counts: Dict[str, Any] = _cache.stats()
+    counts["queries"] = _queries
+    return counts
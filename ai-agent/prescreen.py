@@ -0,0 +1,152 @@
+# prescreen.py
+"""
+Cheap local pre-screen that runs before the model.
+
+Resume terms are compared with the job description's terms. The share of
+job terms the resume covers decides whether the application is rejected
+without a model call, deprioritized behind better matches, fast-tracked, or
+simply evaluated. In "shadow" mode decisions are only recorded, next to the
+model's tier, so the thresholds can be checked before they are enforced.
+"""
+import re
+import threading
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import (
+    PRESCREEN_FAST_TRACK_ABOVE,
+    PRESCREEN_LOW_PRIORITY_BELOW,
+    PRESCREEN_MIN_JOB_TERMS,
+    PRESCREEN_MODE,
+    PRESCREEN_REJECT_BELOW,
+)
+from tiering import compute_tier
+
+CALL_MODEL = "llm"
+REJECT = "reject"
+LOW_PRIORITY = "low_priority"
+FAST_TRACK = "fast_track"
+
+# Model tier letters each decision is expected to agree with
+EXPECTED_LETTERS = {
+    REJECT: {"F"},
+    LOW_PRIORITY: {"C", "F"},
+    FAST_TRACK: {"A", "B"},
+}
+
+# Keeps tech terms like c++, c#, node.js and ci/cd in one piece
+TERM = re.compile(r"[a-z0-9][a-z0-9+#./-]*[a-z0-9+#]|[a-z0-9]")
+
+STOPWORDS = set("""
+a about above after all also an and any are as at be been being both but by can candidate
+candidates company could day do does each etc experience for from good great has have help
+including into is it its job join just looking may more most must new of on or our out over
+per plus preferred required requirements responsibilities role should so strong such team teams
+than that the their them then there these they this through to us using various we well what
+when where which while who will with within work working would year years you your
+""".split())
+
+
+@dataclass
+class PreScreen:
+    decision: str
+    overlap: float
+    matched: List[str] = field(default_factory=list)
+    missing: List[str] = field(default_factory=list)
+    reason: str = ""
+
+    def as_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["overlap"] = round(self.overlap, 3)
+        # Enough to review a decision without bloating the evaluation record
+        data["matched"] = self.matched[:20]
+        data["missing"] = self.missing[:20]
+        return data
+
+
+_counters: Dict[str, int] = {}
+_counters_lock = threading.Lock()
+
+
+def _count(name: str):
+    with _counters_lock:
+        _counters[name] = _counters.get(name, 0) + 1
+
+
+def terms(text: Optional[str]) -> set:
+    found = set()
+    for term in TERM.findall((text or "").lower()):
+        term = term.strip(".-/")
+        if len(term) >= 2 and term not in STOPWORDS and not term.isdigit():
+            found.add(term)
+    return found
+
+
+def prescreen(resume_text: str, job_description: Optional[str]) -> PreScreen:
+    """Decide how to handle an application from job-term overlap alone."""
+    job_terms = terms(job_description)
+    if len(job_terms) < PRESCREEN_MIN_JOB_TERMS:
+        return PreScreen(CALL_MODEL, 0.0, reason="job description too short to pre-screen")
+
+    resume_terms = terms(resume_text)
+    matched = sorted(job_terms & resume_terms)
+    missing = sorted(job_terms - resume_terms)
+    overlap = len(matched) / len(job_terms)
+
+    if overlap < PRESCREEN_REJECT_BELOW:
+        decision = REJECT
+    elif overlap < PRESCREEN_LOW_PRIORITY_BELOW:
+        decision = LOW_PRIORITY
+    elif overlap >= PRESCREEN_FAST_TRACK_ABOVE:
+        decision = FAST_TRACK
+    else:
+        decision = CALL_MODEL
+    screen = PreScreen(decision, overlap, matched, missing, reason=f"{len(matched)}/{len(job_terms)} job terms in resume")
+    _count(decision)
+    return screen
+
+
+def heuristic_result(
+    screen: PreScreen,
+    design_data: Dict[str, Any],
+    github_data: Optional[Dict[str, Any]] = None,
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """(scores, tier) for an application rejected without a model call."""
+    content = min(100, round(screen.overlap * 200))
+    design = int(design_data.get("design_score", 0) or 0)
+    projects = int((github_data or {}).get("project_score", 0) or 0)
+    scores = {
+        "contentScore": content,
+        "designScore": design,
+        "projectsScore": projects,
+        "overallScore": round(content * 0.6 + projects * 0.25 + design * 0.15),
+        "reasoningSummary": (
+            f"Pre-screened without AI evaluation: the resume covers {screen.overlap:.0%} of the job "
+            f"description's key terms ({screen.reason})."
+        ),
+    }
+    return scores, compute_tier(scores)
+
+
+def record_agreement(screen: Dict[str, Any], tier: Dict[str, Any]) -> Optional[bool]:
+    """
+    Whether the model's tier agrees with a (shadow) pre-screen decision;
+    None for decisions that make no prediction.
+    """
+    expected = EXPECTED_LETTERS.get(screen.get("decision"))
+    if expected is None:
+        return None
+    agrees = tier.get("letter") in expected
+    screen["agreesWithModel"] = agrees
+    _count("agreed" if agrees else "disagreed")
+    return agrees
+
+
+def stats() -> Dict[str, Any]:
+    """Decision counts and shadow-mode agreement with the model since process start."""
+    with _counters_lock:
+        counts = dict(_counters)
+    judged = counts.get("agreed", 0) + counts.get("disagreed", 0)
+    counts["agreement"] = round(counts.get("agreed", 0) / judged, 3) if judged else None
+    counts["mode"] = PRESCREEN_MODE
+    return counts
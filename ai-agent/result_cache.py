@@ -0,0 +1,100 @@
+# result_cache.py
+"""
+Cache of finished evaluations.
+
+The key covers everything that decides the model's answer: the resume bytes,
+the candidate's links, the job description, the prompt version and the
+model. A duplicate application or re-submission with nothing changed is then
+answered from MongoDB instead of re-running ingestion and the model. A new
+rubric or GEMINI_MODEL changes every key, and clear_stale() drops the
+entries they made obsolete.
+"""
+import hashlib
+import json
+import logging
+import threading
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit
+
+from config import EVALUATION_CACHE_ENABLED, GEMINI_MODEL
+from db import clear_evaluation_cache, get_cached_evaluation, save_cached_evaluation
+
+logger = logging.getLogger(__name__)
+
+_counters = {"hits": 0, "misses": 0}
+_counters_lock = threading.Lock()
+
+
+def normalize_link(url: Optional[str]) -> Optional[str]:
+    """Canonical form of a profile link: https, lowercase host without www, no query/fragment/trailing slash."""
+    url = (url or "").strip()
+    if not url:
+        return None
+    if "://" not in url:
+        url = "https://" + url
+    parts = urlsplit(url)
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    return urlunsplit(("https", host, parts.path.rstrip("/"), "", ""))
+
+
+def cache_key(
+    resume_sha256: Optional[str],
+    links: Dict[str, Optional[str]],
+    job_description: Optional[str],
+    prompt_version: str,
+    model: Optional[str] = GEMINI_MODEL,
+) -> str:
+    material = {
+        "resume": resume_sha256,
+        "links": {name: normalize_link(url) for name, url in sorted(links.items()) if normalize_link(url)},
+        "job": hashlib.sha256((job_description or "").strip().encode("utf-8")).hexdigest(),
+        "prompt": prompt_version,
+        "model": model,
+    }
+    return hashlib.sha256(json.dumps(material, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _count(name: str):
+    with _counters_lock:
+        _counters[name] += 1
+
+
+def lookup(key: str) -> Optional[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """(scores, tier) from an earlier identical evaluation, or None."""
+    if not EVALUATION_CACHE_ENABLED:
+        return None
+    try:
+        entry = get_cached_evaluation(key)
+    except Exception as e:
+        # The cache is an optimisation; never fail an evaluation over it
+        logger.warning(f"Evaluation cache lookup failed: {e}")
+        entry = None
+    _count("hits" if entry else "misses")
+    if entry is None:
+        return None
+    return entry["scores"], entry["tier"]
+
+
+def store(key: str, scores: Dict[str, Any], tier: Dict[str, Any], prompt_version: str):
+    if not EVALUATION_CACHE_ENABLED:
+        return
+    try:
+        save_cached_evaluation(key, scores, tier, prompt_version, GEMINI_MODEL)
+    except Exception as e:
+        logger.warning(f"Could not cache evaluation {key}: {e}")
+
+
+def clear_stale(prompt_version: str) -> int:
+    """Remove entries made with another prompt version or model; returns how many."""
+    return clear_evaluation_cache(keep={"promptVersion": prompt_version, "model": GEMINI_MODEL})
+
+
+def stats() -> Dict[str, Any]:
+    """Hit/miss counters since process start."""
+    with _counters_lock:
+        counts = dict(_counters)
+    total = counts["hits"] + counts["misses"]
+    counts["hit_rate"] = round(counts["hits"] / total, 3) if total else 0.0
+    return counts
@@ -0,0 +1,174 @@
+import functools
+import threading
+import time
+from unittest.mock import patch
+
+import mongomock
+import pytest
+
+import agent_loop
+import job_descriptions
+from evaluation_writer import EvaluationWriter
+
+
+@pytest.fixture(autouse=True)
+def lease_helpers():
+    with patch("agent_loop.reclaim_expired_leases", return_value={"requeued": 0, "dead_lettered": 0}), \
+         patch("agent_loop.release_application", return_value="pending") as mock_release, \
+         patch("job_descriptions.jobs", mongomock.MongoClient().db.jobs):
+        job_descriptions.invalidate()
+        yield mock_release
+
+
+@pytest.fixture(autouse=True)
+def written():
+    """Results the agent wrote to Mongo, one write per batch."""
+    writes = []
+    with patch("agent_loop.results_writer", EvaluationWriter(max_items=100, write=writes.append)):
+        yield writes
+
+
+@pytest.fixture
+def pending():
+    return [
+        {"_id": f"app{i}", "jobId": "JOB1", "links": {}, "resume": {}}
+        for i in range(6)
+    ]
+
+
+def test_run_once_concurrent_evaluates_every_application(pending, written):
+    in_flight = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def slow_evaluate(**kwargs):
+        nonlocal in_flight, peak
+        with lock:
+            in_flight += 1
+            peak = max(peak, in_flight)
+        time.sleep(0.05)
+        with lock:
+            in_flight -= 1
+        return {"overallScore": 80}, {"code": "A8"}
+
+    with patch("agent_loop.claim_pending_applications", return_value=pending), \
+         patch("agent_loop.evaluate_candidate", side_effect=slow_evaluate):
+        done = agent_loop.run_once(max_batch=6, concurrency=3)
+
+    assert done == 6
+    assert peak == 3
+    assert len(written) == 1
+    assert sorted(result["app_id"] for result in written[0]) == sorted(app["_id"] for app in pending)
+
+
+def test_run_once_concurrent_isolates_failures(pending, lease_helpers, written):
+    def flaky_evaluate(**kwargs):
+        if kwargs["links"].get("boom"):
+            raise RuntimeError("model exploded")
+        return {"overallScore": 50}, {"code": "F5"}
+
+    pending[0]["links"] = {"boom": True}
+
+    with patch("agent_loop.claim_pending_applications", return_value=pending), \
+         patch("agent_loop.evaluate_candidate", side_effect=flaky_evaluate):
+        done = agent_loop.run_once(max_batch=6, concurrency=4)
+
+    assert done == 5
+    assert len(written[0]) == 5
+    lease_helpers.assert_called_once()
+    assert lease_helpers.call_args.args[0] == "app0"
+
+
+def test_run_once_no_pending():
+    with patch("agent_loop.claim_pending_applications", return_value=[]):
+        assert agent_loop.run_once() == 0
+
+
+def test_run_once_pauses_while_model_breaker_is_open():
+    from datetime import datetime, timedelta
+
+    with patch("agent_loop.paused_until", return_value=datetime.utcnow() + timedelta(seconds=30)), \
+         patch("agent_loop.claim_pending_applications") as mock_claim:
+        assert agent_loop.run_once() == 0
+    mock_claim.assert_not_called()
+
+
+def test_retry_later_defers_instead_of_failing(pending, lease_helpers, written):
+    from errors import RetryLater
+
+    with patch("agent_loop.claim_pending_applications", return_value=pending[:1]), \
+         patch("agent_loop.evaluate_candidate", side_effect=RetryLater("quota")), \
+         patch("agent_loop.defer_application") as mock_defer:
+        done = agent_loop.run_once(max_batch=1)
+
+    assert done == 0
+    mock_defer.assert_called_once()
+    lease_helpers.assert_not_called()
+    assert written == []
+
+
+def test_prescreen_deprioritization_defers_with_lower_priority(pending):
+    from errors import Deprioritized
+
+    pending[1]["priority"] = -1
+    seen = []
+
+    def evaluate(**inputs):
+        seen.append(inputs["allow_deprioritize"])
+        raise Deprioritized("weak match")
+
+    with patch("agent_loop.claim_pending_applications", return_value=pending[:2]), \
+         patch("agent_loop.evaluate_candidate", side_effect=evaluate), \
+         patch("agent_loop.defer_application") as mock_defer:
+        agent_loop.run_once(max_batch=2)
+
+    assert seen == [True, False]
+    assert mock_defer.call_args.kwargs["priority"] == -1
+
+
+def test_run_once_batches_applicants_per_job(pending, written):
+    from evaluators import PreparedCandidate
+
+    for i, app in enumerate(pending):
+        app["jobId"] = "JOB1" if i < 4 else "JOB2"
+    # Same job, but two applications carry their own description
+    pending[0]["jobDescription"] = pending[1]["jobDescription"] = "Backend engineer"
+
+    def prepare(**inputs):
+        return PreparedCandidate(
+            job_id=inputs["job_id"], job_description=inputs["job_description"], links={},
+            resume_text="text", design_data={},
+        )
+
+    def batch(group):
+        return {key: ({"overallScore": 70}, {"code": "C7"}) for key in group}
+
+    with patch("agent_loop.claim_pending_applications", return_value=pending), \
+         patch("agent_loop.prepare_candidate", side_effect=prepare), \
+         patch("agent_loop.evaluate_prepared_batch", side_effect=batch) as mock_batch:
+        done = agent_loop.run_once(max_batch=6, concurrency=2, llm_batch_size=3)
+
+    assert done == 6
+    groups = [call.args[0] for call in mock_batch.call_args_list]
+    assert sorted(len(group) for group in groups) == [2, 2, 2]
+    assert all(len({(c.job_id, c.job_description) for c in group.values()}) == 1 for group in groups)
+    assert len(written[0]) == 6
+
+
+def test_leases_are_renewed_while_evaluating(pending):
+    renewed = []
+
+    def slow_evaluate(**kwargs):
+        time.sleep(0.2)
+        return {"overallScore": 80}, {"code": "A8"}
+
+    with patch("agent_loop.claim_pending_applications", return_value=pending[:2]) as mock_claim, \
+         patch("agent_loop.evaluate_candidate", side_effect=slow_evaluate), \
+         patch("agent_loop.LeaseHeartbeat", functools.partial(agent_loop.LeaseHeartbeat, lease_seconds=0.15)), \
+         patch("agent_loop.extend_leases", side_effect=lambda ids, worker, seconds: renewed.append(list(ids))):
+        done = agent_loop.run_once(max_batch=6, concurrency=2)
+
+    assert done == 2
+    # No more claimed than there are threads
+    assert mock_claim.call_args.kwargs["limit"] == 2
+    assert renewed and renewed[0] == ["app0", "app1"]
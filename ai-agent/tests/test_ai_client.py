@@ -0,0 +1,247 @@
+import asyncio
+import time
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import httpx
+import pytest
+from google.genai import errors
+
+import ai_client
+from ai_client import CircuitBreaker, ModelClient, ModelUnavailable, TokenBucket
+from cache import LRUCache
+
+
+def response(text="{}", prompt_tokens=100, cached_tokens=0):
+    return SimpleNamespace(
+        text=text,
+        usage_metadata=SimpleNamespace(
+            prompt_token_count=prompt_tokens,
+            cached_content_token_count=cached_tokens,
+            candidates_token_count=20,
+        ),
+    )
+
+
+class FakeGenAI:
+    """
+    Stands in for genai.Client. Each call pops the next scripted outcome
+    (an exception to raise or a response to return) after `latency` seconds.
+    """
+
+    def __init__(self, outcomes=(), latency=0.0):
+        self.outcomes = list(outcomes)
+        self.latency = latency
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.caches = MagicMock()
+        self.caches.create.return_value = SimpleNamespace(name="cachedContents/abc")
+        self.aio = SimpleNamespace(models=SimpleNamespace(generate_content=self.generate_content))
+
+    async def generate_content(self, model, contents, config=None):
+        self.calls.append({"contents": contents, "config": config, "at": time.monotonic()})
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+            outcome = self.outcomes.pop(0) if self.outcomes else response()
+            if isinstance(outcome, BaseException):
+                raise outcome
+            return outcome
+        finally:
+            self.in_flight -= 1
+
+
+def api_error(code):
+    return errors.APIError(code, {"error": {"code": code, "message": "test", "status": "TEST"}})
+
+
+def model_client(fake, **overrides):
+    settings = dict(
+        rpm=0, tpm=0, max_concurrency=8, timeout=5, deadline=5,
+        max_retries=3, backoff_base=0.01, backoff_max=0.05,
+        breaker=CircuitBreaker(threshold=100, cooldown_seconds=60),
+    )
+    settings.update(overrides)
+    return ModelClient(fake, model="test-model", **settings)
+
+
+def test_retries_429_and_503_with_backoff():
+    fake = FakeGenAI([api_error(429), api_error(503), response("ok")])
+    result = asyncio.run(model_client(fake).generate("prompt"))
+
+    assert result.text == "ok"
+    assert len(fake.calls) == 3
+
+
+def test_client_errors_are_not_retried():
+    fake = FakeGenAI([api_error(400)])
+    with pytest.raises(errors.APIError):
+        asyncio.run(model_client(fake).generate("prompt"))
+    assert len(fake.calls) == 1
+
+
+def test_exhausted_retries_defer_instead_of_failing():
+    fake = FakeGenAI([api_error(429)] * 10)
+    with pytest.raises(ModelUnavailable) as raised:
+        asyncio.run(model_client(fake, max_retries=2).generate("prompt"))
+    assert len(fake.calls) == 3
+    assert raised.value.retry_at is not None
+    # Counts towards dead-lettering an input the provider always fails on
+    assert raised.value.counted
+
+
+def test_slow_calls_time_out_and_are_retried():
+    fake = FakeGenAI([httpx.ConnectError("reset")], latency=0.2)
+    result = asyncio.run(model_client(fake, timeout=0.3).generate("prompt"))
+    assert result.text == "{}"
+
+    fake = FakeGenAI(latency=1.0)
+    started = time.monotonic()
+    with pytest.raises(ModelUnavailable):
+        asyncio.run(model_client(fake, timeout=0.1, deadline=0.35).generate("prompt"))
+    assert time.monotonic() - started < 0.8
+
+
+def test_in_flight_calls_are_capped():
+    fake = FakeGenAI(latency=0.05)
+    client = model_client(fake, max_concurrency=2)
+
+    async def burst():
+        await asyncio.gather(*(client.generate(f"p{i}") for i in range(6)))
+
+    asyncio.run(burst())
+    assert fake.max_in_flight == 2
+
+
+def test_rpm_bucket_spaces_out_calls():
+    fake = FakeGenAI()
+    # 600 RPM = one call per 0.1s once the initial burst allowance is spent
+    client = model_client(fake, rpm=600)
+    client.requests.tokens = 1
+
+    async def burst():
+        await asyncio.gather(*(client.generate(f"p{i}") for i in range(4)))
+
+    asyncio.run(burst())
+    gaps = [b["at"] - a["at"] for a, b in zip(fake.calls, fake.calls[1:])]
+    assert min(gaps) >= 0.08
+
+
+def test_tpm_bucket_is_charged_actual_usage():
+    async def run():
+        bucket = TokenBucket(per_minute=6000)
+        await bucket.acquire(1000)
+        bucket.debit(500)
+        return bucket.tokens
+
+    assert 4450 < asyncio.run(run()) < 4600
+
+
+def test_breaker_opens_fails_fast_then_recovers():
+    breaker = CircuitBreaker(threshold=2, cooldown_seconds=0.2)
+    fake = FakeGenAI([api_error(503), api_error(503)])
+    client = model_client(fake, max_retries=5, breaker=breaker)
+
+    with pytest.raises(ModelUnavailable, match="circuit breaker"):
+        asyncio.run(client.generate("prompt"))
+    assert len(fake.calls) == 2
+    assert breaker.open_until() is not None
+
+    # Still open: no call reaches the provider
+    with pytest.raises(ModelUnavailable):
+        asyncio.run(client.generate("prompt"))
+    assert len(fake.calls) == 2
+
+    time.sleep(0.25)
+    assert asyncio.run(client.generate("prompt")).text == "{}"
+    assert breaker.open_until() is None and breaker.failures == 0
+
+
+def test_failed_trial_call_reopens_breaker():
+    breaker = CircuitBreaker(threshold=1, cooldown_seconds=0.1)
+    breaker.record_failure()
+    time.sleep(0.15)
+
+    assert breaker.allow()
+    assert not breaker.allow()  # only one trial at a time
+    breaker.record_failure()
+    assert breaker.open_until() is not None
+
+
+def test_trial_call_without_a_verdict_frees_the_trial():
+    breaker = CircuitBreaker(threshold=1, cooldown_seconds=0.1)
+    breaker.record_failure()
+    time.sleep(0.15)
+    # One request per minute, already spent: the trial times out waiting for quota
+    client = model_client(FakeGenAI(), rpm=1, deadline=0.05, breaker=breaker)
+    client.requests.tokens = 0
+
+    with pytest.raises(ModelUnavailable, match="no time before the deadline") as raised:
+        asyncio.run(client.generate("prompt"))
+    assert not raised.value.counted
+
+    assert breaker.allow()  # the next call gets to be the trial
+
+
+def test_paused_until_reports_open_breaker():
+    client = model_client(FakeGenAI(), breaker=CircuitBreaker(threshold=1, cooldown_seconds=30))
+    with patch.object(ai_client, "_model", client):
+        assert ai_client.paused_until() is None
+        client.breaker.record_failure()
+        assert ai_client.paused_until() is not None
+
+
+@pytest.fixture
+def fake_client():
+    fake = FakeGenAI([response(prompt_tokens=1200, cached_tokens=1000)])
+    usage = {"calls": 0, "prompt_tokens": 0, "cached_tokens": 0, "output_tokens": 0, "retries": 0}
+    with patch.object(ai_client, "client", fake), \
+         patch.object(ai_client, "_model", model_client(fake)), \
+         patch.object(ai_client, "_context_caches", LRUCache(max_items=8)), \
+         patch.object(ai_client, "_usage", usage):
+        yield fake
+
+
+def test_context_cache_is_created_once_per_prefix(fake_client):
+    assert ai_client.get_context_cache("rubric + job 1") == "cachedContents/abc"
+    assert ai_client.get_context_cache("rubric + job 1") == "cachedContents/abc"
+    ai_client.get_context_cache("rubric + job 2")
+
+    assert fake_client.caches.create.call_count == 2
+
+
+def test_uncacheable_prefix_falls_back_to_system_instruction(fake_client):
+    fake_client.caches.create.side_effect = RuntimeError("Cached content is too small")
+
+    assert ai_client.get_context_cache("short rubric") is None
+    assert ai_client.get_context_cache("short rubric") is None
+    assert fake_client.caches.create.call_count == 1
+
+    ai_client.generate_text("candidate", system_instruction="short rubric")
+    config = fake_client.calls[-1]["config"]
+    assert config.system_instruction == "short rubric"
+    assert config.cached_content is None
+
+
+def test_cached_call_reports_tokens_saved(fake_client):
+    usage = {}
+    ai_client.generate_text(
+        "candidate", system_instruction="rubric", cached_content="cachedContents/abc", usage=usage
+    )
+
+    config = fake_client.calls[-1]["config"]
+    assert config.cached_content == "cachedContents/abc"
+    assert config.system_instruction is None
+    assert usage == {"prompt_tokens": 1200, "cached_tokens": 1000, "output_tokens": 20}
+    assert ai_client.usage_stats()["cached_tokens"] == 1000
+
+
+def test_count_tokens_uses_local_tokenizer_when_available():
+    tokenizer = MagicMock()
+    tokenizer.count_tokens.return_value = SimpleNamespace(total_tokens=7)
+    with patch.object(ai_client, "_tokenizer", tokenizer):
+        assert ai_client.count_tokens("some resume text") == 7
+    with patch.object(ai_client, "_tokenizer", False):
+        assert ai_client.count_tokens("x" * 400) == ai_client.estimate_tokens("x" * 400)
@@ -68,3 +68,237 @@ def test_get_candidate_evaluation_not_found(mock_db):
     # Use a valid 24-char hex string to avoid InvalidId error which causes 500
     response = client.get("/candidates/000000000000000000000000")
     assert response.status_code == 404
+
+
+def test_queue_stats_endpoint():
+    rows = [{"jobId": "J1", "pending": 3, "processing": 1, "topPriority": 0, "oldestWaitSeconds": 120}]
+    with patch("api.queue_stats", return_value=rows):
+        response = client.get("/queue")
+    assert response.status_code == 200
+    assert response.json() == {"jobs": rows}
+
+
+def test_reevaluate_candidate():
+    with patch("api.requeue_application", return_value=True) as mock_requeue:
+        response = client.post("/candidates/000000000000000000000001/reevaluate")
+    assert response.status_code == 200
+    assert mock_requeue.call_count == 1
+
+    with patch("api.requeue_application", return_value=False):
+        response = client.post("/candidates/000000000000000000000001/reevaluate")
+    assert response.status_code == 404
+
+
+def test_slow_query_does_not_block_other_requests(mock_db):
+    import threading
+    import time
+
+    release = threading.Event()
+
+    def slow_find_one(query):
+        release.wait(5)
+        return None
+
+    mock_db["applications"].find_one.side_effect = slow_find_one
+    with TestClient(app) as local_client:
+        slow = threading.Thread(target=local_client.get, args=("/candidates/000000000000000000000000",))
+        slow.start()
+        time.sleep(0.1)
+        started = time.monotonic()
+        assert local_client.get("/").status_code == 200
+        elapsed = time.monotonic() - started
+        release.set()
+        slow.join()
+    assert elapsed < 1
+
+
+@pytest.fixture
+def listed_apps():
+    import mongomock
+    from bson import ObjectId
+
+    collection = mongomock.MongoClient().db.applications
+    collection.insert_many(
+        [{"_id": ObjectId(), "createdAt": datetime(2024, 1, 1 + i % 3), "status": "evaluated",
+          "jobId": "JOB1" if i % 2 else "JOB2", "tier": {"letter": "A" if i < 3 else "F"},
+          "personalInfo": {"firstName": f"C{i}"}, "resume": {"fileId": "f", "filename": f"{i}.pdf"}}
+         for i in range(7)]
+        + [{"_id": ObjectId(), "status": "pending", "jobId": "JOB1"}]
+    )
+    with patch("api.applications", collection):
+        yield collection
+
+
+def test_candidates_list_pages_by_cursor(listed_apps):
+    seen, cursor = [], None
+    while True:
+        response = client.get("/candidates_list", params={"limit": 3, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200
+        assert len(response.json()) <= 3
+        seen += response.json()
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    expected = sorted(listed_apps.find(), key=lambda a: (a.get("createdAt") or datetime.min, a["_id"]), reverse=True)
+    assert [c["candidate_id"] for c in seen] == [str(a["_id"]) for a in expected]
+    assert seen[0]["filename"].endswith(".pdf")
+
+
+def test_candidates_list_filters_and_limits(listed_apps):
+    response = client.get("/candidates_list", params={"job_id": "JOB1", "tier": "f"})
+    assert {c["name"] for c in response.json()} == {"C3", "C5"}
+
+    assert client.get("/candidates_list", params={"status": "pending"}).json()[0]["status"] == "pending"
+    assert client.get("/candidates_list", params={"limit": 1000}).status_code == 422
+    assert client.get("/candidates_list", params={"cursor": "not-a-cursor"}).status_code == 400
+
+
+def test_candidates_list_resolves_jobs_with_one_query():
+    import mongomock
+    from bson import ObjectId
+
+    import api
+
+    client_db = mongomock.MongoClient().db
+    job_ids = [ObjectId() for _ in range(3)]
+    client_db.jobs.insert_many([
+        {"_id": job_id, "jobTitle": f"Role {i}", "publicFormId": f"form-{i}"} for i, job_id in enumerate(job_ids)
+    ])
+    client_db.applications.insert_many(
+        [{"jobId": job_ids[i % 3], "createdAt": datetime(2024, 1, 1)} for i in range(9)]
+        + [{"jobId": str(job_ids[0]), "createdAt": datetime(2024, 1, 1)}, {"jobId": "legacy"}]
+    )
+    api._job_cache.clear()
+    with patch("api.applications", client_db.applications), \
+         patch("api.jobs", wraps=client_db.jobs) as jobs:
+        rows = client.get("/candidates_list").json()
+        assert jobs.find.call_count == 1
+        client.get("/candidates_list")
+        assert jobs.find.call_count == 1
+    api._job_cache.clear()
+
+    assert {row["job_title"] for row in rows} == {"Role 0", "Role 1", "Role 2", "N/A"}
+    assert {row["job_id"] for row in rows} == {"form-0", "form-1", "form-2", "legacy"}
+
+
+def test_stats_come_from_one_aggregation():
+    import mongomock
+
+    collection = mongomock.MongoClient().db.applications
+    collection.insert_many([
+        {"jobId": "J1", "status": "accepted", "tier": {"letter": "C", "code": "C3"}, "lastEvaluatedAt": datetime(2024, 1, 3)},
+        {"jobId": "J1", "status": "evaluated", "tier": {"letter": "A", "code": "A9"}, "lastEvaluatedAt": datetime(2024, 1, 2)},
+        {"jobId": "J1", "status": "rejected", "tier": {"letter": "A", "code": "A8"}},
+        {"jobId": "J2", "status": "evaluated", "tier": {"letter": "F", "code": "F2"}, "scores": {"overallScore": 20}},
+        {"jobId": "J2", "status": "pending"},
+    ])
+    with patch("api.applications", wraps=collection) as apps:
+        data = client.get("/stats").json()
+    assert apps.aggregate.call_count == 1
+    assert apps.method_calls == [c for c in apps.method_calls if c[0] == "aggregate"]
+
+    assert (data["jobs_posted"], data["applications_received"]) == (2, 5)
+    assert (data["applications_selected"], data["applications_rejected"]) == (2, 2)
+    assert [row["tier"] for row in data["selected_list"]] == ["C3", "A9"]
+    assert {row["tier"] for row in data["rejected_list"]} == {"A8", "F2"}
+    assert sorted(data["job_stats"], key=lambda row: row["job_id"]) == [
+        {"job_id": "J1", "total": 3, "selected": 2, "rejected": 1},
+        {"job_id": "J2", "total": 2, "selected": 0, "rejected": 1},
+    ]
+
+
+def test_materialized_stats_read_counters_not_applications():
+    import mongomock
+
+    database = mongomock.MongoClient().db
+    database.job_stats.insert_many([
+        {"_id": "J1", "total": 3, "selected": 2, "rejected": 1},
+        {"_id": "J2", "total": 2, "rejected": 1},
+    ])
+    database.applications.insert_one(
+        {"jobId": "J1", "statsBucket": "selected", "tier": {"code": "A9"}, "lastEvaluatedAt": datetime(2024, 1, 2)}
+    )
+    with patch("api.STATS_MATERIALIZED", True), \
+         patch("api.job_stats", database.job_stats), \
+         patch("api.applications", database.applications):
+        data = client.get("/stats").json()
+
+    assert (data["applications_received"], data["applications_selected"], data["applications_rejected"]) == (5, 2, 2)
+    assert [row["tier"] for row in data["selected_list"]] == ["A9"]
+    assert data["rejected_list"] == []
+
+
+@pytest.fixture
+def export_apps():
+    import mongomock
+    from bson import ObjectId
+
+    database = mongomock.MongoClient().db
+    job_id = ObjectId()
+    database.jobs.insert_one({"_id": job_id, "jobTitle": "Backend Engineer", "publicFormId": "backend-1"})
+    database.applications.insert_many([
+        {"jobId": job_id if i % 2 else "JOB2", "createdAt": datetime(2024, 1, 1 + i), "status": "evaluated",
+         "personalInfo": {"firstName": "Ada", "lastName": f"L{i}", "email": f"ada{i}@example.com"},
+         "tier": {"code": "A9" if i < 3 else "F1", "letter": "A" if i < 3 else "F"},
+         "scores": {"overallScore": 90 - i, "reasoningSummary": 'Strong, "pragmatic"\nengineer'}}
+        for i in range(6)
+    ])
+    with patch("api.applications", database.applications), patch("api.jobs", database.jobs), \
+         patch("api.EXPORT_BATCH", 2):
+        yield job_id
+
+
+def test_export_streams_csv(export_apps):
+    import csv
+    import io
+
+    response = client.get("/candidates_export")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert "attachment" in response.headers["content-disposition"]
+
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["name"] for row in rows] == [f"Ada L{i}" for i in reversed(range(6))]
+    assert rows[0]["reasoning"] == 'Strong, "pragmatic"\nengineer'
+    assert {row["job_title"] for row in rows} == {"Backend Engineer", ""}
+    assert rows[0]["job_id"] == "backend-1"
+
+
+def test_export_csv_neutralizes_formulas(export_apps):
+    import csv
+    import io
+
+    import api
+
+    api.applications.insert_one({
+        "jobId": "JOB2", "createdAt": datetime(2025, 1, 1), "status": "evaluated",
+        "personalInfo": {"firstName": "=HYPERLINK(\"http://evil\")", "lastName": "", "phone": "+1 555 0100"},
+        "scores": {"overallScore": -1, "reasoningSummary": "@SUM(A1)"},
+    })
+    rows = list(csv.DictReader(io.StringIO(client.get("/candidates_export").text)))
+
+    assert rows[0]["name"].startswith("'=HYPERLINK")
+    assert rows[0]["phone"] == "'+1 555 0100"
+    assert rows[0]["reasoning"] == "'@SUM(A1)"
+    assert rows[0]["overall_score"] == "-1"
+    assert rows[1]["name"] == "Ada L5"
+
+
+def test_export_ndjson_with_filters(export_apps):
+    import json
+
+    params = {
+        "format": "ndjson", "job_id": str(export_apps), "tier": "a",
+        "created_from": "2024-01-02", "created_to": "2024-01-05T00:00:00Z",
+    }
+    response = client.get("/candidates_export", params=params)
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["email"] for row in rows] == ["ada1@example.com"]
+
+    assert client.get("/candidates_export", params={"format": "xlsx"}).status_code == 422
+
+    response = client.get("/candidates_export", params={"job_id": 'x"; filename=evil.exe\r\nX-Injected: 1'})
+    assert response.headers["content-disposition"] == 'attachment; filename="candidates-x___filename_evil.exe__X-Injected__1.csv"'
+    assert "x-injected" not in response.headers
@@ -0,0 +1,250 @@
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import mongomock
+import pytest
+
+import db
+
+
+@pytest.fixture
+def apps():
+    collection = mongomock.MongoClient().db.applications
+    with patch("db.applications", collection):
+        yield collection
+
+
+def test_claim_is_exclusive(apps):
+    apps.insert_many([
+        {"status": "pending", "createdAt": datetime(2024, 1, i)} for i in range(1, 4)
+    ])
+
+    first = db.claim_pending_applications("worker-a", limit=2)
+    second = db.claim_pending_applications("worker-b", limit=2)
+
+    assert [a["createdAt"].day for a in first] == [1, 2]
+    assert [a["createdAt"].day for a in second] == [3]
+    assert all(a["status"] == "processing" for a in first + second)
+    assert second[0]["lease"]["workerId"] == "worker-b"
+    assert second[0]["attempts"] == 1
+    assert db.claim_pending_application("worker-c") is None
+
+
+def test_expired_leases_are_requeued_then_dead_lettered(apps):
+    expired = datetime.utcnow() - timedelta(seconds=1)
+    apps.insert_many([
+        {"_id": "crashed", "status": "processing", "attempts": 1,
+         "lease": {"workerId": "gone", "expiresAt": expired}},
+        {"_id": "stuck", "status": "processing", "attempts": 3,
+         "lease": {"workerId": "gone", "expiresAt": expired}},
+        {"_id": "busy", "status": "processing", "attempts": 1,
+         "lease": {"workerId": "alive", "expiresAt": datetime.utcnow() + timedelta(minutes=5)}},
+    ])
+
+    result = db.reclaim_expired_leases(max_attempts=3)
+
+    assert result == {"requeued": 1, "dead_lettered": 1}
+    assert apps.find_one({"_id": "crashed"})["status"] == "pending"
+    assert "lease" not in apps.find_one({"_id": "crashed"})
+    assert apps.find_one({"_id": "stuck"})["status"] == "dead_letter"
+    assert apps.find_one({"_id": "busy"})["status"] == "processing"
+
+
+def test_extend_leases_only_renews_own_processing_applications(apps):
+    expired = datetime.utcnow() - timedelta(seconds=1)
+    apps.insert_many([
+        {"_id": "mine", "status": "processing", "lease": {"workerId": "w1", "expiresAt": expired}},
+        {"_id": "theirs", "status": "processing", "lease": {"workerId": "w2", "expiresAt": expired}},
+        {"_id": "written", "status": "evaluated"},
+    ])
+
+    assert db.extend_leases(["mine", "theirs", "written"], "w1", lease_seconds=60) == 1
+    assert apps.find_one({"_id": "mine"})["lease"]["expiresAt"] > datetime.utcnow()
+    assert apps.find_one({"_id": "theirs"})["lease"]["expiresAt"] < datetime.utcnow()
+    assert db.reclaim_expired_leases()["requeued"] == 1
+
+
+def test_release_requires_lease_owner(apps):
+    apps.insert_one({"_id": "a1", "status": "pending", "createdAt": datetime.utcnow()})
+    db.claim_pending_application("worker-a")
+
+    assert db.release_application("a1", "worker-b", "not mine") is None
+    assert db.release_application("a1", "worker-a", "boom", max_attempts=3) == "pending"
+    assert apps.find_one({"_id": "a1"})["lastError"] == "boom"
+
+
+def test_deferred_application_waits_for_retry_time(apps):
+    apps.insert_one({"_id": "a1", "status": "pending", "createdAt": datetime.utcnow()})
+    claimed = db.claim_pending_application("worker-a")
+
+    db.defer_application("a1", "worker-a", datetime.utcnow() + timedelta(minutes=5), "rate limited")
+
+    assert apps.find_one({"_id": "a1"})["status"] == "pending"
+    assert apps.find_one({"_id": "a1"})["attempts"] == claimed["attempts"] - 1
+    assert db.claim_pending_application("worker-b") is None
+
+    apps.update_one({"_id": "a1"}, {"$set": {"retryAt": datetime.utcnow() - timedelta(seconds=1)}})
+    assert db.claim_pending_application("worker-b")["_id"] == "a1"
+
+
+def test_counted_deferrals_end_in_dead_letter(apps):
+    apps.insert_one({"_id": "a1", "status": "pending", "createdAt": datetime.utcnow()})
+    ready = {"$set": {"retryAt": datetime.utcnow() - timedelta(seconds=1)}}
+
+    statuses = []
+    for _ in range(3):
+        db.claim_pending_application("worker-a")
+        statuses.append(db.defer_application("a1", "worker-a", datetime.utcnow(), "model kept failing",
+                                             counted=True, max_deferrals=3))
+        apps.update_one({"_id": "a1"}, ready)
+
+    assert statuses == ["pending", "pending", "dead_letter"]
+    assert apps.find_one({"_id": "a1"})["deferrals"] == 3
+    # Quota deferrals don't count, and a manual re-evaluation starts over
+    assert db.requeue_application("a1")
+    db.claim_pending_application("worker-a")
+    assert db.defer_application("a1", "worker-a", datetime.utcnow(), "quota") == "pending"
+    assert apps.find_one({"_id": "a1"})["deferrals"] == 0
+
+
+def test_bulk_job_does_not_starve_other_jobs(apps):
+    old = datetime.utcnow() - timedelta(minutes=5)
+    apps.insert_many([
+        {"jobId": "BULK", "status": "pending", "priority": db.PRIORITY_NORMAL, "createdAt": old + timedelta(seconds=i)}
+        for i in range(20)
+    ])
+    apps.insert_many([
+        {"jobId": "FRESH", "status": "pending", "priority": db.PRIORITY_NORMAL, "createdAt": datetime.utcnow()},
+        {"jobId": "OTHER", "status": "pending", "priority": db.PRIORITY_NORMAL, "createdAt": datetime.utcnow()},
+    ])
+
+    claimed = db.claim_pending_applications("worker-a", limit=4)
+
+    assert sorted(a["jobId"] for a in claimed) == ["BULK", "BULK", "FRESH", "OTHER"]
+    # Within a job, oldest first
+    bulk = [a["createdAt"] for a in claimed if a["jobId"] == "BULK"]
+    assert bulk == sorted(bulk)
+    assert bulk[0] == min(doc["createdAt"] for doc in apps.find({"jobId": "BULK"}))
+
+
+def test_claim_reads_job_heads_without_scanning_the_queue(apps):
+    old = datetime.utcnow() - timedelta(minutes=5)
+    apps.insert_many([
+        {"jobId": "BULK", "status": "pending", "priority": db.PRIORITY_NORMAL, "createdAt": old + timedelta(seconds=i)}
+        for i in range(500)
+    ])
+    apps.insert_one({"jobId": "J2", "status": "pending", "priority": db.PRIORITY_NORMAL, "createdAt": datetime.utcnow()})
+
+    with patch.object(apps, "aggregate", side_effect=AssertionError("full queue scan")):
+        claimed = db.claim_pending_applications("worker-a", limit=2)
+
+    assert sorted(app["jobId"] for app in claimed) == ["BULK", "J2"]
+
+
+def test_priority_classes_and_aging(apps):
+    now = datetime.utcnow()
+    apps.insert_many([
+        {"_id": "bulk-new", "jobId": "J1", "status": "pending", "priority": db.PRIORITY_BULK, "createdAt": now},
+        {"_id": "normal", "jobId": "J2", "status": "pending", "priority": db.PRIORITY_NORMAL, "createdAt": now},
+        {"_id": "manual", "jobId": "J3", "status": "pending", "priority": db.PRIORITY_MANUAL, "createdAt": now},
+    ])
+    order = [a["_id"] for a in db.claim_pending_applications("w", limit=3)]
+    assert order == ["manual", "normal", "bulk-new"]
+
+    # A bulk application that has waited long enough competes as normal again
+    apps.insert_many([
+        {"_id": "bulk-old", "jobId": "J1", "status": "pending", "priority": db.PRIORITY_BULK,
+         "createdAt": now - timedelta(hours=24)},
+        {"_id": "normal-2", "jobId": "J2", "status": "pending", "priority": db.PRIORITY_NORMAL, "createdAt": now},
+    ])
+    assert db.claim_pending_applications("w", limit=1)[0]["_id"] == "bulk-old"
+
+
+def test_queue_stats_report_depth_and_oldest_wait(apps):
+    now = datetime.utcnow()
+    apps.insert_many([
+        {"jobId": "J1", "status": "pending", "priority": 0, "createdAt": now - timedelta(minutes=10)},
+        {"jobId": "J1", "status": "pending", "priority": 0, "createdAt": now - timedelta(minutes=1)},
+        {"jobId": "J1", "status": "processing", "priority": 0, "createdAt": now - timedelta(hours=1)},
+        {"jobId": "J2", "status": "pending", "priority": 20, "createdAt": now},
+        {"jobId": "J3", "status": "evaluated", "priority": 0, "createdAt": now},
+    ])
+
+    stats = {row["jobId"]: row for row in db.queue_stats()}
+
+    assert set(stats) == {"J1", "J2"}
+    assert stats["J1"]["pending"] == 2 and stats["J1"]["processing"] == 1
+    assert 595 <= stats["J1"]["oldestWaitSeconds"] <= 605
+    assert stats["J2"]["topPriority"] == 20
+
+
+def test_requeue_for_manual_reevaluation(apps):
+    apps.insert_one({"_id": "done", "status": "evaluated", "attempts": 3, "lastError": "x"})
+    apps.insert_one({"_id": "busy", "status": "processing"})
+
+    assert db.requeue_application("done") is True
+    assert db.requeue_application("busy") is False
+    doc = apps.find_one({"_id": "done"})
+    assert doc["status"] == "pending" and doc["priority"] == db.PRIORITY_MANUAL
+    assert doc["attempts"] == 0 and "lastError" not in doc
+    assert doc["forceFresh"] is True
+
+
+@pytest.fixture
+def stats(apps):
+    # $out writes next to the applications
+    job_stats = apps.database.job_stats
+    with patch("db.job_stats", job_stats), patch("db.STATS_MATERIALIZED", True):
+        yield job_stats
+
+
+def counters(job_stats):
+    return {row["_id"]: (row.get("total", 0), row.get("selected", 0), row.get("rejected", 0)) for row in job_stats.find()}
+
+
+def test_job_stats_follow_status_changes_and_match_a_rebuild(apps, stats):
+    apps.insert_many([
+        {"_id": "a", "jobId": "J1", "status": "evaluated", "tier": {"letter": "A"}},
+        {"_id": "f", "jobId": "J1", "status": "evaluated", "tier": {"letter": "F"}},
+        {"_id": "c", "jobId": "J2", "status": "evaluated", "tier": {"letter": "C"}},
+        {"_id": "new", "jobId": "J2", "status": "pending"},
+    ])
+    assert db.rebuild_job_stats() == 2
+    assert counters(stats) == {"J1": (2, 1, 1), "J2": (2, 0, 0)}
+
+    assert db.set_application_status("f", "accepted")
+    assert db.set_application_status("c", "rejected")
+    assert not db.set_application_status("missing", "accepted")
+    assert counters(stats) == {"J1": (2, 2, 0), "J2": (2, 0, 1)}
+
+    # An application the counters haven't seen yet is added to the total
+    apps.insert_one({"_id": "imported", "jobId": "J2", "status": "pending"})
+    assert db.set_application_status("imported", "rejected")
+    incremental = counters(stats)
+    assert incremental == {"J1": (2, 2, 0), "J2": (3, 0, 2)}
+
+    db.rebuild_job_stats()
+    assert counters(stats) == incremental
+
+
+def test_racing_status_changes_keep_job_stats_exact(apps, stats):
+    apps.insert_one({"_id": "a", "jobId": "J1", "status": "evaluated", "tier": {"letter": "C"}})
+    db.rebuild_job_stats()
+    read = apps.find_one
+
+    def read_then_race(*args, **kwargs):
+        app = read(*args, **kwargs)
+        if find.call_count == 1:
+            # Another recruiter's decision lands between our read and our write
+            apps.update_one({"_id": "a"}, {"$set": {"status": "rejected", "statsBucket": "rejected"}})
+            db.record_stats_moves([("J1", "open", "rejected")])
+        return app
+
+    with patch.object(apps, "find_one", side_effect=read_then_race) as find:
+        assert db.set_application_status("a", "accepted")
+
+    assert find.call_count == 2
+    incremental = counters(stats)
+    assert incremental == {"J1": (1, 1, 0)}
+    db.rebuild_job_stats()
+    assert counters(stats) == incremental
@@ -0,0 +1,188 @@
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import mongomock
+import pytest
+from pymongo.errors import AutoReconnect, BulkWriteError, OperationFailure
+
+import db
+from evaluation_writer import EvaluationWriter
+
+
+def apply_bulk(collection):
+    # mongomock's bulk_write doesn't understand this pymongo's UpdateOne
+    def bulk_write(requests, ordered=True):
+        matched = sum(collection.update_one(request._filter, request._doc).matched_count for request in requests)
+        return SimpleNamespace(matched_count=matched)
+    return bulk_write
+
+
+@pytest.fixture
+def collections():
+    client = mongomock.MongoClient()
+    client.db.applications.bulk_write = apply_bulk(client.db.applications)
+    with patch("db.applications", client.db.applications), \
+         patch("db.evaluations", client.db.evaluations), \
+         patch("db.evaluation_cache", client.db.evaluation_cache):
+        db.ensure_indexes()
+        client.db.applications.insert_many([
+            {"_id": f"app{i}", "status": "processing", "claims": 1, "lease": {"workerId": "w"}}
+            for i in range(3)
+        ])
+        yield client.db
+
+
+def result(i, attempt=1):
+    return {"app_id": f"app{i}", "attempt": attempt, "scores": {"overallScore": 70}, "tier": {"code": "C7"},
+            "details": {"cacheHit": False}}
+
+
+def test_write_is_idempotent_per_attempt(collections):
+    collections.applications.update_one({"_id": "app1"}, {"$set": {"forceFresh": True}})
+    batch = [result(i) for i in range(3)]
+    assert db.write_evaluations(batch) == 3
+    # The same batch again, as after a crash between flush and acknowledgement
+    assert db.write_evaluations([result(i) for i in range(3)]) == 0
+    assert collections.evaluations.count_documents({}) == 3
+
+    # A later attempt is new history
+    collections.applications.update_one({"_id": "app0"}, {"$set": {"status": "processing", "claims": 2}})
+    assert db.write_evaluations([result(0, attempt=2)]) == 1
+    assert collections.evaluations.count_documents({"application_id": "app0"}) == 2
+
+    app = collections.applications.find_one({"_id": "app1"})
+    assert app["status"] == "evaluated" and "lease" not in app and "forceFresh" not in app
+    assert app["tier"] == {"code": "C7"}
+
+
+def test_write_drops_results_whose_claim_was_lost(collections):
+    # app0 was reclaimed and claimed again; a recruiter decided on app1 meanwhile
+    collections.applications.update_one({"_id": "app0"}, {"$set": {"claims": 2}})
+    collections.applications.update_one({"_id": "app1"}, {"$set": {"status": "accepted"}})
+
+    assert db.write_evaluations([result(i) for i in range(3)]) == 1
+
+    assert collections.applications.find_one({"_id": "app0"})["status"] == "processing"
+    assert collections.applications.find_one({"_id": "app1"})["status"] == "accepted"
+    assert collections.applications.find_one({"_id": "app2"})["status"] == "evaluated"
+    assert [doc["application_id"] for doc in collections.evaluations.find()] == ["app2"]
+
+
+def test_write_keeps_materialized_job_stats(collections):
+    collections.applications.update_many({}, {"$set": {"jobId": "J1"}})
+    with patch("db.job_stats", collections.job_stats), patch("db.STATS_MATERIALIZED", True):
+        db.write_evaluations([dict(result(0), tier={"letter": "A"}), dict(result(1), tier={"letter": "F"})])
+        # A retried flush moves nothing
+        db.write_evaluations([dict(result(0), tier={"letter": "A"})])
+        collections.applications.update_one({"_id": "app1"}, {"$set": {"status": "processing", "claims": 2}})
+        db.write_evaluations([dict(result(1, attempt=2), tier={"letter": "B"})])
+
+    stats = collections.job_stats.find_one({"_id": "J1"})
+    assert (stats["total"], stats["selected"], stats.get("rejected", 0)) == (2, 2, 0)
+    assert collections.applications.find_one({"_id": "app1"})["statsBucket"] == "selected"
+
+
+def test_failed_write_keeps_the_stat_moves_it_made(collections):
+    collections.applications.update_many({}, {"$set": {"jobId": "J1"}})
+    swap = collections.applications.find_one_and_update
+
+    def fail_second(*args, **kwargs):
+        if swapped.call_count == 2:
+            raise AutoReconnect("connection lost")
+        return swap(*args, **kwargs)
+
+    with patch("db.job_stats", collections.job_stats), patch("db.STATS_MATERIALIZED", True), \
+            patch.object(collections.applications, "find_one_and_update", side_effect=fail_second) as swapped:
+        batch = [dict(result(i), tier={"letter": "A"}) for i in range(3)]
+        with pytest.raises(AutoReconnect):
+            db.write_evaluations(batch)
+        assert collections.job_stats.find_one({"_id": "J1"})["selected"] == 1
+        # The retry writes the rest; the application already written is no longer held
+        db.write_evaluations(batch)
+
+    stats = collections.job_stats.find_one({"_id": "J1"})
+    assert (stats["total"], stats["selected"]) == (3, 3)
+
+
+def test_write_counts_applications_without_a_job(collections):
+    with patch("db.job_stats", collections.job_stats), patch("db.STATS_MATERIALIZED", True):
+        assert db.write_evaluations([dict(result(0), tier={"letter": "A"})]) == 1
+
+    # mongomock gives a null _id upsert a generated id; MongoDB keeps it null
+    [stats] = collections.job_stats.find()
+    assert (stats["total"], stats["selected"]) == (1, 1)
+
+
+def test_writer_flushes_on_size():
+    writes = []
+    writer = EvaluationWriter(max_items=2, max_wait_seconds=60, write=writes.append)
+    for i in range(3):
+        writer.add({"_id": f"app{i}", "claims": 1}, {}, {})
+
+    assert [len(batch) for batch in writes] == [2]
+    assert writes[0][0] == {"app_id": "app0", "attempt": 1, "scores": {}, "tier": {}, "details": None}
+    assert writer.flush() == 1
+    assert [len(batch) for batch in writes] == [2, 1]
+
+
+def test_writer_flushes_on_time():
+    writes = []
+    writer = EvaluationWriter(max_items=100, max_wait_seconds=0.05, write=writes.append)
+    writer.add({"_id": "app0"}, {}, {})
+    time.sleep(0.2)
+    assert len(writes) == 1 and len(writer) == 0
+
+
+def test_failed_write_is_retried_on_next_flush():
+    writes = []
+
+    def flaky(batch):
+        if not writes:
+            writes.append(None)
+            raise AutoReconnect("primary stepped down")
+        writes.append(batch)
+
+    writer = EvaluationWriter(max_items=100, max_wait_seconds=60, write=flaky)
+    writer.add({"_id": "app0"}, {}, {})
+    assert writer.flush() == 0
+    assert len(writer) == 1
+    writer.add({"_id": "app1"}, {}, {})
+    assert writer.flush() == 2
+    assert [r["app_id"] for r in writes[1]] == ["app0", "app1"]
+
+
+def test_write_skips_rows_that_cannot_be_stored(collections):
+    insert_many = collections.evaluations.insert_many
+
+    def reject_app1(docs, ordered=True):
+        insert_many([doc for doc in docs if doc["application_id"] != "app1"], ordered=ordered)
+        raise BulkWriteError({"writeErrors": [{"index": 1, "code": 10334, "errmsg": "too large"}]})
+
+    with patch.object(collections.evaluations, "insert_many", side_effect=reject_app1):
+        assert db.write_evaluations([result(i) for i in range(3)]) == 2
+
+    statuses = {app["_id"]: app["status"] for app in collections.applications.find()}
+    assert statuses == {"app0": "evaluated", "app1": "processing", "app2": "evaluated"}
+
+
+def test_only_transient_failures_are_retried_and_only_so_often():
+    calls = []
+
+    def failing(error):
+        def write(batch):
+            calls.append([r["app_id"] for r in batch])
+            raise error
+        return write
+
+    writer = EvaluationWriter(max_items=100, max_wait_seconds=60, write=failing(OperationFailure("bad")))
+    writer.add({"_id": "app0"}, {}, {})
+    assert writer.flush() == 0
+    assert len(writer) == 0
+
+    writer = EvaluationWriter(max_items=100, max_wait_seconds=60, write=failing(AutoReconnect("down")), max_retries=2)
+    writer.add({"_id": "app0"}, {}, {})
+    for _ in range(4):
+        writer.flush()
+    assert len(writer) == 0
+    assert len(calls) == 1 + 3
@@ -0,0 +1,299 @@
+import json
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+import mongomock
+import pytest
+
+import evaluators
+from errors import RetryLater
+
+SCORES = {"contentScore": 80, "designScore": 80, "projectsScore": 80, "overallScore": 80, "reasoningSummary": "ok"}
+LINKS = {
+    "github": "https://github.com/octocat",
+    "linkedin": "https://linkedin.com/in/octocat",
+    "portfolio": "https://octocat.dev",
+}
+
+
+@pytest.fixture(autouse=True)
+def no_context_cache():
+    with patch("evaluators.get_context_cache", return_value=None):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def evaluation_cache():
+    collection = mongomock.MongoClient().db.evaluation_cache
+    with patch("db.evaluation_cache", collection):
+        yield collection
+
+
+@pytest.fixture
+def sources():
+    def slow(result, seconds):
+        def analyze(*args):
+            time.sleep(seconds)
+            return result
+        return analyze
+
+    with patch("evaluators.analyze_github_profile", side_effect=slow({"total_stars": 5}, 0.2)) as gh, \
+         patch("evaluators.analyze_linkedin_profile", side_effect=slow({"seems_valid": True}, 0.2)) as li, \
+         patch("evaluators.analyze_portfolio", side_effect=slow({"active": True}, 2)) as pf, \
+         patch("evaluators.generate_text", return_value=json.dumps(SCORES)) as gen:
+        yield {"github": gh, "linkedin": li, "portfolio": pf, "generate": gen}
+
+
+def test_sources_run_concurrently_under_deadline(sources):
+    started = time.monotonic()
+    resume, data, timings = evaluators.gather_sources(None, LINKS, deadline=0.5)
+    elapsed = time.monotonic() - started
+
+    assert elapsed < 1.0  # not 0.2 + 0.2 + 2
+    assert resume is None
+    assert data["github"] == {"total_stars": 5}
+    assert data["linkedin"] == {"seems_valid": True}
+    assert data["portfolio"]["status"] == "unavailable"
+    assert timings["github"]["status"] == "ok"
+    assert timings["portfolio"]["status"] == "timeout"
+
+
+def test_resume_parse_does_not_queue_behind_abandoned_fetches(sources):
+    # Every ingestion thread is still busy with fetches earlier evaluations gave up on
+    with patch.object(evaluators, "_sources_pool", ThreadPoolExecutor(max_workers=1)) as pool, \
+         patch("evaluators.analyze_resume", return_value={"text": "parsed"}):
+        pool.submit(time.sleep, 2)
+        started = time.monotonic()
+        resume, data, timings = evaluators.gather_sources(b"%PDF", {"github": LINKS["github"]}, deadline=0.3)
+        elapsed = time.monotonic() - started
+    pool.shutdown(wait=False, cancel_futures=True)
+
+    assert elapsed < 1.0
+    assert resume == {"text": "parsed"}
+    assert timings["resume"]["status"] == "ok"
+    assert data["github"]["status"] == "unavailable"
+
+
+def test_evaluation_records_timings_and_marks_unavailable(sources):
+    details = {}
+    with patch.object(evaluators, "EVALUATION_SOURCE_DEADLINE_SECONDS", 0.5):
+        scores, tier = evaluators.evaluate_candidate(None, LINKS, "JOB1", details=details)
+
+    assert tier["letter"] == "A"
+    assert set(details["sourceTimings"]) == {"github", "linkedin", "portfolio"}
+    call = sources["generate"].call_args
+    assert "unavailable" in call.args[0]
+    assert "You are an AI talent evaluator" in call.kwargs["system_instruction"]
+    assert "tokenUsage" in details
+
+
+def test_failing_source_is_unavailable_but_retry_later_propagates(sources):
+    sources["linkedin"].side_effect = RuntimeError("blocked")
+    _, data, timings = evaluators.gather_sources(None, {"linkedin": LINKS["linkedin"]}, deadline=1)
+    assert data["linkedin"] == {"status": "unavailable", "reason": "blocked"}
+    assert timings["linkedin"]["status"] == "error"
+
+    sources["github"].side_effect = RetryLater("quota")
+    with pytest.raises(RetryLater):
+        evaluators.gather_sources(None, {"github": LINKS["github"]}, deadline=1)
+
+
+class FakeModel:
+    """Local stand-in for Gemini that answers single and batched prompts."""
+
+    def __init__(self, drop=()):
+        self.prompts = []
+        self.drop = set(drop)
+
+    def __call__(self, content, system_instruction=None, **kwargs):
+        prompt = (system_instruction or "") + content
+        self.prompts.append(prompt)
+        ids = re.findall(r"CANDIDATE ID: (\S+)", prompt)
+        if not ids:
+            return "```json\n" + json.dumps(SCORES) + "\n```"
+        return json.dumps({i: SCORES for i in ids if i not in self.drop})
+
+
+def prepared(n, job_id="JOB1"):
+    return {
+        f"app{i}": evaluators.PreparedCandidate(
+            job_id=job_id, job_description="Python developer", links={},
+            resume_text=f"Resume of candidate {i} " * 10, design_data={"design_score": 80},
+        )
+        for i in range(n)
+    }
+
+
+def test_batch_shares_one_model_call():
+    model = FakeModel()
+    with patch("evaluators.generate_text", side_effect=model):
+        results = evaluators.evaluate_prepared_batch(prepared(4))
+
+    assert len(model.prompts) == 1
+    assert model.prompts[0].count("You are an AI talent evaluator") == 1
+    assert model.prompts[0].count("Python developer") == 1
+    assert set(results) == {"app0", "app1", "app2", "app3"}
+    assert all(tier["letter"] == "A" for _, tier in results.values())
+
+
+def test_batch_retries_missing_candidates_individually():
+    model = FakeModel(drop={"app2"})
+    with patch("evaluators.generate_text", side_effect=model):
+        results = evaluators.evaluate_prepared_batch(prepared(3))
+
+    assert len(model.prompts) == 2
+    assert "CANDIDATE ID" not in model.prompts[1]
+    assert results["app2"][0]["overallScore"] == 80
+
+
+def test_batch_falls_back_when_answer_is_not_json():
+    calls = []
+
+    def model(prompt, **kwargs):
+        calls.append(prompt)
+        return "Sorry, I can't do that" if len(calls) == 1 else json.dumps(SCORES)
+
+    with patch("evaluators.generate_text", side_effect=model):
+        results = evaluators.evaluate_prepared_batch(prepared(2))
+
+    assert len(calls) == 3
+    assert len(results) == 2
+
+
+@pytest.mark.parametrize("raw", [
+    json.dumps(SCORES),
+    "```json\n" + json.dumps(SCORES) + "\n```",
+    "Here is the evaluation:\n" + json.dumps(SCORES) + "\nLet me know if you need more.",
+    json.dumps(SCORES)[:-25],  # cut off inside reasoningSummary
+])
+def test_extract_json_tolerates_wrapped_and_truncated_output(raw):
+    value = evaluators._extract_json(raw)
+    assert {key: value[key] for key in evaluators.SCORE_KEYS} == {key: SCORES[key] for key in evaluators.SCORE_KEYS}
+
+
+def test_extract_json_drops_dangling_key():
+    assert evaluators._extract_json('{"overallScore": 80, "reason') == {"overallScore": 80}
+    assert evaluators._extract_json("no json here") is None
+
+
+def test_malformed_answer_is_repaired_without_resending_the_resume():
+    calls = []
+
+    def model(prompt, **kwargs):
+        calls.append((prompt, kwargs))
+        if len(calls) == 1:
+            return '{"contentScore": 80 "designScore": 80}'
+        return json.dumps(SCORES)
+
+    candidate = prepared(1)["app0"]
+    with patch("evaluators.generate_text", side_effect=model):
+        scores, tier = evaluators.evaluate_prepared(candidate)
+
+    assert scores["overallScore"] == 80
+    assert calls[0][1]["response_schema"] is evaluators.SCORES_SCHEMA
+    repair_prompt, repair_kwargs = calls[1]
+    assert "Resume of candidate" not in repair_prompt
+    assert '"designScore": 80' in repair_prompt
+    assert "cached_content" not in repair_kwargs
+    assert candidate.details["jsonRepair"] is True
+
+
+def test_unrecoverable_answer_fails_instead_of_scoring_zero():
+    with patch("evaluators.generate_text", return_value="{ totally broken") as model:
+        with pytest.raises(evaluators.ModelOutputError):
+            evaluators.evaluate_prepared(prepared(1)["app0"])
+    assert model.call_count == 2
+
+
+def test_empty_answer_fails_as_model_output_error():
+    # response.text is None when the model returns no candidates (e.g. blocked by safety)
+    with patch("evaluators.generate_text", return_value=None):
+        with pytest.raises(evaluators.ModelOutputError):
+            evaluators.evaluate_prepared(prepared(1)["app0"])
+
+
+def test_batch_reports_individual_failures_per_candidate():
+    def model(prompt, **kwargs):
+        if "CANDIDATE ID" in prompt:
+            return json.dumps({"app0": SCORES})
+        return "I cannot evaluate this candidate."
+
+    with patch("evaluators.generate_text", side_effect=model):
+        results = evaluators.evaluate_prepared_batch(prepared(2))
+
+    assert results["app0"][0]["overallScore"] == 80
+    assert isinstance(results["app1"], evaluators.ModelOutputError)
+
+
+def test_candidate_section_serializes_sources_as_compact_json():
+    section = evaluators._candidate_section(
+        "resume", {}, github_data={"total_stars": 5, "bio": None, "top_languages": ["Python"]},
+    )
+    assert 'GITHUB PROFILE DATA:\n{"total_stars":5,"top_languages":["Python"]}' in section
+
+
+PRESCREEN_JOB = (
+    "Backend engineer: Python, Django, PostgreSQL, Redis, Docker, Kubernetes, AWS, Celery, Prometheus."
+)
+
+
+def prescreen_inputs(text):
+    resume = MagicMock(text=text, design={"design_score": 60})
+    return patch("evaluators.gather_sources", return_value=(resume, {}, {}))
+
+
+def test_shadow_prescreen_records_decision_but_calls_model():
+    details = {}
+    with prescreen_inputs("Pastry chef with ten years running French bakeries. " * 3), \
+         patch("evaluators.generate_text", return_value=json.dumps(SCORES)) as model:
+        evaluators.evaluate_candidate(b"%PDF", {}, "JOB1", PRESCREEN_JOB, details=details)
+
+    model.assert_called_once()
+    assert details["prescreen"]["decision"] == "reject"
+    assert details["prescreen"]["mode"] == "shadow"
+    # The model gave tier A, so the reject prediction disagreed
+    assert details["prescreen"]["agreesWithModel"] is False
+
+
+def test_enforced_prescreen_skips_model_for_clear_rejects():
+    details = {}
+    with patch("evaluators.PRESCREEN_MODE", "enforce"), \
+         prescreen_inputs("Pastry chef with ten years running French bakeries. " * 3), \
+         patch("evaluators.generate_text") as model:
+        scores, tier = evaluators.evaluate_candidate(b"%PDF", {}, "JOB1", PRESCREEN_JOB, details=details)
+
+    model.assert_not_called()
+    assert tier["letter"] == "F"
+    assert details["prescreen"]["decision"] == "reject"
+
+
+def test_enforced_prescreen_runs_before_the_external_sources(sources):
+    chef = MagicMock(text="Pastry chef with ten years running French bakeries. " * 3, design={"design_score": 60})
+    engineer = MagicMock(text=PRESCREEN_JOB * 3, design={"design_score": 60})
+    with patch("evaluators.PRESCREEN_MODE", "enforce"), \
+         patch.object(evaluators, "EVALUATION_SOURCE_DEADLINE_SECONDS", 0.5), \
+         patch("evaluators.analyze_resume", side_effect=[chef, engineer]):
+        evaluators.evaluate_candidate(b"%PDF", LINKS, "JOB1", PRESCREEN_JOB)
+        assert sources["github"].call_count == 0 and sources["portfolio"].call_count == 0
+
+        details = {}
+        evaluators.evaluate_candidate(b"%PDF-2", LINKS, "JOB1", PRESCREEN_JOB, details=details)
+
+    sources["github"].assert_called_once()
+    sources["generate"].assert_called_once()
+    assert {"resume", "github", "linkedin"} <= set(details["sourceTimings"])
+
+
+def test_enforced_prescreen_deprioritizes_weak_matches_once():
+    weak = "Frontend developer building React apps, some Python scripting. " * 3
+    with patch("evaluators.PRESCREEN_MODE", "enforce"), prescreen_inputs(weak), \
+         patch("evaluators.generate_text", return_value=json.dumps(SCORES)) as model:
+        with pytest.raises(evaluators.Deprioritized) as raised:
+            evaluators.evaluate_candidate(b"%PDF", {}, "JOB1", PRESCREEN_JOB, allow_deprioritize=True)
+        assert raised.value.priority < 0
+        model.assert_not_called()
+
+        evaluators.evaluate_candidate(b"%PDF", {}, "JOB1", PRESCREEN_JOB, allow_deprioritize=False)
+        model.assert_called_once()
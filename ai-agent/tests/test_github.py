@@ -0,0 +1,172 @@
+import json
+import time
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+from github import GithubException, UnknownObjectException
+
+from cache import LRUCache
+from ingestion import github
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def load_fixture(name):
+    return json.loads((FIXTURES / name).read_text())
+
+
+USER = {"login": "octocat", "bio": "Hello", "followers": 42}
+REPOS = [
+    {"name": "a", "stargazers_count": 3, "language": "Python", "pushed_at": "2024-01-01T00:00:00Z"},
+    {"name": "b", "stargazers_count": 2, "language": "Go", "pushed_at": "2023-01-01T00:00:00Z"},
+]
+
+
+class FakeRequester:
+    """Answers like the GitHub REST API (honouring If-None-Match) and replays recorded GraphQL responses."""
+
+    def __init__(self, remaining=4000):
+        self.calls = []
+        self.remaining = remaining
+        self.bodies = {"/users/octocat": USER, "/users/octocat/repos": REPOS}
+        self.graphql_calls = []
+        self.graphql_error = None
+
+    def graphql_query(self, query, variables):
+        self.graphql_calls.append(variables)
+        if self.graphql_error:
+            raise self.graphql_error
+        headers = {"x-ratelimit-remaining": "4987", "x-ratelimit-reset": str(int(time.time()) + 600)}
+        if variables["login"] == "octocat":
+            return headers, load_fixture("github_graphql_octocat.json")
+        # Requester.graphql_query turns NOT_FOUND errors into this exception
+        raise UnknownObjectException(404, load_fixture("github_graphql_not_found.json"), headers)
+
+    def requestJson(self, verb, url, parameters=None, headers=None):
+        self.calls.append((url, dict(headers or {})))
+        body = json.dumps(self.bodies[url])
+        etag = f'"{hash(body)}"'
+        response_headers = {
+            "etag": etag,
+            "x-ratelimit-remaining": str(self.remaining),
+            "x-ratelimit-reset": str(int(time.time()) + 600),
+        }
+        if (headers or {}).get("If-None-Match") == etag:
+            return 304, response_headers, ""
+        return 200, response_headers, body
+
+
+@pytest.fixture
+def requester(monkeypatch):
+    monkeypatch.setenv("GITHUB_TOKEN", "token")
+    fake = FakeRequester()
+    client = MagicMock()
+    client.requester = fake
+    rate_limit = {"core": {"remaining": None, "reset": None}, "graphql": {"remaining": None, "reset": None}}
+    with patch.object(github, "_profiles", LRUCache(max_items=10)), \
+         patch.object(github, "_rate_limit", rate_limit), \
+         patch("ingestion.github.get_client", return_value=client):
+        yield fake
+
+
+@pytest.fixture
+def rest_only(requester):
+    with patch.object(github, "GITHUB_USE_GRAPHQL", False):
+        yield requester
+
+
+def test_client_surfaces_rate_limits_and_does_not_throttle():
+    with patch.object(github, "_client", None), patch("ingestion.github.Github") as mock_github:
+        github.get_client("token")
+
+    kwargs = mock_github.call_args.kwargs
+    assert kwargs["seconds_between_requests"] is None and kwargs["seconds_between_writes"] is None
+    retry = kwargs["retry"]
+    assert not {403, 429} & set(retry.status_forcelist)
+    assert not retry.respect_retry_after_header
+
+
+def test_graphql_rate_limit_falls_back_to_rest_until_reset(requester):
+    reset = str(int(time.time()) + 600)
+    requester.graphql_error = GithubException(
+        403, {"message": "API rate limit exceeded"}, {"x-ratelimit-remaining": "0", "x-ratelimit-reset": reset}
+    )
+
+    first = github.analyze_github_profile("octocat")
+    github._profiles.clear()
+    second = github.analyze_github_profile("octocat")
+
+    assert first == second and first["followers"] == 42
+    # The second profile doesn't spend a GraphQL request it knows will be refused
+    assert len(requester.graphql_calls) == 1
+
+
+def test_graphql_profile_from_recorded_fixture(requester):
+    with patch("ingestion.github.datetime") as mock_dt:
+        mock_dt.utcnow.return_value = datetime(2024, 5, 1)
+        mock_dt.strptime = datetime.strptime
+        analysis = github.analyze_github_profile("octocat")
+
+    assert len(requester.graphql_calls) == 1
+    assert requester.calls == []
+    assert analysis["total_stars"] == 5
+    assert analysis["total_repos"] == 3
+    assert analysis["top_languages"] == ["Python", "Go"]
+    assert analysis["followers"] == 42
+    assert analysis["recent_activity"] is True
+    assert analysis["last_pushed_at"] == "2024-04-20T09:15:02Z"
+
+
+def test_graphql_unknown_user_is_an_error_without_rest_retry(requester):
+    analysis = github.analyze_github_profile("nobody-here")
+
+    assert "error" in analysis
+    assert requester.calls == []
+
+
+def test_graphql_failure_falls_back_to_rest(requester):
+    requester.graphql_error = GithubException(502, {"message": "Bad gateway"}, {})
+
+    analysis = github.analyze_github_profile("octocat")
+
+    assert analysis["total_stars"] == 5
+    assert [url for url, _ in requester.calls] == ["/users/octocat", "/users/octocat/repos"]
+
+
+def test_analysis_is_cached_within_ttl(rest_only):
+    requester = rest_only
+    first = github.analyze_github_profile("octocat")
+    second = github.analyze_github_profile("OctoCat")
+
+    assert first["total_stars"] == 5
+    assert first["top_languages"] == ["Python", "Go"]
+    assert first["followers"] == 42
+    assert second == first
+    assert len(requester.calls) == 2
+
+
+def test_expired_entry_is_revalidated_with_etags(rest_only):
+    requester = rest_only
+    github.analyze_github_profile("octocat")
+    with patch.object(github, "GITHUB_CACHE_TTL_SECONDS", 0):
+        requester.bodies["/users/octocat/repos"] = REPOS + [
+            {"name": "c", "stargazers_count": 10, "language": "Rust", "pushed_at": None}
+        ]
+        refreshed = github.analyze_github_profile("octocat")
+
+    revalidation = requester.calls[2:]
+    assert all("If-None-Match" in headers for _, headers in revalidation)
+    assert refreshed["total_stars"] == 15
+    assert refreshed["bio"] == "Hello"  # user answered 304, cached copy reused
+
+
+def test_defers_when_rate_limit_is_nearly_spent(rest_only):
+    requester = rest_only
+    requester.remaining = 5
+    github.analyze_github_profile("octocat")
+
+    with pytest.raises(github.GitHubRateLimited) as excinfo:
+        github.analyze_github_profile("someone-else")
+    assert excinfo.value.retry_at is not None
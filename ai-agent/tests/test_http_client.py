@@ -0,0 +1,102 @@
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from ingestion import http_client
+from ingestion.linkedin import analyze_linkedin_profile
+from ingestion.portfolio import analyze_portfolio
+
+PORTFOLIO = b"""<html><head><title>Jane Doe</title>
+<meta name="description" content="Full-stack developer">
+<link rel="stylesheet" href="site.css"></head>
+<body><h1>My projects</h1><script></script></body></html>"""
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    in_flight = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        if self.path == "/slow":
+            cls = type(self)
+            with cls.lock:
+                cls.in_flight += 1
+                cls.peak = max(cls.peak, cls.in_flight)
+            time.sleep(0.2)
+            with cls.lock:
+                cls.in_flight -= 1
+            body = b"slow"
+        elif self.path == "/big":
+            body = b"x" * 100_000
+        elif self.path == "/missing":
+            self.send_response(404)
+            self.end_headers()
+            return
+        else:
+            body = PORTFOLIO
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+
+
+def test_fetch_returns_page(server):
+    result = http_client.fetch(f"{server}/")
+
+    assert result.status_code == 200
+    assert "My projects" in result.text
+    assert not result.truncated
+
+
+def test_fetch_caps_response_size(server):
+    result = http_client.fetch(f"{server}/big", max_bytes=1000)
+
+    assert result.truncated
+    assert len(result.text) == 1000
+
+
+def test_fetch_enforces_deadline(server):
+    with pytest.raises(http_client.FetchError):
+        http_client.fetch(f"{server}/slow", deadline=0.05)
+
+
+def test_per_host_concurrency_limit(server):
+    time.sleep(0.3)  # let requests abandoned by earlier tests finish server-side
+    StubHandler.peak = 0
+    limit = http_client.HTTP_PER_HOST_LIMIT
+
+    async def fetch_many():
+        return await asyncio.gather(*(http_client.fetch_async(f"{server}/slow") for _ in range(limit * 2)))
+
+    results = asyncio.run(fetch_many())
+
+    assert all(r.text == "slow" for r in results)
+    assert StubHandler.peak == limit
+    # Idle hosts don't keep an entry, however many candidates' sites were fetched
+    assert http_client._host_limits == {}
+
+
+def test_analyzers_use_shared_client(server):
+    portfolio = analyze_portfolio(f"{server}/")
+    linkedin = analyze_linkedin_profile(f"{server}/missing")
+
+    assert portfolio["active"] is True
+    assert portfolio["richness_score"] == 60
+    assert portfolio["meta_description"] == "Full-stack developer"
+    assert linkedin == {"error": "Status code 404"}
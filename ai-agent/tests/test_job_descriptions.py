@@ -0,0 +1,68 @@
+from unittest.mock import MagicMock, patch
+
+import mongomock
+import pytest
+from bson import ObjectId
+from pymongo.errors import OperationFailure
+
+import job_descriptions
+
+JOB_ID = ObjectId()
+
+
+@pytest.fixture
+def jobs():
+    collection = mongomock.MongoClient().db.jobs
+    collection.insert_many([
+        {"_id": JOB_ID, "jobTitle": "Backend Engineer", "description": "Python, Django, PostgreSQL."},
+        {"_id": "untitled", "description": "Kubernetes operators."},
+        {"_id": "empty", "jobTitle": "Designer", "description": ""},
+    ])
+    job_descriptions.invalidate()
+    with patch("job_descriptions.jobs", collection):
+        yield collection
+    job_descriptions.invalidate()
+
+
+def test_batch_is_loaded_with_one_query(jobs):
+    apps = [
+        {"jobId": JOB_ID},
+        {"jobId": str(JOB_ID)},
+        {"jobId": "untitled"},
+        {"jobId": "missing"},
+        {"jobId": None},
+    ]
+    with patch.object(jobs, "find", wraps=jobs.find) as find:
+        assert job_descriptions.prefetch(apps) == 3
+        assert job_descriptions.prefetch(apps) == 0
+        descriptions = [job_descriptions.for_application(app) for app in apps]
+    assert find.call_count == 1
+
+    assert descriptions[0] == "Backend Engineer\n\nPython, Django, PostgreSQL."
+    assert descriptions[1] == descriptions[0]
+    assert descriptions[2] == "Kubernetes operators."
+    assert descriptions[3] is None and descriptions[4] is None
+
+
+def test_falls_back_to_the_applications_own_description(jobs):
+    app = {"jobId": "empty", "jobDescription": "Figma, design systems."}
+    assert job_descriptions.for_application(app) == "Figma, design systems."
+    assert job_descriptions.for_application({"jobDescription": "Go, gRPC."}) == "Go, gRPC."
+
+
+def test_updated_job_is_reloaded_after_invalidation(jobs):
+    app = {"jobId": "untitled"}
+    assert job_descriptions.for_application(app) == "Kubernetes operators."
+
+    jobs.update_one({"_id": "untitled"}, {"$set": {"description": "Terraform modules."}})
+    assert job_descriptions.for_application(app) == "Kubernetes operators."
+
+    job_descriptions._follow([{"operationType": "update", "documentKey": {"_id": "untitled"}}])
+    assert job_descriptions.for_application(app) == "Terraform modules."
+
+
+def test_missing_change_streams_are_tolerated():
+    standalone = MagicMock()
+    standalone.watch.side_effect = OperationFailure("The $changeStream stage is only supported on replica sets")
+    with patch("job_descriptions.jobs", standalone):
+        assert job_descriptions.watch_job_changes() is False
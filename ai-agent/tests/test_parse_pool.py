@@ -0,0 +1,81 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+from benchmarks.sample_pdfs import sample_resume
+from ingestion import parse_pool
+from ingestion.resume import ParsedResume
+
+
+def test_pool_parses_like_inline():
+    pdf_bytes = sample_resume(page_count=3)
+    try:
+        parsed = parse_pool.parse_resume_in_pool(pdf_bytes, timeout=30, max_pages=2)
+        parsed_async = asyncio.run(parse_pool.parse_resume_async(pdf_bytes, timeout=30, max_pages=2))
+    finally:
+        parse_pool.reset_pool()
+
+    assert parsed.error is None
+    assert parsed.page_count == 2
+    assert parsed_async.text == parsed.text
+
+
+def test_worker_timeout_returns_error():
+    def stuck(pdf_bytes, max_pages=0):
+        time.sleep(5)
+        return ParsedResume(pages=["never"])
+
+    with patch("ingestion.parse_pool.parse_resume", side_effect=stuck):
+        started = time.monotonic()
+        parsed = parse_pool.parse_with_limits(b"%PDF", timeout=0.1, max_pages=0)
+
+    assert time.monotonic() - started < 2
+    assert "timed out" in parsed.error
+
+
+def test_queued_parses_do_not_time_out():
+    # One worker, four callers: each parse alone fits its timeout, all four in a row don't
+    def slow_parse(pdf_bytes, timeout, max_pages):
+        time.sleep(0.2)
+        return ParsedResume(pages=["ok"])
+
+    worker = ThreadPoolExecutor(max_workers=1)
+    with patch.object(parse_pool, "RESUME_PARSE_WORKERS", 1), \
+            patch.object(parse_pool, "_slots", threading.BoundedSemaphore(1)), \
+            patch.object(parse_pool, "TIMEOUT_GRACE_SECONDS", 0.2), \
+            patch.object(parse_pool, "parse_with_limits", slow_parse), \
+            patch.object(parse_pool, "get_pool", return_value=worker):
+        with ThreadPoolExecutor(max_workers=4) as callers:
+            results = list(callers.map(lambda _: parse_pool.parse_resume_in_pool(b"%PDF", timeout=0.2), range(4)))
+    worker.shutdown()
+
+    assert [r.error for r in results] == [None] * 4
+
+
+def test_parse_retries_once_when_pool_was_restarted():
+    closed = MagicMock()
+    closed.submit.side_effect = RuntimeError("cannot schedule new futures after shutdown")
+    fresh = MagicMock()
+    fresh.submit.return_value.result.return_value = ParsedResume(pages=["ok"])
+
+    with patch.object(parse_pool, "get_pool", side_effect=[closed, fresh]), \
+            patch.object(parse_pool, "reset_pool") as reset:
+        parsed = parse_pool.parse_resume_in_pool(b"%PDF", timeout=1)
+
+    assert parsed.error is None
+    reset.assert_called_once_with(closed)
+
+
+def test_reset_pool_terminates_hung_workers():
+    pool = parse_pool.get_pool()
+    pool.submit(time.sleep, 60)
+    time.sleep(0.5)
+    processes = list(pool._processes.values())
+
+    parse_pool.reset_pool(pool)
+    for process in processes:
+        process.join(timeout=5)
+
+    assert processes and not any(p.is_alive() for p in processes)
@@ -0,0 +1,53 @@
+import pytest
+
+import prescreen
+
+JOB = (
+    "We are hiring a backend engineer: Python, Django, PostgreSQL, Redis, Docker, Kubernetes, "
+    "AWS, REST APIs, Celery, CI/CD pipelines and monitoring with Prometheus."
+)
+
+
+def test_terms_keep_tech_tokens_and_drop_filler():
+    found = prescreen.terms("Strong experience with C++, C#, Node.js and CI/CD. 5 years.")
+    assert {"c++", "c#", "node.js", "ci/cd"} <= found
+    assert not found & {"strong", "experience", "with", "and", "years", "5"}
+
+
+@pytest.mark.parametrize("resume, decision", [
+    ("Pastry chef, French cuisine, bakery management.", prescreen.REJECT),
+    ("Frontend developer: React, Python scripting.", prescreen.LOW_PRIORITY),
+    ("Backend developer. Python, Django, Docker.", prescreen.CALL_MODEL),
+    ("Python Django PostgreSQL Redis Docker Kubernetes AWS REST APIs Celery CI/CD Prometheus.", prescreen.FAST_TRACK),
+])
+def test_decision_follows_job_term_overlap(resume, decision):
+    assert prescreen.prescreen(resume, JOB).decision == decision
+
+
+def test_short_job_description_always_goes_to_the_model():
+    screen = prescreen.prescreen("Pastry chef", "Python developer")
+    assert screen.decision == prescreen.CALL_MODEL
+    assert prescreen.prescreen("Pastry chef", None).decision == prescreen.CALL_MODEL
+
+
+def test_rejects_get_a_failing_tier_with_an_explanation():
+    screen = prescreen.prescreen("Pastry chef, French cuisine.", JOB)
+    scores, tier = prescreen.heuristic_result(screen, {"design_score": 70}, {"project_score": 20})
+
+    assert tier["letter"] == "F"
+    assert "Pre-screened without AI evaluation" in scores["reasoningSummary"]
+
+
+def test_shadow_agreement_with_model_tier():
+    before = prescreen.stats()
+    reject = prescreen.prescreen("Pastry chef", JOB).as_dict()
+    fast = prescreen.prescreen(JOB, JOB).as_dict()
+
+    assert prescreen.record_agreement(reject, {"letter": "F"}) is True
+    assert prescreen.record_agreement(fast, {"letter": "C"}) is False
+    assert prescreen.record_agreement({"decision": prescreen.CALL_MODEL}, {"letter": "A"}) is None
+    assert reject["agreesWithModel"] is True
+
+    after = prescreen.stats()
+    assert after["agreed"] == before.get("agreed", 0) + 1
+    assert after["disagreed"] == before.get("disagreed", 0) + 1
@@ -0,0 +1,90 @@
+import json
+from datetime import datetime
+from unittest.mock import patch
+
+import mongomock
+import pytest
+
+import agent_loop
+import db
+import evaluators
+import result_cache
+
+SCORES = {"contentScore": 90, "designScore": 70, "projectsScore": 80, "overallScore": 85, "reasoningSummary": "ok"}
+LINKS = {"github": "https://github.com/octocat", "linkedin": None, "portfolio": "octocat.dev/"}
+
+
+@pytest.fixture(autouse=True)
+def collections():
+    client = mongomock.MongoClient()
+    with patch("db.evaluation_cache", client.db.evaluation_cache), \
+         patch("db.evaluations", client.db.evaluations), \
+         patch("evaluators.get_context_cache", return_value=None):
+        yield client.db
+
+
+def test_equivalent_links_share_a_key():
+    a = result_cache.cache_key("abc", LINKS, "Python developer", "1-x")
+    b = result_cache.cache_key(
+        "abc",
+        {"portfolio": "https://www.OctoCat.dev", "github": "github.com/octocat/?tab=repos", "linkedin": ""},
+        "Python developer\n",
+        "1-x",
+    )
+    assert a == b
+
+
+@pytest.mark.parametrize("change", [
+    {"resume_sha256": "other"},
+    {"links": {"github": "https://github.com/someone-else"}},
+    {"job_description": "Go developer"},
+    {"prompt_version": "2-x"},
+    {"model": "another-model"},
+])
+def test_key_changes_with_any_input(change):
+    base = dict(resume_sha256="abc", links=LINKS, job_description="Python developer", prompt_version="1-x", model="m")
+    assert result_cache.cache_key(**base) != result_cache.cache_key(**{**base, **change})
+
+
+def test_identical_resubmission_skips_ingestion_and_model():
+    with patch("evaluators.gather_sources", return_value=(None, {}, {})) as gather, \
+         patch("evaluators.generate_text", return_value=json.dumps(SCORES)) as model:
+        first_details, second_details = {}, {}
+        first = evaluators.evaluate_candidate(None, LINKS, "JOB1", "Python developer", details=first_details)
+        second = evaluators.evaluate_candidate(None, dict(LINKS), "JOB2", "Python developer", details=second_details)
+
+    assert gather.call_count == 1
+    assert model.call_count == 1
+    assert second == first
+    assert first_details["cacheHit"] is False and second_details["cacheHit"] is True
+    assert first_details["cacheKey"] == second_details["cacheKey"]
+
+
+def test_requeued_application_is_evaluated_afresh():
+    app = {"_id": "a1", "links": LINKS, "jobDescription": "Python developer"}
+    with patch("evaluators.gather_sources", return_value=(None, {}, {})), \
+         patch("evaluators.generate_text", return_value=json.dumps(SCORES)) as model:
+        evaluators.evaluate_candidate(**agent_loop.load_inputs(app))
+        fresh_details = {}
+        evaluators.evaluate_candidate(**agent_loop.load_inputs({**app, "forceFresh": True}), details=fresh_details)
+
+    assert model.call_count == 2
+    assert fresh_details["cacheHit"] is False
+
+
+def test_clear_stale_keeps_current_prompt_and_model(collections):
+    db.save_cached_evaluation("old-prompt", SCORES, {}, "0-old", result_cache.GEMINI_MODEL)
+    db.save_cached_evaluation("old-model", SCORES, {}, evaluators.PROMPT_VERSION, "retired-model")
+    db.save_cached_evaluation("current", SCORES, {}, evaluators.PROMPT_VERSION, result_cache.GEMINI_MODEL)
+
+    assert result_cache.clear_stale(evaluators.PROMPT_VERSION) == 2
+    assert [doc["_id"] for doc in collections.evaluation_cache.find()] == ["current"]
+    assert db.clear_evaluation_cache() == 1
+
+
+def test_hit_rate_is_computed_from_evaluation_records():
+    for app_id, hit in [("a", False), ("b", True), ("c", True), ("d", False)]:
+        db.evaluations.insert_one({"application_id": app_id, "cacheHit": hit, "evaluatedAt": datetime.utcnow()})
+    db.evaluations.insert_one({"application_id": "legacy", "evaluatedAt": datetime.utcnow()})
+
+    assert db.evaluation_cache_hit_rate() == {"evaluations": 4, "hits": 2, "hitRate": 0.5}
@@ -0,0 +1,31 @@
+import io
+
+from pdfminer.high_level import extract_text
+
+from benchmarks.sample_pdfs import sample_resume
+from ingestion.resume import design_metrics, parse_resume
+
+
+def test_single_pass_matches_pdfminer_text():
+    pdf_bytes = sample_resume(page_count=2)
+    parsed = parse_resume(pdf_bytes)
+
+    assert parsed.error is None
+    assert parsed.page_count == 2
+    assert parsed.text == extract_text(io.BytesIO(pdf_bytes))
+
+
+def test_design_metrics_from_parsed_resume():
+    design = design_metrics(parse_resume(sample_resume(page_count=2)))
+
+    assert design["page_count"] == 2
+    assert design["font_count"] == 4
+    assert design["design_score"] == 95
+
+
+def test_unreadable_pdf_reports_error():
+    parsed = parse_resume(b"not a pdf")
+
+    assert parsed.error
+    assert parsed.text == ""
+    assert design_metrics(parsed)["design_score"] == 50
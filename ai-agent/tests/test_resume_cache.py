@@ -0,0 +1,65 @@
+import os
+from unittest.mock import patch
+
+import pytest
+
+from benchmarks.sample_pdfs import sample_resume
+from cache import LRUCache
+from ingestion import resume_cache
+from ingestion.resume import parse_resume
+
+
+@pytest.fixture
+def fresh_cache(tmp_path):
+    disk = resume_cache.DiskStore(str(tmp_path), max_bytes=10 * 1024 * 1024)
+    counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+    with patch.object(resume_cache, "_memory", LRUCache(max_items=8)), \
+         patch.object(resume_cache, "_disk", disk), \
+         patch.object(resume_cache, "_counters", counters), \
+         patch("ingestion.resume_cache.parse_resume_in_pool", side_effect=parse_resume) as mock_parse:
+        yield mock_parse
+
+
+def test_identical_resumes_parse_once(fresh_cache):
+    pdf_bytes = sample_resume(page_count=1)
+
+    first = resume_cache.analyze_resume(pdf_bytes)
+    second = resume_cache.analyze_resume(pdf_bytes)
+
+    assert fresh_cache.call_count == 1
+    assert second is first
+    assert first.design["page_count"] == 1
+    stats = resume_cache.cache_stats()
+    assert stats["misses"] == 1 and stats["memory_hits"] == 1
+
+
+def test_disk_tier_survives_memory_eviction(fresh_cache):
+    pdf_bytes = sample_resume(page_count=1)
+    first = resume_cache.analyze_resume(pdf_bytes)
+    resume_cache._memory.clear()
+
+    again = resume_cache.analyze_resume(pdf_bytes)
+
+    assert fresh_cache.call_count == 1
+    assert again.text == first.text
+    assert resume_cache.cache_stats()["disk_hits"] == 1
+
+
+def test_failed_parse_is_not_cached(fresh_cache):
+    resume_cache.analyze_resume(b"not a pdf")
+    resume_cache.analyze_resume(b"not a pdf")
+
+    assert fresh_cache.call_count == 2
+
+
+def test_disk_store_evicts_least_recently_used(tmp_path):
+    store = resume_cache.DiskStore(str(tmp_path), max_bytes=3500)
+    for i in range(3):
+        store.set(f"k{i}", {"pages": ["x" * 1000]})
+        os.utime(tmp_path / f"k{i}.json", (i, i))
+    store.get("k0")  # touch the oldest so it survives
+    store.set("k3", {"pages": ["x" * 1000]})
+
+    remaining = sorted(p.stem for p in tmp_path.glob("*.json"))
+    assert "k0" in remaining and "k3" in remaining
+    assert "k1" not in remaining
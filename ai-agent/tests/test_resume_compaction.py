@@ -0,0 +1,72 @@
+from ingestion.resume_compaction import clean_pages, compact_resume, split_sections
+
+
+def words(text):
+    return len(text.split())
+
+
+PAGE_1 = """Jane Doe   |   jane@example.com
+Curriculum Vitae - Jane Doe
+SUMMARY
+Backend engineer with eight years of Python.
+Work Experience
+Acme Corp, Senior Engineer, 2019 - present
+- Led the payments platform rewrite
+Page 1 of 2
+"""
+
+PAGE_2 = """Curriculum Vitae - Jane Doe
+- Cut p99 latency by 40%
+Skills:
+Python, Go, PostgreSQL, Kubernetes
+Education
+BSc Computer Science
+References
+Available on request
+Page 2 of 2
+"""
+
+
+def test_repeated_headers_and_page_numbers_are_removed():
+    lines = clean_pages([PAGE_1, PAGE_2])
+
+    assert "Curriculum Vitae - Jane Doe" not in lines
+    assert not any(line.startswith("Page ") for line in lines)
+    assert "Jane Doe | jane@example.com" in lines
+    assert "- Cut p99 latency by 40%" in lines
+
+
+def test_sections_split_at_headings():
+    sections = split_sections(clean_pages([PAGE_1, PAGE_2]))
+
+    assert [s.title for s in sections] == ["", "SUMMARY", "Work Experience", "Skills", "Education", "References"]
+    # The experience section continues across the page break
+    assert sections[2].lines[-1] == "- Cut p99 latency by 40%"
+
+
+def test_short_sentences_are_not_headings():
+    sections = split_sections(["Experience", "Built internal tools", "Python, Django tools"])
+    assert len(sections) == 1
+
+
+def test_budget_keeps_most_relevant_sections_in_document_order():
+    full = compact_resume(PAGE_1 + "\f" + PAGE_2 + "\f", 1000, words)
+    assert full.omitted == [] and full.truncated is None
+
+    compact = compact_resume(PAGE_1 + "\f" + PAGE_2 + "\f", 42, words)
+
+    assert compact.tokens <= 42
+    assert "Work Experience" in compact.text
+    assert "Available on request" not in compact.text
+    assert "References" in compact.omitted
+    assert compact.text.index("SUMMARY") < compact.text.index("Work Experience") < compact.text.index("Skills")
+
+
+def test_section_that_does_not_fit_is_cut_at_a_line():
+    experience = "Experience\n" + "\n".join(f"- Shipped project number {i}" for i in range(50))
+    compact = compact_resume(experience, 30, words)
+
+    assert compact.truncated == "Experience"
+    assert compact.text.endswith("[...]")
+    assert "- Shipped project number 4" in compact.text
+    assert "- Shipped project number 5" not in compact.text
@@ -0,0 +1,58 @@
+from unittest.mock import MagicMock
+
+from pymongo.errors import OperationFailure
+
+from wakeup import AdaptivePoller, ChangeStreamWaiter, open_waiter
+
+
+class FakeStream:
+    """In-process stand-in for a pymongo change stream."""
+
+    def __init__(self, events):
+        self.events = list(events)
+        self.closed = False
+
+    def try_next(self):
+        return self.events.pop(0) if self.events else None
+
+    def close(self):
+        self.closed = True
+
+
+def test_poller_backs_off_when_idle_and_resets_when_busy():
+    slept = []
+    poller = AdaptivePoller(min_interval=1, max_interval=8, sleep=slept.append)
+
+    for _ in range(5):
+        poller.wait()
+    assert slept == [1, 2, 4, 8, 8]
+
+    poller.reset()
+    poller.wait()
+    assert slept[-1] == 1
+
+
+def test_change_stream_wakes_on_pending_insert():
+    collection = MagicMock()
+    collection.watch.return_value = FakeStream([None, {"operationType": "insert"}])
+
+    waiter = ChangeStreamWaiter(collection, max_wait_seconds=5)
+
+    assert waiter.wait() is True
+    pipeline = collection.watch.call_args.args[0]
+    assert {"operationType": "insert", "fullDocument.status": "pending"} in pipeline[0]["$match"]["$or"]
+
+
+def test_change_stream_times_out_when_quiet():
+    collection = MagicMock()
+    collection.watch.return_value = FakeStream([])
+
+    assert ChangeStreamWaiter(collection, max_wait_seconds=0.01).wait() is False
+
+
+def test_falls_back_to_polling_without_change_streams():
+    collection = MagicMock()
+    collection.watch.side_effect = OperationFailure(
+        "The $changeStream stage is only supported on replica sets", code=40573
+    )
+    assert isinstance(open_waiter(collection), AdaptivePoller)
@@ -0,0 +1,80 @@
+# wakeup.py
+# Decides when the agent loop should look for new work again.
+import logging
+import time
+
+from pymongo.errors import PyMongoError
+
+logger = logging.getLogger(__name__)
+
+# Wake on new submissions and on applications put back in the queue (lease reclaim, retries)
+PENDING_CHANGES = [
+    {
+        "$match": {
+            "$or": [
+                {"operationType": "insert", "fullDocument.status": "pending"},
+                {"operationType": "update", "updateDescription.updatedFields.status": "pending"},
+            ]
+        }
+    }
+]
+
+
+class AdaptivePoller:
+    """
+    Polling fallback: back off exponentially while the queue is idle,
+    drop straight back to the minimum interval once work shows up.
+    """
+
+    def __init__(self, min_interval: float = 1.0, max_interval: float = 30.0, sleep=time.sleep):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval = min_interval
+        self._sleep = sleep
+
+    def wait(self) -> bool:
+        self._sleep(self.interval)
+        self.interval = min(self.interval * 2, self.max_interval)
+        return False
+
+    def reset(self):
+        self.interval = self.min_interval
+
+    def close(self):
+        pass
+
+
+class ChangeStreamWaiter:
+    """
+    Blocks on a MongoDB change stream until a pending application appears.
+    Still returns after `max_wait_seconds` so expired leases get reclaimed.
+    """
+
+    def __init__(self, collection, max_wait_seconds: float = 60.0, await_ms: int = 1000):
+        self.max_wait_seconds = max_wait_seconds
+        # Raises on standalone servers, where change streams are unavailable
+        self._stream = collection.watch(PENDING_CHANGES, max_await_time_ms=await_ms)
+
+    def wait(self) -> bool:
+        deadline = time.monotonic() + self.max_wait_seconds
+        while time.monotonic() < deadline:
+            if self._stream.try_next() is not None:
+                return True
+        return False
+
+    def reset(self):
+        pass
+
+    def close(self):
+        self._stream.close()
+
+
+def open_waiter(collection, min_interval: float = 1.0, max_interval: float = 30.0):
+    """Prefer a change stream on `collection`; fall back to adaptive polling."""
+    try:
+        waiter = ChangeStreamWaiter(collection, max_wait_seconds=max(max_interval, 60.0))
+        logger.info("Waiting for new applications via change stream")
+        return waiter
+    except PyMongoError as e:
+        logger.info(f"Change streams unavailable ({e}); using adaptive polling")
+        return AdaptivePoller(min_interval, max_interval)
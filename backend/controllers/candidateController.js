@@ -64,6 +64,7 @@ const applyCandidate = async (req, res) => {
     }
 
     // 2. Create Candidate
+    const statsMaterialized = process.env.STATS_MATERIALIZED === "1";
     await Candidate.create({
       jobId: job._id,
       companyId: job.companyId,
@@ -90,9 +91,19 @@ const applyCandidate = async (req, res) => {
         reasoningSummary: "Evaluation in progress"
       },
       backendData: {},
-      status: "pending"
+      status: "pending",
+      ...(statsMaterialized && { statsBucket: "open" })
     });
 
+    // 3. Count it in the job's dashboard totals (ai-agent STATS_MATERIALIZED)
+    if (statsMaterialized) {
+      await mongoose.connection.db.collection("job_stats").updateOne(
+        { _id: job._id },
+        { $inc: { total: 1 }, $set: { updatedAt: new Date() } },
+        { upsert: true }
+      );
+    }
+
     res.json({ message: "Application submitted successfully" });
   } catch (err) {
     console.error("APPLY ERROR:", err);
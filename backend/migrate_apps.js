@@ -15,8 +15,11 @@ async function migrate() {
             // Clear target applications first to avoid duplicates or mess
             // await targetConn.collection("applications").deleteMany({});
 
-            // Insert into target
-            await targetConn.collection("applications").insertMany(apps);
+            // Insert into target; imported applications still awaiting evaluation
+            // queue behind live submissions (bulk priority class)
+            await targetConn.collection("applications").insertMany(
+                apps.map((app) => (app.status === "pending" && app.priority === undefined ? { ...app, priority: -10 } : app))
+            );
             console.log(`Migrated ${apps.length} applications to mern-auth.`);
         }
 
@@ -21,7 +21,7 @@ const ApplicationSchema = new mongoose.Schema(
         },
         status: {
             type: String,
-            enum: ["pending", "evaluated", "rejected", "accepted"],
+            enum: ["pending", "processing", "evaluated", "rejected", "accepted", "dead_letter"],
             default: "pending",
         },
         scores: {
@@ -36,6 +36,11 @@ const ApplicationSchema = new mongoose.Schema(
             level: Number,  // 1-10
             code: String,   // A1...C10
         },
+        // Evaluation queue class: 20 manual re-evaluation, 0 normal, -1 pre-screen deprioritized, -10 bulk import
+        priority: {
+            type: Number,
+            default: 0,
+        },
         lastEvaluatedAt: {
             type: Date,
         },
@@ -44,6 +44,8 @@ const candidateSchema = new mongoose.Schema({
     type: String,
     default: "pending"
   },
+  // Dashboard bucket counted in job_stats (ai-agent STATS_MATERIALIZED)
+  statsBucket: String,
 
   createdAt: {
     type: Date,
@@ -91,9 +91,12 @@ export const getDashboardStats = async () => {
   return res.ok ? res.json() : null;
 };
 
-export const getCandidatesList = async () => {
-  const res = await fetch(`${AI_AGENT_URL}/candidates_list`);
-  return res.ok ? res.json() : [];
+// One page of candidates; pass nextCursor back to get the following page
+export const getCandidatesList = async (cursor) => {
+  const params = cursor ? `?cursor=${encodeURIComponent(cursor)}` : "";
+  const res = await fetch(`${AI_AGENT_URL}/candidates_list${params}`);
+  if (!res.ok) return { candidates: [], nextCursor: null };
+  return { candidates: await res.json(), nextCursor: res.headers.get("X-Next-Cursor") };
 };
 
 export const getJobAnalytics = async (jobId) => {
@@ -5,16 +5,24 @@ import { getCandidatesList, updateCandidateStatus } from '../../api';
 
 function Candidates() {
     const [candidates, setCandidates] = useState([]);
+    const [nextCursor, setNextCursor] = useState(null);
     const navigate = useNavigate();
 
     useEffect(() => {
         const fetchCandidates = async () => {
-            const data = await getCandidatesList();
-            setCandidates(data);
+            const page = await getCandidatesList();
+            setCandidates(page.candidates);
+            setNextCursor(page.nextCursor);
         };
         fetchCandidates();
     }, []);
 
+    const loadMore = async () => {
+        const page = await getCandidatesList(nextCursor);
+        setCandidates([...candidates, ...page.candidates]);
+        setNextCursor(page.nextCursor);
+    };
+
     const handleStatusUpdate = async (candidateId, newStatus) => {
         try {
             await updateCandidateStatus(candidateId, newStatus);
@@ -94,6 +102,12 @@ function Candidates() {
                     </div>
                 ))}
             </div>
+
+            {nextCursor && (
+                <button onClick={loadMore} style={{ cursor: 'pointer', padding: '8px 16px', marginTop: '15px' }}>
+                    Load more
+                </button>
+            )}
         </div>
     )
 }